@@ -1,28 +1,57 @@
 #!/usr/bin/env python3
+import time
+_process_start = time.perf_counter()
+
+import os
+import shutil
+import importlib
+
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen, SlideTransition
-from kivy.core.window import Window
+from kivy.logger import Logger
 from kivy.metrics import dp
 from kivy.utils import platform
 
-# Import local modules
-from screens.login_screen import LoginScreen
-from screens.profile_screen import ProfileScreen
-from screens.insights_screen import InsightsScreen
-from screens.tips_screen import TipsScreen
-from screens.settings_screen import SettingsScreen
-from screens.privacy_dashboard import PrivacyDashboardScreen
-from screens.data_management import DataManagementScreen
-from screens.track_behavior import TrackBehaviorScreen
-
 from models.data_manager import SQLiteManager
 from models.secure_manager import SecureDataManager
 from models.privacy_manager import PrivacyManager
+from models.observation_journal import ObservationJournal
+from models.backup_scheduler import BackupScheduler
+from screens.chart_cache import ChartCache, CHART_CACHE_DIR
+
+# Screen name -> (module, class). Screens are imported and built on first
+# navigation so the login screen appears without loading the others.
+SCREENS = {
+    'login': ('screens.login_screen', 'LoginScreen'),
+    'profile': ('screens.profile_screen', 'ProfileScreen'),
+    'insights': ('screens.insights_screen', 'InsightsScreen'),
+    'tips': ('screens.tips_screen', 'TipsScreen'),
+    'settings': ('screens.settings_screen', 'SettingsScreen'),
+    'privacy': ('screens.privacy_dashboard', 'PrivacyDashboardScreen'),
+    'data_management': ('screens.data_management', 'DataManagementScreen'),
+    'track_behavior': ('screens.track_behavior', 'TrackBehaviorScreen'),
+    'batch_observation': ('screens.batch_observation', 'BatchObservationScreen'),
+}
 
-# Set window size to mobile phone dimensions for desktop testing
-if platform != 'android' and platform != 'ios':
-    Window.size = (400, 700)
-    Window.clearcolor = (0.95, 0.95, 0.95, 1)
+class LazyScreenManager(ScreenManager):
+    """Screen manager that builds registered screens the first time they are needed"""
+    
+    def __init__(self, registry, on_screen_created, **kwargs):
+        super().__init__(**kwargs)
+        self.registry = registry
+        self.on_screen_created = on_screen_created
+    
+    def get_screen(self, name):
+        """Get a screen by name, building it if it has not been created yet"""
+        if name in self.registry and not self.has_screen(name):
+            module_name, class_name = self.registry[name]
+            screen_class = getattr(importlib.import_module(module_name), class_name)
+            
+            screen = screen_class(name=name)
+            self.add_widget(screen)
+            self.on_screen_created(screen)
+        
+        return super().get_screen(name)
 
 class ChildInsightApp(App):
     """Main application class for Child Insight & Growth Tracker"""
@@ -37,37 +66,125 @@ class ChildInsightApp(App):
         # Apply data retention policy on startup
         self.db_manager.apply_retention_policy()
         
-        # Create screen manager
-        sm = ScreenManager(transition=SlideTransition())
+        self._start_observation_journal()
+        self._start_backup_scheduler()
         
-        # Add screens
-        sm.add_widget(LoginScreen(name='login'))
-        sm.add_widget(ProfileScreen(name='profile'))
-        sm.add_widget(InsightsScreen(name='insights'))
-        sm.add_widget(TipsScreen(name='tips'))
-        sm.add_widget(SettingsScreen(name='settings'))
-        sm.add_widget(PrivacyDashboardScreen(name='privacy'))
-        sm.add_widget(DataManagementScreen(name='data_management'))
-        sm.add_widget(TrackBehaviorScreen(name='track_behavior'))
-        
-        # Initialize screens with data managers
-        for screen in sm.screens:
-            if hasattr(screen, 'initialize'):
-                screen.initialize(self.db_manager, self.secure_manager, self.privacy_manager)
+        # Create screen manager; only the login screen is built up front
+        sm = LazyScreenManager(SCREENS, self._initialize_screen, transition=SlideTransition())
+        sm.current = 'login'
         
         return sm
     
+    def _start_observation_journal(self):
+        """Start the journal that saves observations in the background"""
+        # This also replays any observations left unsaved by a previous run
+        self.observation_journal = ObservationJournal(self.db_manager.db_path)
+        self.observation_journal.start()
+    
+    def _start_backup_scheduler(self):
+        """Start the scheduler that runs automatic backups when due, on its own connection"""
+        self.backup_scheduler = BackupScheduler(self.db_manager.db_path, self.secure_manager.backup_dir)
+        self.backup_scheduler.start()
+    
+    def reset_all_data(self) -> bool:
+        """Factory reset: delete all data with no background connection left open"""
+        # A worker's open connection would keep seeing the deleted data and
+        # write into the new database's write-ahead log
+        scheduler_stopped = self.backup_scheduler.close()
+        journal_stopped = self.observation_journal.close()
+        
+        if not (scheduler_stopped and journal_stopped):
+            # Nothing is deleted. A worker still running keeps its instance,
+            # so no second one starts beside it; the other is restarted
+            if scheduler_stopped:
+                self._start_backup_scheduler()
+            if journal_stopped:
+                self._start_observation_journal()
+            return False
+        
+        # Queued observations belong to the deleted data
+        if os.path.exists(self.observation_journal.journal_path):
+            os.remove(self.observation_journal.journal_path)
+        
+        success = self.secure_manager.delete_all_data()
+        self.db_manager = self.secure_manager.db_manager
+        self.privacy_manager = PrivacyManager(self.db_manager)
+        
+        # Screens built so far still hold the closed connection
+        for screen in self.root.screens:
+            if hasattr(screen, 'db_manager'):
+                screen.db_manager = self.db_manager
+                screen.privacy_manager = self.privacy_manager
+        
+        # Rendered charts show the children's data too; the chart_disk_cache
+        # setting is gone with the rest, so charts are cached in memory only
+        shutil.rmtree(CHART_CACHE_DIR, ignore_errors=True)
+        if self.root.has_screen('insights'):
+            self.root.get_screen('insights').chart_cache = ChartCache()
+        
+        self._start_observation_journal()
+        self._start_backup_scheduler()
+        return success
+    
+    def prune_chart_cache(self):
+        """Drop cached charts of profiles that no longer exist, in memory and on disk"""
+        profile_ids = self.db_manager.get_profile_ids()
+        
+        if self.root.has_screen('insights'):
+            self.root.get_screen('insights').chart_cache.prune(profile_ids)
+        
+        # Files from an earlier run are there even while the screen's cache is memory-only
+        if os.path.isdir(CHART_CACHE_DIR):
+            ChartCache(cache_dir=CHART_CACHE_DIR).prune(profile_ids)
+    
+    def _initialize_screen(self, screen):
+        """Initialize a newly created screen with data managers"""
+        if hasattr(screen, 'initialize'):
+            screen.initialize(self.db_manager, self.secure_manager, self.privacy_manager)
+    
+    def on_start(self):
+        """Handle app start event"""
+        from kivy.core.window import Window
+        Window.bind(on_flip=self._on_first_frame)
+    
+    def _on_first_frame(self, window):
+        """Log time-to-first-frame once the first frame has been drawn"""
+        window.unbind(on_flip=self._on_first_frame)
+        elapsed = (time.perf_counter() - _process_start) * 1000
+        Logger.info(f"ChildInsight: first frame after {elapsed:.0f} ms")
+    
     def on_pause(self):
         """Handle app pause event"""
+        # The OS may kill a paused app; give queued observations a moment to land
+        self.observation_journal.sync(timeout=2.0)
+        
+        # Don't keep password-derived keys around while in the background
+        self.secure_manager.clear_key_cache()
+        self.backup_scheduler.pause()
         return True
     
     def on_resume(self):
         """Handle app resume event"""
-        pass
+        # Catch up on a backup that fell due while paused
+        self.backup_scheduler.resume()
     
     def on_stop(self):
         """Handle app stop event - clean up resources"""
+        for screen in self.root.screens:
+            if hasattr(screen, 'shutdown'):
+                screen.shutdown()
+        
+        self.backup_scheduler.close()
+        self.observation_journal.close()
         self.db_manager.close()
 
 if __name__ == '__main__':
+    # Set window size to mobile phone dimensions for desktop testing.
+    # Kept out of module scope so chart worker processes, which re-import
+    # this module, never open a window.
+    if platform != 'android' and platform != 'ios':
+        from kivy.core.window import Window
+        Window.size = (400, 700)
+        Window.clearcolor = (0.95, 0.95, 0.95, 1)
+    
     ChildInsightApp().run()
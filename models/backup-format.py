@@ -0,0 +1,443 @@
+import os
+import hmac
+import json
+import lzma
+import random
+import zlib
+import struct
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# Backup container layout:
+#
+#   MAGIC | header length (u32) | header (JSON) | frame*
+#   frame = ciphertext length (u32) | final flag (u8) | nonce (12 bytes) | ciphertext + tag
+#
+# The payload is optionally compressed as a whole stream (header
+# "compression") before being split into frames. Every frame is
+# authenticated together with a digest of the header, its sequence number
+# and its final flag, so frames cannot be reordered, dropped or moved
+# between files, and a file cut short (no final frame) is detected.
+# Unencrypted containers (cipher "none") store frames without nonce or tag.
+#
+# Containers whose header has "trailer" end with an integrity manifest:
+#
+#   TRAILER_MAGIC | trailer (JSON) | MAC (32 bytes) | trailer length (u32)
+#
+# The trailer lists every frame's offset, size and SHA-256 plus row counts,
+# and its MAC (keyed from the data key; a plain SHA-256 when unencrypted)
+# covers the header digest too, so a backup can be checked frame by frame,
+# or by sampling frames, without decrypting anything.
+MAGIC = b'CIGBAK\x00\x01'
+TRAILER_MAGIC = b'CIGTRL\x00\x01'
+MAC_SIZE = 32
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_SIZE = 256 * 1024
+NONCE_SIZE = 12
+TAG_SIZE = 16
+MAX_HEADER_SIZE = 64 * 1024
+
+COMPRESSION_METHODS = ('none', 'zlib', 'lzma')
+
+_LENGTH = struct.Struct('>I')
+_FRAME_HEADER = struct.Struct('>IB')
+_FRAME_AAD = struct.Struct('>QB')
+
+def is_backup_container(file_path: str) -> bool:
+    """Check whether a file starts with the backup container magic"""
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def _trailer_key(key: bytes) -> bytes:
+    """Derive the trailer MAC key from a container's data key"""
+    return hashlib.sha256(b'backup-trailer' + key).digest()
+
+def _trailer_mac(mac_key: bytes, header_digest: bytes, trailer_bytes: bytes) -> bytes:
+    """MAC the trailer together with the header it belongs to (a plain digest without a key)"""
+    if mac_key is None:
+        return hashlib.sha256(header_digest + trailer_bytes).digest()
+    return hmac.new(mac_key, header_digest + trailer_bytes, hashlib.sha256).digest()
+
+def _compressor(method: str):
+    """Get a streaming compressor for a compression method (None for 'none')"""
+    if method == 'zlib':
+        return zlib.compressobj(6)
+    if method == 'lzma':
+        # Preset 3 keeps compressor memory modest on phones
+        return lzma.LZMACompressor(preset=3)
+    if method == 'none':
+        return None
+    raise ValueError(f"Unsupported compression: {method}")
+
+def _decompressor(method: str):
+    """Get a streaming decompressor for a compression method (None for 'none')"""
+    if method == 'zlib':
+        return zlib.decompressobj()
+    if method == 'lzma':
+        return lzma.LZMADecompressor()
+    if method == 'none':
+        return None
+    raise ValueError(f"Unsupported compression: {method}")
+
+class BackupWriter:
+    """Compresses and encrypts a stream into fixed-size AES-GCM frames as it is written.
+    
+    With workers > 1, chunks are encrypted on a thread pool (the AES-GCM
+    calls release the GIL) while frames are still written in sequence
+    order. At most two chunks per worker are in flight, so memory stays
+    bounded. A key of None writes an unencrypted container.
+    """
+    
+    def __init__(self, f, key: bytes, header: Dict, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 workers: int = 1, compression: str = 'none'):
+        """Write the container header to f; header holds whatever the reader needs (e.g. KDF parameters)"""
+        self.f = f
+        self.chunk_size = chunk_size
+        self._aead = AESGCM(key) if key else None
+        self._compressor = _compressor(compression)
+        self._buffer = bytearray()
+        self._sequence = 0
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='BackupWriter') if workers > 1 else None
+        self._pending = deque()
+        self._max_pending = workers * 2
+        self._mac_key = _trailer_key(key) if key else None
+        self._frame_index = []  # [offset, size, sha256] per frame, for the trailer
+        
+        header = dict(
+            header,
+            format=FORMAT_VERSION,
+            cipher='aes-256-gcm' if key else 'none',
+            compression=compression,
+            chunk_size=chunk_size,
+            trailer=True
+        )
+        header_bytes = json.dumps(header, separators=(',', ':')).encode()
+        self._header_digest = hashlib.sha256(header_bytes).digest()
+        
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(header_bytes)))
+        f.write(header_bytes)
+        self._offset = len(MAGIC) + _LENGTH.size + len(header_bytes)
+    
+    def write(self, data: bytes):
+        """Add plaintext, writing out every full chunk"""
+        if self._compressor:
+            data = self._compressor.compress(data)
+        self._buffer += data
+        self._write_full_chunks()
+    
+    def close(self, info: Dict = None):
+        """Write the remaining plaintext as the final frame, wait for all frames and write the trailer.
+        
+        info is added to the trailer (e.g. {'rows': {...}}).
+        """
+        try:
+            if self._compressor:
+                self._buffer += self._compressor.flush()
+                self._write_full_chunks()
+            
+            self._write_frame(bytes(self._buffer), final=True)
+            self._buffer = bytearray()
+            
+            while self._pending:
+                self._emit(*self._pending.popleft().result())
+            
+            trailer_bytes = json.dumps(
+                dict(info or {}, frames=self._frame_index),
+                separators=(',', ':')
+            ).encode()
+            
+            self.f.write(TRAILER_MAGIC)
+            self.f.write(trailer_bytes)
+            self.f.write(_trailer_mac(self._mac_key, self._header_digest, trailer_bytes))
+            self.f.write(_LENGTH.pack(len(trailer_bytes)))
+        finally:
+            self.abort()
+    
+    def abort(self):
+        """Stop the encryption workers without writing anything further"""
+        self._pending.clear()
+        if self._executor:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+    
+    def _write_full_chunks(self):
+        """Write out buffered data one chunk per frame"""
+        # Keep at least one byte back so the final frame is never empty
+        # unless the whole stream is
+        while len(self._buffer) > self.chunk_size:
+            self._write_frame(bytes(self._buffer[:self.chunk_size]), final=False)
+            del self._buffer[:self.chunk_size]
+    
+    def _write_frame(self, chunk: bytes, final: bool):
+        """Encrypt one frame, inline or on the pool, and write out whatever is ready"""
+        sequence = self._sequence
+        self._sequence += 1
+        
+        if self._executor is None:
+            self._emit(*self._encrypt(chunk, sequence, final))
+            return
+        
+        self._pending.append(self._executor.submit(self._encrypt, chunk, sequence, final))
+        
+        # Write finished frames in order once enough are in flight
+        while len(self._pending) >= self._max_pending:
+            self._emit(*self._pending.popleft().result())
+    
+    def _encrypt(self, chunk, sequence, final):
+        """Encrypt one chunk; returns (final, nonce, ciphertext)"""
+        if self._aead is None:
+            return final, b'', chunk
+        
+        nonce = os.urandom(NONCE_SIZE)
+        aad = self._header_digest + _FRAME_AAD.pack(sequence, final)
+        return final, nonce, self._aead.encrypt(nonce, chunk, aad)
+    
+    def _emit(self, final, nonce, ciphertext):
+        """Write one encrypted frame and add it to the trailer's frame index"""
+        frame_header = _FRAME_HEADER.pack(len(ciphertext), final)
+        digest = hashlib.sha256(frame_header)
+        digest.update(nonce)
+        digest.update(ciphertext)
+        
+        self.f.write(frame_header)
+        self.f.write(nonce)
+        self.f.write(ciphertext)
+        
+        size = len(frame_header) + len(nonce) + len(ciphertext)
+        self._frame_index.append([self._offset, size, digest.hexdigest()])
+        self._offset += size
+
+class BackupReader:
+    """Reads a backup container, decrypting and decompressing one frame at a time"""
+    
+    def __init__(self, f):
+        """Read and parse the container header from f"""
+        self.f = f
+        
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a backup container")
+        
+        header_length = _LENGTH.unpack(self._read_exact(_LENGTH.size))[0]
+        if header_length > MAX_HEADER_SIZE:
+            raise ValueError("Invalid backup header")
+        
+        header_bytes = self._read_exact(header_length)
+        self._header_digest = hashlib.sha256(header_bytes).digest()
+        self._data_start = len(MAGIC) + _LENGTH.size + header_length
+        self.header = json.loads(header_bytes)
+        
+        if self.header.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported backup format: {self.header.get('format')}")
+        
+        self.chunk_size = self.header['chunk_size']
+        self.encrypted = self.header.get('cipher') != 'none'
+        self.compression = self.header.get('compression', 'none')
+        self.has_trailer = bool(self.header.get('trailer'))
+        
+        if self.encrypted and self.header.get('cipher') != 'aes-256-gcm':
+            raise ValueError(f"Unsupported backup cipher: {self.header.get('cipher')}")
+    
+    def chunks(self, key: bytes = None, workers: int = 1) -> Iterator[bytes]:
+        """Yield the decompressed payload in order, verifying each frame"""
+        decompressor = _decompressor(self.compression)
+        
+        for chunk in self.frame_payloads(key, workers):
+            if not decompressor:
+                yield chunk
+                continue
+            
+            # Decompress at most a chunk's worth at a time, since one frame
+            # of well-compressed data can expand many times over
+            data = decompressor.decompress(chunk, self.chunk_size)
+            while data:
+                yield data
+                if not isinstance(decompressor, lzma.LZMADecompressor):
+                    data = decompressor.decompress(decompressor.unconsumed_tail, self.chunk_size)
+                elif decompressor.needs_input or decompressor.eof:
+                    data = b''
+                else:
+                    data = decompressor.decompress(b'', self.chunk_size)
+        
+        if decompressor and not decompressor.eof:
+            raise ValueError("Backup file is truncated")
+    
+    def frame_payloads(self, key: bytes = None, workers: int = 1) -> Iterator[bytes]:
+        """Yield the decrypted (still compressed) frame payloads in order.
+        
+        With workers > 1, frames are decrypted on a thread pool with a
+        bounded number in flight.
+        """
+        if not self.encrypted:
+            for _, _, _, payload in self._frames():
+                yield payload
+            return
+        
+        if key is None:
+            raise ValueError("Password required for encrypted file")
+        
+        aead = AESGCM(key)
+        
+        if workers <= 1:
+            for frame in self._frames():
+                yield self._decrypt(aead, *frame)
+            return
+        
+        with ThreadPoolExecutor(workers, thread_name_prefix='BackupReader') as executor:
+            pending = deque()
+            
+            try:
+                for frame in self._frames():
+                    pending.append(executor.submit(self._decrypt, aead, *frame))
+                    if len(pending) >= workers * 2:
+                        yield pending.popleft().result()
+                
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+    
+    def _frames(self):
+        """Read frames in order, yielding (sequence, final, nonce, ciphertext)"""
+        max_length = self.chunk_size + (TAG_SIZE if self.encrypted else 0)
+        nonce_size = NONCE_SIZE if self.encrypted else 0
+        sequence = 0
+        digests = []
+        
+        while True:
+            frame_header = self.f.read(_FRAME_HEADER.size)
+            if not frame_header:
+                raise ValueError("Backup file is truncated")
+            
+            length, final = _FRAME_HEADER.unpack(self._read_exact(_FRAME_HEADER.size, frame_header))
+            if length > max_length:
+                raise ValueError("Invalid password or corrupted file")
+            
+            nonce = self._read_exact(nonce_size)
+            ciphertext = self._read_exact(length)
+            
+            if self.has_trailer:
+                digest = hashlib.sha256(frame_header)
+                digest.update(nonce)
+                digest.update(ciphertext)
+                digests.append(digest.hexdigest())
+            
+            yield sequence, final, nonce, ciphertext
+            
+            if final:
+                if self.has_trailer:
+                    self._check_trailer_digests(digests)
+                elif self.f.read(1):
+                    raise ValueError("Unexpected data after the end of the backup")
+                return
+            
+            sequence += 1
+    
+    def _check_trailer_digests(self, digests):
+        """Check the trailer that follows the final frame lists the frames just read"""
+        trailer_bytes, _ = self._parse_trailer(self.f.read())
+        frames = json.loads(trailer_bytes).get('frames', [])
+        
+        if [frame[2] for frame in frames] != digests:
+            raise ValueError("Backup integrity manifest does not match the file")
+    
+    def verify(self, key: bytes = None, sample: int = None) -> Dict:
+        """Check the file against its integrity manifest without decrypting any frame.
+        
+        Every frame is hashed (or a random sample of sample frames, plus the
+        final one), and the manifest's MAC is checked when the key of an
+        encrypted backup is given. Raises ValueError on any mismatch;
+        returns {'frames', 'checked', 'authenticated', 'rows'}.
+        """
+        if not self.has_trailer:
+            raise ValueError("Backup has no integrity manifest")
+        
+        end = self.f.seek(0, os.SEEK_END)
+        if end < self._data_start + _LENGTH.size:
+            raise ValueError("Backup file is truncated")
+        
+        self.f.seek(end - _LENGTH.size)
+        trailer_length = _LENGTH.unpack(self._read_exact(_LENGTH.size))[0]
+        trailer_start = end - _LENGTH.size - MAC_SIZE - trailer_length - len(TRAILER_MAGIC)
+        if trailer_start < self._data_start:
+            raise ValueError("Backup file is truncated")
+        
+        self.f.seek(trailer_start)
+        trailer_bytes, mac = self._parse_trailer(self.f.read())
+        
+        # Without the key an encrypted backup's manifest can only be checked
+        # for consistency with the file, not for authenticity
+        authenticated = False
+        if not self.encrypted or key is not None:
+            mac_key = _trailer_key(key) if self.encrypted else None
+            if not hmac.compare_digest(mac, _trailer_mac(mac_key, self._header_digest, trailer_bytes)):
+                raise ValueError("Invalid password or corrupted file")
+            authenticated = self.encrypted
+        
+        trailer = json.loads(trailer_bytes)
+        frames = trailer.get('frames', [])
+        
+        # Frames must tile the file from the header to the trailer
+        offset = self._data_start
+        for frame_offset, size, _ in frames:
+            if frame_offset != offset:
+                raise ValueError("Backup integrity manifest does not match the file")
+            offset += size
+        if not frames or offset != trailer_start:
+            raise ValueError("Backup integrity manifest does not match the file")
+        
+        indexes = range(len(frames))
+        if sample is not None and sample < len(frames):
+            indexes = sorted(random.sample(range(len(frames) - 1), sample) + [len(frames) - 1])
+        
+        for index in indexes:
+            frame_offset, size, expected = frames[index]
+            self.f.seek(frame_offset)
+            data = self._read_exact(size)
+            
+            final = _FRAME_HEADER.unpack(data[:_FRAME_HEADER.size])[1]
+            if (hashlib.sha256(data).hexdigest() != expected
+                    or bool(final) != (index == len(frames) - 1)):
+                raise ValueError(f"Backup frame {index} is corrupted")
+        
+        return {
+            'frames': len(frames),
+            'checked': len(indexes),
+            'authenticated': authenticated,
+            'rows': trailer.get('rows')
+        }
+    
+    def _parse_trailer(self, data: bytes):
+        """Split what follows the final frame into (trailer JSON, MAC)"""
+        minimum = len(TRAILER_MAGIC) + MAC_SIZE + _LENGTH.size
+        if len(data) < minimum or not data.startswith(TRAILER_MAGIC):
+            raise ValueError("Backup file is truncated")
+        
+        trailer_length = _LENGTH.unpack(data[-_LENGTH.size:])[0]
+        if len(data) != minimum + trailer_length:
+            raise ValueError("Backup integrity manifest does not match the file")
+        
+        trailer_bytes = data[len(TRAILER_MAGIC):len(TRAILER_MAGIC) + trailer_length]
+        mac = data[len(TRAILER_MAGIC) + trailer_length:-_LENGTH.size]
+        return trailer_bytes, mac
+    
+    def _decrypt(self, aead, sequence, final, nonce, ciphertext) -> bytes:
+        """Decrypt and verify one frame"""
+        aad = self._header_digest + _FRAME_AAD.pack(sequence, final)
+        try:
+            return aead.decrypt(nonce, ciphertext, aad)
+        except InvalidTag:
+            raise ValueError("Invalid password or corrupted file")
+    
+    def _read_exact(self, size: int, prefix: bytes = b'') -> bytes:
+        """Read exactly size bytes (including an already read prefix)"""
+        data = prefix + self.f.read(size - len(prefix))
+        if len(data) != size:
+            raise ValueError("Backup file is truncated")
+        return data
@@ -0,0 +1,263 @@
+import os
+import sys
+import time
+import datetime
+import threading
+import logging
+from typing import Callable, Optional
+
+from .data_manager import SQLiteManager
+from .secure_manager import SecureDataManager
+from .privacy_manager import PrivacyManager
+
+logger = logging.getLogger(__name__)
+
+# How long after the last scheduled backup the next one is due
+BACKUP_INTERVALS = {
+    'daily': datetime.timedelta(days=1),
+    'weekly': datetime.timedelta(weeks=1),
+    'monthly': datetime.timedelta(days=30),
+}
+DEFAULT_FREQUENCY = 'weekly'
+
+# Niceness of the worker thread where threads can be deprioritized (Linux, Android)
+BACKGROUND_NICENESS = 10
+
+def next_backup_due(db_manager: SQLiteManager) -> Optional[datetime.datetime]:
+    """Get when the next automatic backup is due, or None if auto backup is off.
+    
+    Computed from the latest scheduled backup in the backups table and the
+    backup_frequency privacy setting; a time in the past means overdue.
+    """
+    privacy_manager = PrivacyManager(db_manager)
+    if privacy_manager.get_privacy_setting('auto_backup', 'false') != 'true':
+        return None
+    
+    frequency = privacy_manager.get_privacy_setting('backup_frequency', DEFAULT_FREQUENCY)
+    interval = BACKUP_INTERVALS.get(frequency, BACKUP_INTERVALS[DEFAULT_FREQUENCY])
+    
+    latest = db_manager.get_latest_backup()
+    if not latest:
+        return datetime.datetime.now()
+    
+    try:
+        return datetime.datetime.fromisoformat(latest['timestamp']) + interval
+    except (TypeError, ValueError):
+        return datetime.datetime.now()
+
+class BackupScheduler:
+    """Runs automatic backups on a background thread when they are due.
+    
+    The worker keeps its own database connection and SecureDataManager, runs
+    at low priority and sleeps until the next backup is due (see
+    next_backup_due) or until woken by run_now(), reschedule() or resume().
+    Nothing is started while paused; on resume an overdue backup is made
+    once, however many periods were missed. Listeners are called on the
+    worker thread as listener(event, detail) with event 'started',
+    'progress' (detail is the fraction done), 'finished' (the result
+    message) or 'failed' (the error message).
+    """
+    
+    def __init__(self, db_path: str = "child_insight.db", backup_dir: str = "backups",
+                 check_interval: float = 900.0, retry_delay: float = 900.0,
+                 startup_delay: float = 30.0, yield_delay: float = 0.005):
+        """Initialize the scheduler; call start() to begin.
+        
+        check_interval caps how long the worker sleeps before looking at the
+        settings again, retry_delay is the wait after a failed backup and
+        startup_delay keeps the first backup away from app startup.
+        yield_delay is slept at each progress step so the UI thread gets
+        the interpreter while a backup runs.
+        """
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.check_interval = check_interval
+        self.retry_delay = retry_delay
+        self.startup_delay = startup_delay
+        self.yield_delay = yield_delay
+        
+        self._wake = threading.Condition()
+        self._woken = False
+        self._run_requested = False
+        self._paused = False
+        self._stopping = False
+        self._busy = False
+        self._retry_at = 0.0
+        self._listeners = []
+        self._thread = None
+        self._secure_manager = None
+    
+    def start(self):
+        """Start the worker thread"""
+        self._thread = threading.Thread(target=self._run, name="BackupScheduler", daemon=True)
+        self._thread.start()
+    
+    def close(self, timeout: float = 5.0) -> bool:
+        """Stop the worker, abandoning a backup in progress; returns False if it is still running"""
+        if not self._thread:
+            return True
+        
+        with self._wake:
+            self._stopping = True
+            self._wake.notify_all()
+        
+        self._thread.join(timeout)
+        stopped = not self._thread.is_alive()
+        self._thread = None
+        return stopped
+    
+    def pause(self):
+        """Hold off scheduled backups while the app is in the background"""
+        with self._wake:
+            self._paused = True
+        
+        # Don't keep password-derived keys around while in the background
+        if self._secure_manager:
+            self._secure_manager.clear_key_cache()
+    
+    def resume(self):
+        """Allow scheduled backups again, catching up at once if one became due"""
+        with self._wake:
+            self._paused = False
+            self._woken = True
+            self._wake.notify_all()
+    
+    def reschedule(self):
+        """Recompute the next due time (after the backup settings changed)"""
+        with self._wake:
+            self._woken = True
+            self._retry_at = 0.0
+            self._wake.notify_all()
+    
+    def run_now(self):
+        """Make a backup in the background as soon as possible, even if none is due"""
+        with self._wake:
+            self._run_requested = True
+            self._wake.notify_all()
+    
+    def is_busy(self) -> bool:
+        """Check whether a backup is being made or requested"""
+        with self._wake:
+            return self._busy or self._run_requested
+    
+    def add_listener(self, listener: Callable[[str, object], None]):
+        """Call listener(event, detail) on the worker thread for backup events"""
+        with self._wake:
+            self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[str, object], None]):
+        """Stop calling a listener"""
+        with self._wake:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+    
+    def _run(self):
+        """Worker thread: sleep until a backup is due or requested, then make it"""
+        self._lower_priority()
+        
+        with self._wake:
+            self._wake.wait_for(lambda: self._stopping or self._run_requested,
+                                timeout=self.startup_delay)
+            if self._stopping:
+                return
+        
+        db_manager = SQLiteManager(self.db_path)
+        self._secure_manager = SecureDataManager(db_manager, self.backup_dir)
+        
+        try:
+            # A backup reads the database for a while; in WAL mode that never
+            # blocks the UI's writes
+            db_manager.conn.execute("PRAGMA journal_mode=WAL")
+            
+            # Pick up backup files added or removed outside the app
+            try:
+                self._secure_manager.reconcile_backups()
+            except Exception as e:
+                logger.warning(f"BackupScheduler: reconciling the backup catalog failed: {e}")
+            
+            while True:
+                with self._wake:
+                    if self._stopping:
+                        break
+                    requested = self._run_requested
+                    paused = self._paused
+                    self._woken = False
+                
+                wait = self.check_interval
+                if requested:
+                    self._backup()
+                elif not paused:
+                    wait = self._seconds_until_due(db_manager)
+                    if wait <= 0:
+                        self._backup()
+                        wait = self.check_interval
+                
+                with self._wake:
+                    self._wake.wait_for(
+                        lambda: self._stopping or self._run_requested or self._woken,
+                        timeout=max(wait, 1.0)
+                    )
+        finally:
+            self._secure_manager = None
+            db_manager.close()
+    
+    def _seconds_until_due(self, db_manager) -> float:
+        """Get the seconds until the next backup is due, capped at check_interval"""
+        due = next_backup_due(db_manager)
+        if due is None:
+            return self.check_interval
+        
+        seconds = (due - datetime.datetime.now()).total_seconds()
+        seconds = max(seconds, self._retry_at - time.monotonic())
+        return min(seconds, self.check_interval)
+    
+    def _backup(self):
+        """Make one backup, reporting to the listeners"""
+        with self._wake:
+            self._run_requested = False
+            self._busy = True
+        
+        self._notify('started', None)
+        try:
+            result = self._secure_manager.create_scheduled_backup(
+                progress=self._on_progress,
+                should_cancel=lambda: self._stopping
+            )
+        except Exception as e:
+            logger.warning(f"BackupScheduler: backup failed: {e}")
+            self._retry_at = time.monotonic() + self.retry_delay
+            self._notify('failed', str(e))
+        else:
+            self._retry_at = 0.0
+            self._notify('finished', result)
+        finally:
+            with self._wake:
+                self._busy = False
+    
+    def _on_progress(self, done: int, total: int):
+        """Pass backup progress on to the listeners, then let the UI thread run"""
+        self._notify('progress', done / total if total else 1.0)
+        time.sleep(self.yield_delay)
+    
+    def _notify(self, event: str, detail):
+        """Call every listener, never letting one break the worker"""
+        with self._wake:
+            listeners = list(self._listeners)
+        
+        for listener in listeners:
+            try:
+                listener(event, detail)
+            except Exception as e:
+                logger.warning(f"BackupScheduler: listener failed on {event}: {e}")
+    
+    @staticmethod
+    def _lower_priority():
+        """Run the calling thread at background priority where the OS supports it"""
+        if not sys.platform.startswith('linux') or not hasattr(os, 'setpriority'):
+            return
+        
+        try:
+            # On Linux a thread id addresses just that thread
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), BACKGROUND_NICENESS)
+        except OSError:
+            pass
@@ -0,0 +1,297 @@
+import os
+import hmac
+import json
+import lzma
+import zlib
+import random
+import hashlib
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+# Deduplicated backups:
+#
+#   <store>/<id[:2]>/<id>   one file per distinct chunk of export data
+#   backup_*.json           a manifest listing the chunk ids of one backup
+#
+# Chunk boundaries are picked from the content (after export lines whose
+# checksum hits a target pattern), so a row added or removed only changes
+# the chunk around it and every other chunk is shared with earlier backups.
+# Ids are keyed hashes of the plaintext, so equal chunks get equal ids
+# without the ids revealing anything about the data.
+# A chunk file is: compression code (u8) | nonce (12 bytes) | ciphertext + tag
+#
+# Manifests also record the SHA-256 of each stored chunk file and row counts,
+# under a MAC keyed from the store key, so a backup can be verified by
+# hashing (or sampling) its chunk files without decrypting them.
+MANIFEST_FORMAT = 'chunk-manifest'
+MANIFEST_VERSION = 1
+NONCE_SIZE = 12
+
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+BOUNDARY_MASK = 0x7F  # about one boundary every 128 lines (~64 KiB of rows)
+
+_COMPRESSION_CODES = {'none': 0, 'zlib': 1, 'lzma': 2}
+
+def is_chunk_manifest(file_path: str) -> bool:
+    """Check whether a file is a deduplicated backup manifest"""
+    prefix = json.dumps({'format': MANIFEST_FORMAT}, separators=(',', ':'))[:-1]
+    with open(file_path, 'rb') as f:
+        return f.read(len(prefix)) == prefix.encode()
+
+def iter_content_chunks(pieces: Iterable[bytes], min_size: int = MIN_CHUNK_SIZE,
+                        max_size: int = MAX_CHUNK_SIZE) -> Iterator[bytes]:
+    """Split a stream of export lines into content-defined chunks"""
+    buffer = bytearray()
+    pending = b''
+    
+    for piece in pieces:
+        lines = (pending + piece).split(b'\n')
+        pending = lines.pop()
+        
+        for line in lines:
+            buffer += line + b'\n'
+            if len(buffer) >= max_size or (
+                    len(buffer) >= min_size and zlib.crc32(line) & BOUNDARY_MASK == 0):
+                yield bytes(buffer)
+                buffer = bytearray()
+    
+    buffer += pending
+    if buffer:
+        yield bytes(buffer)
+
+class ChunkStore:
+    """Directory of compressed, encrypted chunks addressed by a keyed hash of their content"""
+    
+    def __init__(self, root: str, key: Optional[bytes] = None):
+        """Open (creating if needed) the store at root with its 256-bit store key.
+        
+        Without the key, chunks can only be deleted (e.g. by garbage collection).
+        """
+        self.root = root
+        self._aead = AESGCM(key) if key else None
+        self._id_key = hashlib.sha256(b'chunk-id' + key).digest() if key else None
+        self._mac_key = hashlib.sha256(b'manifest-mac' + key).digest() if key else None
+        
+        os.makedirs(root, exist_ok=True)
+    
+    def chunk_id(self, chunk: bytes) -> str:
+        """Get the id of a chunk"""
+        if self._id_key is None:
+            raise ValueError("Password required for encrypted file")
+        return hmac.new(self._id_key, chunk, hashlib.sha256).hexdigest()
+    
+    def put(self, chunk: bytes, compression: str = 'zlib') -> Dict:
+        """Store a chunk unless already present.
+        
+        Returns {'id', 'size', 'stored', 'digest', 'new'}: the chunk id and
+        size, the size and SHA-256 of its file and whether this call wrote it.
+        """
+        chunk_id = self.chunk_id(chunk)
+        path = self._path(chunk_id)
+        
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Reused chunks count as fresh, so a sweep for unreferenced
+            # files (see iter_files) leaves them to the backup being made
+            os.utime(path)
+            return {
+                'id': chunk_id,
+                'size': len(chunk),
+                'stored': len(data),
+                'digest': hashlib.sha256(data).hexdigest(),
+                'new': False
+            }
+        
+        code = _COMPRESSION_CODES.get(compression)
+        if code is None:
+            raise ValueError(f"Unsupported compression: {compression}")
+        
+        if compression == 'zlib':
+            payload = zlib.compress(chunk, 6)
+        elif compression == 'lzma':
+            payload = lzma.compress(chunk, preset=3)
+        else:
+            payload = chunk
+        
+        nonce = os.urandom(NONCE_SIZE)
+        data = bytes([code]) + nonce + self._aead.encrypt(nonce, payload, self._aad(chunk_id, code))
+        
+        # Chunks are written once and never modified, so a crash can only
+        # leave a temporary file behind
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        
+        return {
+            'id': chunk_id,
+            'size': len(chunk),
+            'stored': len(data),
+            'digest': hashlib.sha256(data).hexdigest(),
+            'new': True
+        }
+    
+    def get(self, chunk_id: str) -> bytes:
+        """Read, decrypt and verify a chunk"""
+        try:
+            with open(self._path(chunk_id), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            raise ValueError(f"Backup chunk missing: {chunk_id}")
+        
+        if self._aead is None:
+            raise ValueError("Password required for encrypted file")
+        
+        code, nonce, ciphertext = data[0], data[1:1 + NONCE_SIZE], data[1 + NONCE_SIZE:]
+        try:
+            payload = self._aead.decrypt(nonce, ciphertext, self._aad(chunk_id, code))
+        except InvalidTag:
+            raise ValueError("Invalid password or corrupted file")
+        
+        if code == _COMPRESSION_CODES['zlib']:
+            chunk = zlib.decompress(payload)
+        elif code == _COMPRESSION_CODES['lzma']:
+            chunk = lzma.decompress(payload)
+        else:
+            chunk = payload
+        
+        if not hmac.compare_digest(self.chunk_id(chunk), chunk_id):
+            raise ValueError("Invalid password or corrupted file")
+        
+        return chunk
+    
+    def stored_size(self, chunk_id: str) -> int:
+        """Get the size of a chunk's file, or 0 if it is missing"""
+        try:
+            return os.path.getsize(self._path(chunk_id))
+        except FileNotFoundError:
+            return 0
+    
+    def delete(self, chunk_id: str) -> int:
+        """Delete a chunk file, returning the bytes freed"""
+        path = self._path(chunk_id)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return 0
+        return size
+    
+    def iter_files(self, min_age: float = 0.0) -> Iterator[Tuple[Optional[str], str]]:
+        """Yield (chunk id, path) for the files in the store not modified for min_age seconds.
+        
+        The chunk id is None for a temporary file left by an interrupted write.
+        """
+        cutoff = time.time() - min_age
+        
+        for shard in os.scandir(self.root):
+            if not shard.is_dir() or len(shard.name) != 2:
+                continue
+            
+            for entry in os.scandir(shard.path):
+                if not entry.is_file() or entry.stat().st_mtime > cutoff:
+                    continue
+                yield (None if entry.name.endswith('.tmp') else entry.name), entry.path
+    
+    def write_manifest(self, file_path: str, chunks: List[Dict], info: Dict = None):
+        """Write the manifest of a backup made of chunks (as returned by put), in order"""
+        manifest = {
+            'format': MANIFEST_FORMAT,
+            'version': MANIFEST_VERSION,
+            'store': os.path.relpath(self.root, os.path.dirname(os.path.abspath(file_path))),
+            'size': sum(chunk['size'] for chunk in chunks),
+            'chunks': [[chunk['id'], chunk['size'], chunk['digest']] for chunk in chunks]
+        }
+        if info:
+            manifest.update(info)
+        manifest['mac'] = self._manifest_mac(manifest)
+        
+        tmp_path = file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, file_path)
+    
+    def read_chunks(self, manifest: Dict) -> Iterator[bytes]:
+        """Yield the chunks of a backup from its manifest, in order"""
+        for chunk_id, size, _ in manifest['chunks']:
+            chunk = self.get(chunk_id)
+            if len(chunk) != size:
+                raise ValueError("Invalid password or corrupted file")
+            yield chunk
+    
+    @staticmethod
+    def read_manifest(file_path: str) -> Dict:
+        """Read a backup manifest"""
+        with open(file_path, 'r') as f:
+            manifest = json.load(f)
+        
+        if manifest.get('format') != MANIFEST_FORMAT or manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError("Invalid backup file format")
+        
+        return manifest
+    
+    def verify_manifest(self, manifest: Dict, sample: int = None) -> Dict:
+        """Check a backup's chunk files against its manifest without decrypting them.
+        
+        Every chunk file is hashed (or a random sample of sample chunks),
+        and the manifest's MAC is checked when the store key is known.
+        Raises ValueError on any mismatch; returns {'chunks', 'checked',
+        'authenticated', 'rows'}.
+        """
+        authenticated = False
+        if self._mac_key is not None:
+            if not hmac.compare_digest(manifest.get('mac', ''), self._manifest_mac(manifest)):
+                raise ValueError("Invalid password or corrupted file")
+            authenticated = True
+        
+        chunks = manifest['chunks']
+        if sum(size for _, size, _ in chunks) != manifest['size']:
+            raise ValueError("Backup integrity manifest does not match the file")
+        
+        indexes = range(len(chunks))
+        if sample is not None and sample < len(chunks):
+            indexes = sorted(random.sample(range(len(chunks)), sample))
+        
+        for index in indexes:
+            chunk_id, _, expected = chunks[index]
+            try:
+                with open(self._path(chunk_id), 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+            except FileNotFoundError:
+                raise ValueError(f"Backup chunk missing: {chunk_id}")
+            
+            if digest != expected:
+                raise ValueError(f"Backup chunk {index} is corrupted")
+        
+        return {
+            'chunks': len(chunks),
+            'checked': len(indexes),
+            'authenticated': authenticated,
+            'rows': manifest.get('rows')
+        }
+    
+    def _manifest_mac(self, manifest: Dict) -> str:
+        """MAC a manifest's contents (everything but the MAC itself)"""
+        if self._mac_key is None:
+            raise ValueError("Password required for encrypted file")
+        
+        content = {key: value for key, value in manifest.items() if key != 'mac'}
+        message = json.dumps(content, sort_keys=True, separators=(',', ':')).encode()
+        return hmac.new(self._mac_key, message, hashlib.sha256).hexdigest()
+    
+    def _path(self, chunk_id: str) -> str:
+        """Get the file path of a chunk"""
+        if len(chunk_id) != 64 or not all(c in '0123456789abcdef' for c in chunk_id):
+            raise ValueError(f"Invalid chunk id: {chunk_id}")
+        return os.path.join(self.root, chunk_id[:2], chunk_id)
+    
+    @staticmethod
+    def _aad(chunk_id: str, code: int) -> bytes:
+        """Bind a chunk's ciphertext to its id and compression"""
+        return bytes.fromhex(chunk_id) + bytes([code])
@@ -1,16 +1,36 @@
 import os
 import json
+import uuid
 import sqlite3
+import hashlib
 import datetime
 from dataclasses import asdict
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 
 from .enums import AgeGroup, TraitCategory
-from .data_classes import UserProfile, PersonalityInsight
+from .data_classes import UserProfile, PersonalityInsight, DevelopmentalTip
+from .tip_engine import get_tip_engine
 
 class SQLiteManager:
     """Manages local SQLite database for the application"""
     
+    # Tables whose changes are recorded for incremental backups
+    CHANGE_LOGGED_TABLES = ('profiles', 'insights')
+    
+    # Kinds of backup made by create_scheduled_backup
+    SCHEDULED_BACKUP_KINDS = ('full', 'incremental', 'snapshot')
+    
+    # Columns of the tables imports merge into, in _profile_row/_insight_row order
+    MERGE_COLUMNS = {
+        'profiles': ('id', 'name', 'age', 'age_group', 'profile_pic', 'created_at',
+                     'last_updated', 'data', 'content_hash'),
+        'insights': ('id', 'user_id', 'category', 'timestamp', 'confidence_score',
+                     'data', 'content_hash')
+    }
+    
+    # When a local row last changed, for detecting merge conflicts
+    MERGE_VERSION_COLUMNS = {'profiles': 'last_updated', 'insights': 'timestamp'}
+    
     def __init__(self, db_path="child_insight.db"):
         """Initialize database connection and create tables if they don't exist"""
         self.db_path = db_path
@@ -32,10 +52,17 @@ class SQLiteManager:
             profile_pic TEXT,
             created_at TEXT NOT NULL,
             last_updated TEXT NOT NULL,
-            data TEXT NOT NULL
+            data TEXT NOT NULL,
+            content_hash TEXT
         )
         ''')
         
+        # Profile lists are paged and searched by name
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_profiles_name
+        ON profiles (name COLLATE NOCASE)
+        ''')
+        
         # Insights table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS insights (
@@ -45,6 +72,38 @@ class SQLiteManager:
             timestamp TEXT NOT NULL,
             confidence_score REAL NOT NULL,
             data TEXT NOT NULL,
+            content_hash TEXT,
+            FOREIGN KEY (user_id) REFERENCES profiles (id)
+        )
+        ''')
+        
+        # Most insight lookups are per profile, newest first
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_insights_user_timestamp
+        ON insights (user_id, timestamp)
+        ''')
+        
+        # Older databases have an update trigger (log_<table>_update) that
+        # logs any update, content_hash included; drop it before the backfill
+        # so it doesn't log every row. Its replacement has a new name, so
+        # CREATE TRIGGER IF NOT EXISTS below cannot keep the old definition
+        for table in self.CHANGE_LOGGED_TABLES:
+            cursor.execute(f"DROP TRIGGER IF EXISTS log_{table}_update")
+        
+        # Rows saved before content hashes were kept get them now, so
+        # imports can tell unchanged rows apart without comparing data
+        for table in self.MERGE_COLUMNS:
+            self._add_missing_columns(cursor, table, {'content_hash': "TEXT"})
+            self._backfill_content_hashes(cursor, table)
+        
+        # Tips for each profile's latest insight, generated when insights change
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS profile_tips (
+            user_id TEXT PRIMARY KEY,
+            insight_id TEXT NOT NULL,
+            catalog_version INTEGER NOT NULL,
+            updated_at TEXT NOT NULL,
+            data TEXT NOT NULL,
             FOREIGN KEY (user_id) REFERENCES profiles (id)
         )
         ''')
@@ -57,17 +116,129 @@ class SQLiteManager:
         )
         ''')
         
-        # Backup history
+        # Backup history; scheduled backups form chains of a full backup
+        # followed by incrementals, each pointing at the one it builds on
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS backups (
             id TEXT PRIMARY KEY,
             timestamp TEXT NOT NULL,
             file_path TEXT NOT NULL,
             size INTEGER NOT NULL,
-            encrypted INTEGER NOT NULL
+            encrypted INTEGER NOT NULL,
+            kind TEXT NOT NULL DEFAULT 'export',
+            parent_id TEXT,
+            change_seq INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        
+        # Databases from before backup chains lack the chain columns; their
+        # backups count as standalone exports
+        self._add_missing_columns(cursor, 'backups', {
+            'kind': "TEXT NOT NULL DEFAULT 'export'",
+            'parent_id': "TEXT",
+            'change_seq': "INTEGER NOT NULL DEFAULT 0",
+            'file_size': "INTEGER",
+            'key_check': "TEXT"
+        })
+        
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_backups_timestamp ON backups (timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_backups_parent ON backups (parent_id)")
+        
+        # Chunks of the deduplicated backup store used by each backup, and
+        # how many backups use each chunk
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS backup_chunks (
+            backup_id TEXT NOT NULL,
+            chunk_id TEXT NOT NULL,
+            PRIMARY KEY (backup_id, chunk_id)
+        ) WITHOUT ROWID
+        ''')
+        
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS chunk_refs (
+            chunk_id TEXT PRIMARY KEY,
+            refcount INTEGER NOT NULL,
+            stored_size INTEGER NOT NULL,
+            store TEXT NOT NULL DEFAULT 'chunks'
+        )
+        ''')
+        
+        # Backups move to a new store directory when the backup password
+        # changes; chunks recorded before that are all in the first one
+        self._add_missing_columns(cursor, 'chunk_refs', {'store': "TEXT NOT NULL DEFAULT 'chunks'"})
+        
+        # Backup count and bytes on disk per backup kind, plus a 'chunks' row
+        # for the chunk store, kept up to date by triggers so the totals
+        # never need a scan
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'backup_stats'")
+        stats_exist = cursor.fetchone() is not None
+        
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS backup_stats (
+            name TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        )
+        ''')
+        
+        # Backups logged before file_size existed count their size
+        backup_size = 'COALESCE({row}.file_size, {row}.size)'
+        for name, event, body in (
+            ('backup_stats_insert', 'INSERT ON backups',
+             self._stats_add('NEW.kind', backup_size.format(row='NEW'), 1)),
+            ('backup_stats_delete', 'DELETE ON backups',
+             self._stats_add('OLD.kind', backup_size.format(row='OLD'), -1)),
+            ('backup_stats_update', 'UPDATE OF kind, size, file_size ON backups',
+             self._stats_add('OLD.kind', backup_size.format(row='OLD'), -1)
+             + self._stats_add('NEW.kind', backup_size.format(row='NEW'), 1)),
+            ('chunk_stats_insert', 'INSERT ON chunk_refs',
+             self._stats_add("'chunks'", 'NEW.stored_size', 1)),
+            ('chunk_stats_delete', 'DELETE ON chunk_refs',
+             self._stats_add("'chunks'", 'OLD.stored_size', -1)),
+        ):
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {name}
+            AFTER {event}
+            BEGIN
+                {body}
+            END
+            ''')
+        
+        if not stats_exist:
+            self._rebuild_backup_stats(cursor)
+        
+        # Latest change to each profile and insight, fed by triggers, so
+        # incremental backups can find what changed since a sequence number
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id TEXT NOT NULL
         )
         ''')
         
+        cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_change_log_row
+        ON change_log (table_name, row_id)
+        ''')
+        
+        for table in self.CHANGE_LOGGED_TABLES:
+            # Updates count only when the content changes (not e.g. when
+            # bookkeeping columns like content_hash are filled in)
+            for name, event, row in (('insert', 'INSERT', 'NEW'),
+                                     ('change', 'UPDATE OF data', 'NEW'),
+                                     ('delete', 'DELETE', 'OLD')):
+                # Re-inserting moves the row's entry to the newest sequence
+                # number (and stays correct under an outer OR IGNORE)
+                cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS log_{table}_{name}
+                AFTER {event} ON {table}
+                BEGIN
+                    DELETE FROM change_log WHERE table_name = '{table}' AND row_id = {row}.id;
+                    INSERT INTO change_log (table_name, row_id) VALUES ('{table}', {row}.id);
+                END
+                ''')
+        
         # Data retention policy
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS retention_policy (
@@ -91,22 +262,83 @@ class SQLiteManager:
         
         self.conn.commit()
     
+    @staticmethod
+    def _stats_add(name: str, size: str, sign: int) -> str:
+        """SQL for a trigger adding (sign 1) or removing (sign -1) one backup or chunk in backup_stats"""
+        op = '+' if sign > 0 else '-'
+        return f'''
+                INSERT OR IGNORE INTO backup_stats (name, count, size) VALUES ({name}, 0, 0);
+                UPDATE backup_stats SET count = count {op} 1, size = size {op} {size} WHERE name = {name};'''
+    
+    @staticmethod
+    def _rebuild_backup_stats(cursor):
+        """Recompute backup_stats from the backups and chunk_refs tables"""
+        cursor.execute("DELETE FROM backup_stats")
+        cursor.execute('''
+        INSERT INTO backup_stats (name, count, size)
+        SELECT kind, COUNT(*), SUM(COALESCE(file_size, size)) FROM backups GROUP BY kind
+        ''')
+        cursor.execute('''
+        INSERT INTO backup_stats (name, count, size)
+        SELECT 'chunks', COUNT(*), COALESCE(SUM(stored_size), 0) FROM chunk_refs
+        ''')
+    
+    @staticmethod
+    def _add_missing_columns(cursor, table: str, columns: Dict[str, str]):
+        """Add columns (name -> definition) that an older database's table lacks"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row['name'] for row in cursor.fetchall()}
+        
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+    
+    @staticmethod
+    def _backfill_content_hashes(cursor, table: str):
+        """Compute content hashes for rows that lack one"""
+        while True:
+            cursor.execute(f"SELECT id, data FROM {table} WHERE content_hash IS NULL LIMIT 500")
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            
+            cursor.executemany(
+                f"UPDATE {table} SET content_hash = ? WHERE id = ?",
+                [(SQLiteManager._content_hash(row['data']), row['id']) for row in rows]
+            )
+    
+    @staticmethod
+    def _content_hash(data_json: str) -> str:
+        """Get the content hash of a row's stored JSON"""
+        return hashlib.sha256(data_json.encode()).hexdigest()
+    
     def save_profile(self, profile: UserProfile):
         """Save a user profile to the database"""
         cursor = self.conn.cursor()
         
-        # Convert dataclass to dict, preserving the enum as string
-        profile_dict = asdict(profile)
+        cursor.execute('''
+        INSERT OR REPLACE INTO profiles 
+        (id, name, age, age_group, profile_pic, created_at, last_updated, data, content_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', self._profile_row(profile))
+        
+        # The age group decides which tips apply
+        self._refresh_profile_tips(cursor, profile.id)
+        
+        self.conn.commit()
+    
+    @staticmethod
+    def _profile_row(profile: UserProfile) -> tuple:
+        """Build the profiles table row for a profile"""
+        # Convert dataclass to dict, preserving the enum as string (fields
+        # are plain values, so a shallow copy serializes like asdict)
+        profile_dict = dict(vars(profile))
         profile_dict['age_group'] = profile_dict['age_group'].value
         
         # Store the complex data as JSON string
         data_json = json.dumps(profile_dict)
         
-        cursor.execute('''
-        INSERT OR REPLACE INTO profiles 
-        (id, name, age, age_group, profile_pic, created_at, last_updated, data)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        return (
             profile.id,
             profile.name,
             profile.age,
@@ -114,10 +346,256 @@ class SQLiteManager:
             profile.profile_pic,
             profile.created_at,
             datetime.datetime.now().isoformat(),
-            data_json
-        ))
+            data_json,
+            SQLiteManager._content_hash(data_json)
+        )
+    
+    def merge_records(self, records, replace_all: bool = False, since: str = None,
+                      overwrite_conflicts: bool = False, dry_run: bool = False,
+                      batch_size: int = 500, should_cancel=None) -> Optional[Dict]:
+        """Merge a stream of imported records into the database in one transaction.
         
-        self.conn.commit()
+        records yields (kind, value) pairs: ('profile', UserProfile),
+        ('insight', PersonalityInsight), ('delete_profile', id) or
+        ('delete_insight', id). They are staged in temporary tables in
+        batches, classified against the existing rows by id and content hash
+        with set-based queries, and only the difference is written:
+        
+        - insert: no row with that id exists
+        - unchanged: the existing row has the same content
+        - update: the content differs
+        - conflict: the content differs and the existing row changed after
+          since (the time the import was exported); kept unless
+          overwrite_conflicts is set
+        
+        With replace_all, existing rows missing from the import are deleted
+        (restoring rather than merging). With dry_run nothing is written.
+        Returns a report of counts per table plus the ids of conflicting
+        rows, or None if should_cancel() returned true between batches.
+        """
+        cursor = self.conn.cursor()
+        self._create_merge_stage(cursor)
+        
+        try:
+            batches = {'profile': [], 'insight': [], 'delete_profile': [], 'delete_insight': []}
+            
+            for kind, value in records:
+                batch = batches[kind]
+                batch.append(value)
+                
+                if len(batch) >= batch_size:
+                    if should_cancel and should_cancel():
+                        self.conn.rollback()
+                        return None
+                    self._stage_merge_batch(cursor, kind, batch)
+                    batch.clear()
+            
+            if should_cancel and should_cancel():
+                self.conn.rollback()
+                return None
+            
+            for kind, batch in batches.items():
+                self._stage_merge_batch(cursor, kind, batch)
+            
+            report = {
+                table: self._classify_merge_stage(cursor, table, since, replace_all)
+                for table in self.MERGE_COLUMNS
+            }
+            
+            cursor.execute('''
+            SELECT 'profiles' AS table_name, id FROM temp.merge_profiles WHERE action = 'conflict'
+            UNION ALL
+            SELECT 'insights', id FROM temp.merge_insights WHERE action = 'conflict'
+            LIMIT 100
+            ''')
+            report['conflicts'] = [{'table': row['table_name'], 'id': row['id']} for row in cursor.fetchall()]
+            
+            if dry_run:
+                self.conn.rollback()
+                return report
+            
+            for table in self.MERGE_COLUMNS:
+                self._apply_merge_stage(cursor, table, overwrite_conflicts)
+            
+            self._apply_merge_deletions(cursor, replace_all)
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self._drop_merge_stage(cursor)
+        
+        # Tips are regenerated only where the latest insight changed
+        self.refresh_stale_tips()
+        return report
+    
+    def _create_merge_stage(self, cursor):
+        """Create the temporary tables imports are staged in"""
+        self._drop_merge_stage(cursor)
+        
+        for table, columns in self.MERGE_COLUMNS.items():
+            cursor.execute(f'''
+            CREATE TEMP TABLE merge_{table} (
+                {columns[0]} PRIMARY KEY,
+                {", ".join(columns[1:])},
+                action TEXT
+            )
+            ''')
+        
+        cursor.execute('''
+        CREATE TEMP TABLE merge_deletes (
+            table_name TEXT NOT NULL,
+            id TEXT NOT NULL,
+            PRIMARY KEY (table_name, id)
+        )
+        ''')
+    
+    @staticmethod
+    def _drop_merge_stage(cursor):
+        """Drop the temporary import staging tables"""
+        for table in ('merge_profiles', 'merge_insights', 'merge_deletes'):
+            cursor.execute(f"DROP TABLE IF EXISTS temp.{table}")
+    
+    def _stage_merge_batch(self, cursor, kind: str, batch: list):
+        """Stage one batch of imported records of a kind (see merge_records)"""
+        if not batch:
+            return
+        
+        if kind in ('profile', 'insight'):
+            table = kind + 's'
+            columns = self.MERGE_COLUMNS[table]
+            row = self._profile_row if kind == 'profile' else self._insight_row
+            
+            # A later copy of the same row in the import wins
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO temp.merge_{table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                [row(record) for record in batch]
+            )
+        else:
+            table = 'profiles' if kind == 'delete_profile' else 'insights'
+            cursor.executemany(
+                "INSERT OR IGNORE INTO temp.merge_deletes (table_name, id) VALUES (?, ?)",
+                [(table, row_id) for row_id in batch]
+            )
+    
+    def _classify_merge_stage(self, cursor, table: str, since: str, replace_all: bool) -> Dict[str, int]:
+        """Classify staged rows against existing ones and count each action, plus deletions"""
+        version = self.MERGE_VERSION_COLUMNS[table]
+        
+        cursor.execute(f'''
+        UPDATE temp.merge_{table} SET action = COALESCE((
+            SELECT CASE
+                WHEN t.content_hash = merge_{table}.content_hash THEN 'unchanged'
+                WHEN ? IS NOT NULL AND t.{version} > ? THEN 'conflict'
+                ELSE 'update'
+            END
+            FROM main.{table} t WHERE t.id = merge_{table}.id
+        ), 'insert')
+        ''', (since, since))
+        
+        counts = {'insert': 0, 'update': 0, 'unchanged': 0, 'conflict': 0}
+        cursor.execute(f"SELECT action, COUNT(*) AS count FROM temp.merge_{table} GROUP BY action")
+        for row in cursor.fetchall():
+            counts[row['action']] = row['count']
+        
+        if replace_all:
+            cursor.execute(f"SELECT COUNT(*) FROM main.{table} WHERE id NOT IN (SELECT id FROM temp.merge_{table})")
+        elif table == 'insights':
+            # Deleting a profile deletes its insights too
+            cursor.execute('''
+            SELECT COUNT(*) FROM main.insights
+            WHERE id IN (SELECT id FROM temp.merge_deletes WHERE table_name = 'insights')
+               OR user_id IN (SELECT id FROM temp.merge_deletes WHERE table_name = 'profiles')
+            ''')
+        else:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM main.{table} "
+                f"WHERE id IN (SELECT id FROM temp.merge_deletes WHERE table_name = ?)",
+                (table,)
+            )
+        counts['delete'] = cursor.fetchone()[0]
+        
+        return counts
+    
+    def _apply_merge_stage(self, cursor, table: str, overwrite_conflicts: bool):
+        """Write the staged rows that are new or changed"""
+        columns = ", ".join(self.MERGE_COLUMNS[table])
+        actions = "'insert', 'update', 'conflict'" if overwrite_conflicts else "'insert', 'update'"
+        
+        cursor.execute(f'''
+        INSERT OR REPLACE INTO main.{table} ({columns})
+        SELECT {columns} FROM temp.merge_{table} WHERE action IN ({actions})
+        ''')
+    
+    @staticmethod
+    def _apply_merge_deletions(cursor, replace_all: bool):
+        """Delete rows missing from a full import, or listed as deleted by an incremental one"""
+        if replace_all:
+            cursor.execute("DELETE FROM main.insights WHERE id NOT IN (SELECT id FROM temp.merge_insights)")
+            cursor.execute("DELETE FROM main.profiles WHERE id NOT IN (SELECT id FROM temp.merge_profiles)")
+        else:
+            cursor.execute('''
+            DELETE FROM main.insights
+            WHERE id IN (SELECT id FROM temp.merge_deletes WHERE table_name = 'insights')
+               OR user_id IN (SELECT id FROM temp.merge_deletes WHERE table_name = 'profiles')
+            ''')
+            cursor.execute(
+                "DELETE FROM main.profiles WHERE id IN "
+                "(SELECT id FROM temp.merge_deletes WHERE table_name = 'profiles')"
+            )
+        
+        cursor.execute("DELETE FROM main.profile_tips WHERE user_id NOT IN (SELECT id FROM main.profiles)")
+    
+    def restore_snapshot(self, snapshot_path: str) -> Dict[str, int]:
+        """Replace all profiles and insights with those of a database snapshot; returns the row counts.
+        
+        Only rows that differ are written, in a single transaction.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("ATTACH DATABASE ? AS snapshot", (snapshot_path,))
+        
+        try:
+            counts = {}
+            try:
+                for table in self.MERGE_COLUMNS:
+                    # Snapshots from before a column was added lack it
+                    cursor.execute(f"PRAGMA snapshot.table_info({table})")
+                    snapshot_columns = {row['name'] for row in cursor.fetchall()}
+                    if not snapshot_columns:
+                        raise ValueError("Invalid backup file format")
+                    
+                    columns = ", ".join(
+                        column for column in self.MERGE_COLUMNS[table] if column in snapshot_columns
+                    )
+                    
+                    cursor.execute(f"DELETE FROM main.{table} WHERE id NOT IN (SELECT id FROM snapshot.{table})")
+                    cursor.execute(f'''
+                    INSERT OR REPLACE INTO main.{table} ({columns})
+                    SELECT {columns} FROM snapshot.{table} s
+                    WHERE NOT EXISTS (SELECT 1 FROM main.{table} m WHERE m.id = s.id AND m.data = s.data)
+                    ''')
+                    self._backfill_content_hashes(cursor, table)
+                    
+                    cursor.execute(f"SELECT COUNT(*) FROM main.{table}")
+                    counts[table] = cursor.fetchone()[0]
+                
+                cursor.execute("DELETE FROM main.profile_tips WHERE user_id NOT IN (SELECT id FROM main.profiles)")
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+        finally:
+            cursor.execute("DETACH DATABASE snapshot")
+        
+        self.refresh_stale_tips()
+        return counts
+    
+    def get_profile_ids(self) -> Set[str]:
+        """Get the ids of all profiles"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM profiles")
+        return {row['id'] for row in cursor.fetchall()}
     
     def get_profiles(self) -> List[UserProfile]:
         """Get all user profiles from the database"""
@@ -131,6 +609,67 @@ class SQLiteManager:
         
         return profiles
     
+    def get_profile_rows(self, search: str = None, offset: int = 0, 
+                         limit: int = 50, age_group: AgeGroup = None) -> List[Dict]:
+        """Get a page of lightweight profile rows, optionally filtered by name prefix and age group"""
+        cursor = self.conn.cursor()
+        
+        query = "SELECT id, name, age, age_group FROM profiles"
+        conditions = []
+        params = []
+        
+        if search:
+            conditions.append("name LIKE ? ESCAPE '\\'")
+            params.append(self._like_prefix(search))
+        
+        if age_group:
+            conditions.append("age_group = ?")
+            params.append(age_group.value)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        query += " ORDER BY name COLLATE NOCASE LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        
+        cursor.execute(query, tuple(params))
+        
+        return [{
+            'id': row['id'],
+            'name': row['name'],
+            'age': row['age'],
+            'age_group': AgeGroup(row['age_group'])
+        } for row in cursor.fetchall()]
+    
+    def count_profiles(self, search: str = None, age_group: AgeGroup = None) -> int:
+        """Count profiles, optionally filtered by name prefix and age group"""
+        cursor = self.conn.cursor()
+        
+        query = "SELECT COUNT(*) FROM profiles"
+        conditions = []
+        params = []
+        
+        if search:
+            conditions.append("name LIKE ? ESCAPE '\\'")
+            params.append(self._like_prefix(search))
+        
+        if age_group:
+            conditions.append("age_group = ?")
+            params.append(age_group.value)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        cursor.execute(query, tuple(params))
+        
+        return cursor.fetchone()[0]
+    
+    @staticmethod
+    def _like_prefix(text: str) -> str:
+        """Build a LIKE pattern matching names that start with text"""
+        escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return escaped + '%'
+    
     def get_profile(self, profile_id: str) -> Optional[UserProfile]:
         """Get a specific profile by ID"""
         cursor = self.conn.cursor()
@@ -150,6 +689,8 @@ class SQLiteManager:
         # First delete associated insights
         cursor.execute("DELETE FROM insights WHERE user_id = ?", (profile_id,))
         
+        cursor.execute("DELETE FROM profile_tips WHERE user_id = ?", (profile_id,))
+        
         # Then delete the profile
         cursor.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
         
@@ -158,29 +699,46 @@ class SQLiteManager:
     
     def save_insight(self, insight: PersonalityInsight):
         """Save a personality insight to the database"""
+        self.save_insights([insight])
+    
+    def save_insights(self, insights: List[PersonalityInsight]):
+        """Save several personality insights in a single transaction"""
         cursor = self.conn.cursor()
         
-        # Convert dataclass to dict
-        insight_dict = asdict(insight)
+        try:
+            cursor.executemany('''
+            INSERT OR REPLACE INTO insights
+            (id, user_id, category, timestamp, confidence_score, data, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [self._insight_row(insight) for insight in insights])
+            
+            for user_id in {insight.user_id for insight in insights}:
+                self._refresh_profile_tips(cursor, user_id)
+            
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+    
+    @staticmethod
+    def _insight_row(insight: PersonalityInsight) -> tuple:
+        """Build the insights table row for an insight"""
+        # Convert dataclass to dict (a shallow copy, as for profiles)
+        insight_dict = dict(vars(insight))
         insight_dict['category'] = insight_dict['category'].value
         
         # Store the complex data as JSON string
         data_json = json.dumps(insight_dict)
         
-        cursor.execute('''
-        INSERT OR REPLACE INTO insights
-        (id, user_id, category, timestamp, confidence_score, data)
-        VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
+        return (
             insight.id,
             insight.user_id,
             insight.category.value,
             insight.timestamp,
             insight.confidence_score,
-            data_json
-        ))
-        
-        self.conn.commit()
+            data_json,
+            SQLiteManager._content_hash(data_json)
+        )
     
     def get_insights(self, user_id: str = None, limit: int = 100, 
                     category: TraitCategory = None) -> List[PersonalityInsight]:
@@ -218,12 +776,214 @@ class SQLiteManager:
         
         return insights
     
+    def iter_profile_data(self, profile_ids: List[str] = None, batch_size: int = 500,
+                          changed_since: int = None):
+        """Yield the stored JSON of profiles one at a time, fetching in batches.
+        
+        With changed_since, only profiles changed after that change sequence
+        number are included.
+        """
+        cursor = self.conn.cursor()
+        
+        query = "SELECT p.data FROM profiles p"
+        conditions = []
+        params = []
+        
+        if changed_since is not None:
+            query += " JOIN change_log c ON c.table_name = 'profiles' AND c.row_id = p.id"
+            conditions.append("c.seq > ?")
+            params.append(changed_since)
+        
+        if profile_ids:
+            placeholders = ", ".join("?" * len(profile_ids))
+            conditions.append(f"p.id IN ({placeholders})")
+            params.extend(profile_ids)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        query += " ORDER BY p.name"
+        cursor.execute(query, tuple(params))
+        
+        yield from self._iter_column(cursor, batch_size)
+    
+    def iter_insight_data(self, profile_ids: List[str] = None, batch_size: int = 500,
+                          changed_since: int = None):
+        """Yield the stored JSON of insights belonging to existing profiles, fetching in batches.
+        
+        With changed_since, only insights changed after that change sequence
+        number are included.
+        """
+        cursor = self.conn.cursor()
+        
+        query = "SELECT i.data FROM insights i JOIN profiles p ON p.id = i.user_id"
+        conditions = []
+        params = []
+        
+        if changed_since is not None:
+            query += " JOIN change_log c ON c.table_name = 'insights' AND c.row_id = i.id"
+            conditions.append("c.seq > ?")
+            params.append(changed_since)
+        
+        if profile_ids:
+            placeholders = ", ".join("?" * len(profile_ids))
+            conditions.append(f"i.user_id IN ({placeholders})")
+            params.extend(profile_ids)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        query += " ORDER BY i.user_id, i.timestamp"
+        cursor.execute(query, tuple(params))
+        
+        yield from self._iter_column(cursor, batch_size)
+    
+    def iter_deleted_ids(self, table: str, changed_since: int, batch_size: int = 500):
+        """Yield the ids of rows of a change-logged table deleted after a change sequence number"""
+        if table not in self.CHANGE_LOGGED_TABLES:
+            raise ValueError(f"Changes to {table} are not logged")
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT c.row_id FROM change_log c
+        LEFT JOIN {table} t ON t.id = c.row_id
+        WHERE c.table_name = ? AND c.seq > ? AND t.id IS NULL
+        ORDER BY c.seq
+        ''', (table, changed_since))
+        
+        yield from self._iter_column(cursor, batch_size)
+    
+    def get_change_seq(self) -> int:
+        """Get the sequence number of the latest logged change"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'")
+        
+        row = cursor.fetchone()
+        return row['seq'] if row else 0
+    
+    def count_export_rows(self, changed_since: int = None) -> int:
+        """Estimate the rows an export writes: every profile and insight, or the changes logged after changed_since"""
+        cursor = self.conn.cursor()
+        
+        if changed_since is None:
+            cursor.execute("SELECT (SELECT COUNT(*) FROM profiles) + (SELECT COUNT(*) FROM insights)")
+        else:
+            cursor.execute("SELECT COUNT(*) FROM change_log WHERE seq > ?", (changed_since,))
+        
+        return cursor.fetchone()[0]
+    
+    def prune_change_log(self, up_to_seq: int):
+        """Forget changes up to a sequence number once no backup will need them"""
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM change_log WHERE seq <= ?", (up_to_seq,))
+        self.conn.commit()
+    
+    @staticmethod
+    def _iter_column(cursor, batch_size):
+        """Yield the first column of a query's rows without fetching them all at once"""
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield row[0]
+    
+    def get_insight_version(self, user_id: str) -> tuple:
+        """Get a cheap fingerprint of a profile's insights (count, latest id, latest timestamp)"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM insights WHERE user_id = ?",
+            (user_id,)
+        )
+        count = cursor.fetchone()[0]
+        
+        cursor.execute(
+            "SELECT id, timestamp FROM insights WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1",
+            (user_id,)
+        )
+        row = cursor.fetchone()
+        if row:
+            return (count, row['id'], row['timestamp'])
+        
+        return (count, None, None)
+    
     def delete_insight(self, insight_id: str) -> bool:
         """Delete a specific insight by ID"""
         cursor = self.conn.cursor()
+        cursor.execute("SELECT user_id FROM insights WHERE id = ?", (insight_id,))
+        row = cursor.fetchone()
+        
         cursor.execute("DELETE FROM insights WHERE id = ?", (insight_id,))
+        deleted = cursor.rowcount > 0
+        
+        if row:
+            self._refresh_profile_tips(cursor, row['user_id'])
+        
         self.conn.commit()
-        return cursor.rowcount > 0
+        return deleted
+    
+    def get_profile_tips(self, user_id: str) -> Optional[List[DevelopmentalTip]]:
+        """Get the stored tips for a profile's latest insight, or None if it has no insights"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT data FROM profile_tips WHERE user_id = ?", (user_id,))
+        
+        row = cursor.fetchone()
+        if row:
+            return [DevelopmentalTip(**tip_dict) for tip_dict in json.loads(row['data'])]
+        
+        return None
+    
+    def refresh_stale_tips(self) -> int:
+        """Regenerate stored tips that are missing, outdated or from an older tip catalog"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT p.id FROM profiles p
+        LEFT JOIN profile_tips t ON t.user_id = p.id
+        WHERE (t.user_id IS NOT NULL AND t.catalog_version != ?)
+           OR t.insight_id IS NOT (
+               SELECT i.id FROM insights i
+               WHERE i.user_id = p.id
+               ORDER BY i.timestamp DESC LIMIT 1
+           )
+        ''', (get_tip_engine().version,))
+        
+        stale_ids = [row['id'] for row in cursor.fetchall()]
+        for user_id in stale_ids:
+            self._refresh_profile_tips(cursor, user_id)
+        
+        self.conn.commit()
+        return len(stale_ids)
+    
+    def _refresh_profile_tips(self, cursor, user_id: str):
+        """Regenerate a profile's stored tips from its latest insight (no commit)"""
+        cursor.execute("SELECT age_group FROM profiles WHERE id = ?", (user_id,))
+        profile_row = cursor.fetchone()
+        
+        cursor.execute(
+            "SELECT data FROM insights WHERE user_id = ? ORDER BY timestamp DESC LIMIT 1",
+            (user_id,)
+        )
+        insight_row = cursor.fetchone()
+        
+        if not profile_row or not insight_row:
+            cursor.execute("DELETE FROM profile_tips WHERE user_id = ?", (user_id,))
+            return
+        
+        insight = PersonalityInsight.from_dict(json.loads(insight_row['data']))
+        engine = get_tip_engine()
+        tips = engine.generate_tips(AgeGroup(profile_row['age_group']), insight)
+        
+        cursor.execute('''
+        INSERT OR REPLACE INTO profile_tips
+        (user_id, insight_id, catalog_version, updated_at, data)
+        VALUES (?, ?, ?, ?, ?)
+        ''', (
+            user_id,
+            insight.id,
+            engine.version,
+            datetime.datetime.now().isoformat(),
+            json.dumps([asdict(tip) for tip in tips])
+        ))
     
     def apply_retention_policy(self):
         """Apply retention policy to automatically clean up old data"""
@@ -253,6 +1013,9 @@ class SQLiteManager:
             )
         
         self.conn.commit()
+        
+        # Expired insights may have been the ones tips were based on
+        self.refresh_stale_tips()
     
     def set_setting(self, key: str, value: str):
         """Save an application setting"""
@@ -274,33 +1037,232 @@ class SQLiteManager:
         
         return default
     
-    def log_backup(self, file_path: str, size: int, encrypted: bool):
-        """Log a backup operation"""
+    def log_backup(self, file_path: str, size: int, encrypted: bool, kind: str = 'export',
+                   parent_id: str = None, change_seq: int = 0, backup_id: str = None,
+                   file_size: int = None, timestamp: str = None, key_check: str = None) -> str:
+        """Log a backup operation and return its id.
+        
+        file_size is the size of the file itself when size counts more
+        (the new store chunks of a deduplicated backup); timestamp
+        defaults to now. key_check identifies the password an encrypted
+        backup was made with (see SecureDataManager._key_check).
+        """
+        backup_id = backup_id or str(uuid.uuid4())
+        
         cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO backups (id, timestamp, file_path, size, encrypted) VALUES (?, ?, ?, ?, ?)",
-            (str(datetime.uuid.uuid4()), datetime.datetime.now().isoformat(), file_path, size, 1 if encrypted else 0)
-        )
+        cursor.execute('''
+        INSERT INTO backups (id, timestamp, file_path, size, encrypted, kind, parent_id, change_seq,
+                             file_size, key_check)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            backup_id,
+            timestamp or datetime.datetime.now().isoformat(),
+            file_path,
+            size,
+            1 if encrypted else 0,
+            kind,
+            parent_id,
+            change_seq,
+            file_size,
+            key_check
+        ))
         self.conn.commit()
+        return backup_id
     
-    def get_backup_history(self) -> List[Dict]:
-        """Get backup history"""
+    def get_backup_key_check(self, backup_id: str) -> Optional[str]:
+        """Get the record of the password a backup was encrypted with (None if unknown or unencrypted)"""
         cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT id, timestamp, file_path, size, encrypted FROM backups ORDER BY timestamp DESC"
+        cursor.execute("SELECT key_check FROM backups WHERE id = ?", (backup_id,))
+        
+        row = cursor.fetchone()
+        return row['key_check'] if row else None
+    
+    def get_backup_history(self, kinds: tuple = None, limit: int = None) -> List[Dict]:
+        """Get backup history, newest first, optionally only of some kinds or the latest limit backups"""
+        query = '''
+        SELECT id, timestamp, file_path, size, encrypted, kind, parent_id, change_seq
+        FROM backups'''
+        params = []
+        
+        if kinds:
+            query += f" WHERE kind IN ({', '.join('?' * len(kinds))})"
+            params.extend(kinds)
+        
+        query += " ORDER BY timestamp DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        cursor = self.conn.cursor()
+        cursor.execute(query, tuple(params))
+        
+        return [self._backup_dict(row) for row in cursor.fetchall()]
+    
+    def get_backup_stats(self, kinds: tuple = SCHEDULED_BACKUP_KINDS) -> Dict:
+        """Get the number of backups of the given kinds and the bytes their files and the chunk store take"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT name, count, size FROM backup_stats")
+        stats = {row['name']: row for row in cursor.fetchall()}
+        
+        return {
+            'count': sum(stats[kind]['count'] for kind in kinds if kind in stats),
+            'size': sum(stats[kind]['size'] for kind in kinds if kind in stats),
+            'chunks_size': stats['chunks']['size'] if 'chunks' in stats else 0
+        }
+    
+    def get_backups_missing_file_size(self) -> List[Dict]:
+        """Get the backups logged before their file size was recorded"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT id, timestamp, file_path, size, encrypted, kind, parent_id, change_seq
+        FROM backups WHERE file_size IS NULL
+        ''')
+        
+        return [self._backup_dict(row) for row in cursor.fetchall()]
+    
+    def set_backup_file_size(self, backup_id: str, file_size: int):
+        """Record the size of a backup's file"""
+        cursor = self.conn.cursor()
+        cursor.execute("UPDATE backups SET file_size = ? WHERE id = ?", (file_size, backup_id))
+        self.conn.commit()
+    
+    def rebuild_backup_stats(self):
+        """Recompute the backup totals from scratch"""
+        cursor = self.conn.cursor()
+        self._rebuild_backup_stats(cursor)
+        self.conn.commit()
+    
+    def get_latest_backup(self, kinds: tuple = SCHEDULED_BACKUP_KINDS) -> Optional[Dict]:
+        """Get the most recent backup of the given kinds"""
+        placeholders = ", ".join("?" * len(kinds))
+        
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+        SELECT id, timestamp, file_path, size, encrypted, kind, parent_id, change_seq
+        FROM backups WHERE kind IN ({placeholders})
+        ORDER BY timestamp DESC LIMIT 1
+        ''', tuple(kinds))
+        
+        row = cursor.fetchone()
+        return self._backup_dict(row) if row else None
+    
+    def get_backup_chain(self, backup_id: str) -> List[Dict]:
+        """Get a backup and the backups it builds on, oldest (the full backup) first"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        WITH RECURSIVE chain (id, parent_id, depth) AS (
+            SELECT id, parent_id, 0 FROM backups WHERE id = ?
+            UNION ALL
+            SELECT b.id, b.parent_id, chain.depth + 1
+            FROM backups b JOIN chain ON b.id = chain.parent_id
         )
+        SELECT b.id, b.timestamp, b.file_path, b.size, b.encrypted, b.kind, b.parent_id, b.change_seq
+        FROM chain JOIN backups b ON b.id = chain.id
+        ORDER BY chain.depth DESC
+        ''', (backup_id,))
         
-        backups = []
-        for row in cursor.fetchall():
-            backups.append({
-                'id': row['id'],
-                'timestamp': row['timestamp'],
-                'file_path': row['file_path'],
-                'size': row['size'],
-                'encrypted': bool(row['encrypted'])
-            })
+        return [self._backup_dict(row) for row in cursor.fetchall()]
+    
+    def get_backup_descendants(self, backup_id: str) -> List[Dict]:
+        """Get a backup and every backup building on it, newest first"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        WITH RECURSIVE descendants (id) AS (
+            SELECT id FROM backups WHERE id = ?
+            UNION
+            SELECT b.id FROM backups b JOIN descendants d ON b.parent_id = d.id
+        )
+        SELECT b.id, b.timestamp, b.file_path, b.size, b.encrypted, b.kind, b.parent_id, b.change_seq
+        FROM descendants JOIN backups b ON b.id = descendants.id
+        ORDER BY b.timestamp DESC
+        ''', (backup_id,))
+        
+        return [self._backup_dict(row) for row in cursor.fetchall()]
+    
+    def delete_backup_record(self, backup_id: str):
+        """Remove a backup from the history, releasing its store chunks"""
+        cursor = self.conn.cursor()
+        
+        try:
+            cursor.execute('''
+            UPDATE chunk_refs SET refcount = refcount - 1
+            WHERE chunk_id IN (SELECT chunk_id FROM backup_chunks WHERE backup_id = ?)
+            ''', (backup_id,))
+            
+            cursor.execute("DELETE FROM backup_chunks WHERE backup_id = ?", (backup_id,))
+            cursor.execute("DELETE FROM backups WHERE id = ?", (backup_id,))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+    
+    def count_backups_with_file(self, file_path: str) -> int:
+        """Count the backups in the history stored in a given file"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM backups WHERE file_path = ?", (file_path,))
+        return cursor.fetchone()[0]
+    
+    def add_backup_chunks(self, backup_id: str, chunks: List[Dict], store: str = 'chunks'):
+        """Record the chunks (as returned by ChunkStore.put) a backup uses in the named store"""
+        stored_sizes = {chunk['id']: chunk['stored'] for chunk in chunks}
+        cursor = self.conn.cursor()
         
-        return backups
+        try:
+            cursor.executemany(
+                "INSERT INTO backup_chunks (backup_id, chunk_id) VALUES (?, ?)",
+                [(backup_id, chunk_id) for chunk_id in stored_sizes]
+            )
+            
+            cursor.executemany('''
+            INSERT INTO chunk_refs (chunk_id, refcount, stored_size, store) VALUES (?, 1, ?, ?)
+            ON CONFLICT (chunk_id) DO UPDATE SET refcount = refcount + 1
+            ''', [(chunk_id, stored, store) for chunk_id, stored in stored_sizes.items()])
+            
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+    
+    def get_unreferenced_chunks(self) -> List[Dict]:
+        """Get the store chunks no backup uses any more, as {'chunk_id', 'store'}"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT chunk_id, store FROM chunk_refs WHERE refcount <= 0")
+        return [{'chunk_id': row['chunk_id'], 'store': row['store']} for row in cursor.fetchall()]
+    
+    def get_known_chunks(self, store: str = 'chunks') -> Set[str]:
+        """Get the ids of every chunk of the named store with a reference count"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT chunk_id FROM chunk_refs WHERE store = ?", (store,))
+        return {row['chunk_id'] for row in cursor.fetchall()}
+    
+    def count_used_chunks(self, store: str = 'chunks') -> int:
+        """Count the chunks of the named store that some backup uses"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM chunk_refs WHERE store = ? AND refcount > 0", (store,))
+        return cursor.fetchone()[0]
+    
+    def forget_chunks(self, chunk_ids: List[str]):
+        """Remove deleted store chunks from the reference counts"""
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            "DELETE FROM chunk_refs WHERE chunk_id = ? AND refcount <= 0",
+            [(chunk_id,) for chunk_id in chunk_ids]
+        )
+        self.conn.commit()
+    
+    @staticmethod
+    def _backup_dict(row) -> Dict:
+        """Convert a backups table row to a dict"""
+        return {
+            'id': row['id'],
+            'timestamp': row['timestamp'],
+            'file_path': row['file_path'],
+            'size': row['size'],
+            'encrypted': bool(row['encrypted']),
+            'kind': row['kind'],
+            'parent_id': row['parent_id'],
+            'change_seq': row['change_seq']
+        }
     
     def get_data_summary(self) -> Dict:
         """Get summary statistics about stored data"""
@@ -320,7 +1282,7 @@ class SQLiteManager:
         insights_by_category = {}
         for row in cursor.fetchall():
             insights_by_category[row['category']] = row['count']
-            
+        
         # Get oldest data
         cursor.execute("SELECT MIN(timestamp) FROM insights")
         oldest_row = cursor.fetchone()
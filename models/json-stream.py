@@ -0,0 +1,108 @@
+import json
+import codecs
+from typing import Any, Iterable, Iterator, Tuple
+
+_WHITESPACE = ' \t\n\r'
+
+class JSONObjectStream:
+    """Incrementally parses a JSON document whose top level is an object.
+    
+    Top-level members are yielded as ('value', key, value), except arrays,
+    whose elements are yielded one at a time as ('item', key, element) so a
+    document with huge arrays never has to be held in memory. Only the
+    element being parsed and the unparsed input are buffered.
+    """
+    
+    def __init__(self, chunks: Iterable[bytes]):
+        """Parse the UTF-8 document made of the given chunks"""
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+    
+    def __iter__(self) -> Iterator[Tuple[str, str, Any]]:
+        """Yield (event, key, value) for the document's members"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            self._expect_end()
+            return
+        
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError("Invalid JSON: expected a member name")
+            self._expect(':')
+            
+            if self._peek() == '[':
+                self._pos += 1
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield 'item', key, self._value()
+                        if self._expect(',', ']') == ']':
+                            break
+            else:
+                yield 'value', key, self._value()
+            
+            if self._expect(',', '}') == '}':
+                break
+        
+        self._expect_end()
+    
+    def _value(self) -> Any:
+        """Parse the next complete JSON value"""
+        self._peek()
+        
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise ValueError("Invalid JSON: truncated or malformed value")
+                self._fill()
+                continue
+            
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and not self._eof:
+                self._fill()
+                continue
+            
+            self._pos = end
+            return value
+    
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ('' at the end)"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or self._eof:
+                return self._buffer[self._pos:self._pos + 1]
+            self._fill()
+    
+    def _expect(self, *tokens) -> str:
+        """Consume the next character, which must be one of tokens"""
+        token = self._peek()
+        if token not in tokens or not token:
+            raise ValueError(f"Invalid JSON: expected {' or '.join(tokens)}")
+        self._pos += 1
+        return token
+    
+    def _expect_end(self):
+        """Check nothing but whitespace follows the document"""
+        if self._peek():
+            raise ValueError("Invalid JSON: unexpected data after the document")
+    
+    def _fill(self):
+        """Append the next chunk to the buffer, dropping what was consumed"""
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        
+        try:
+            self._buffer += self._decoder.decode(next(self._chunks))
+        except StopIteration:
+            self._buffer += self._decoder.decode(b'', final=True)
+            self._eof = True
@@ -0,0 +1,89 @@
+import os
+import hmac
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+
+DEFAULT_TTL = 15 * 60  # seconds
+
+class KeyCache:
+    """Short-lived in-memory cache of password-derived keys.
+    
+    Entries are keyed by an HMAC fingerprint of (password, salt, KDF
+    parameters) under a random per-process secret, so neither the password
+    nor an offline-checkable hash of it is kept. The most recent salt per
+    password and parameters is remembered as the session salt, letting new
+    backups reuse an already derived key-encryption key. Keys are held in
+    bytearrays and zeroed on clear (best effort; copies made while using a
+    key are up to the garbage collector).
+    """
+    
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        """Initialize an empty cache whose entries expire after ttl seconds"""
+        self.ttl = ttl
+        self._secret = os.urandom(32)
+        self._lock = threading.Lock()
+        self._keys = {}  # fingerprint -> (key, expires)
+        self._session_salts = {}  # password/params fingerprint -> salt
+    
+    def get(self, password: str, salt: bytes, params: Dict) -> Optional[bytes]:
+        """Get a cached key for the password, salt and KDF parameters"""
+        fingerprint = self._fingerprint(password, salt, params)
+        
+        with self._lock:
+            entry = self._keys.get(fingerprint)
+            if entry is None:
+                return None
+            
+            key, expires = entry
+            if time.monotonic() >= expires:
+                self._discard(fingerprint)
+                return None
+            
+            return bytes(key)
+    
+    def get_session(self, password: str, params: Dict) -> Optional[Tuple[bytes, bytes]]:
+        """Get (salt, key) of this session's key for the password and parameters"""
+        with self._lock:
+            salt = self._session_salts.get(self._fingerprint(password, b'', params))
+        
+        if salt is None:
+            return None
+        
+        key = self.get(password, salt, params)
+        if key is None:
+            return None
+        
+        return salt, key
+    
+    def put(self, password: str, salt: bytes, params: Dict, key: bytes, session: bool = False):
+        """Cache a derived key; with session=True it also becomes the session key"""
+        fingerprint = self._fingerprint(password, salt, params)
+        
+        with self._lock:
+            self._discard(fingerprint)
+            self._keys[fingerprint] = (bytearray(key), time.monotonic() + self.ttl)
+            
+            if session:
+                self._session_salts[self._fingerprint(password, b'', params)] = salt
+    
+    def clear(self):
+        """Forget all keys, zeroing them"""
+        with self._lock:
+            for fingerprint in list(self._keys):
+                self._discard(fingerprint)
+            self._session_salts.clear()
+    
+    def _discard(self, fingerprint):
+        """Remove and zero one entry (caller holds the lock)"""
+        entry = self._keys.pop(fingerprint, None)
+        if entry:
+            key = entry[0]
+            key[:] = bytes(len(key))
+    
+    def _fingerprint(self, password, salt, params) -> bytes:
+        """Get the cache key for a password, salt and parameters"""
+        message = json.dumps([password, salt.hex(), params], sort_keys=True).encode()
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
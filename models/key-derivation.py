@@ -0,0 +1,101 @@
+import time
+from typing import Dict
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+PBKDF2 = 'pbkdf2-sha256'
+SCRYPT = 'scrypt'
+
+# Parameters of backups written before they were recorded in the file
+LEGACY_PARAMS = {'algorithm': PBKDF2, 'iterations': 100000}
+
+# Aim for a derivation this slow on the current device
+DEFAULT_TARGET_SECONDS = 0.25
+
+# Calibration clamps: never weaker than the floor however slow the device,
+# never so slow that a weaker device restoring the backup struggles
+PBKDF2_MIN_ITERATIONS = 50000
+PBKDF2_MAX_ITERATIONS = 2000000
+SCRYPT_MIN_N = 2 ** 14
+SCRYPT_MAX_N = 2 ** 17
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+def derive_key(password: str, salt: bytes, params: Dict) -> bytes:
+    """Derive a raw 256-bit key from a password with the given KDF parameters"""
+    check_params(params)
+    
+    if params['algorithm'] == PBKDF2:
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=params['iterations'],
+        )
+    else:
+        kdf = Scrypt(
+            salt=salt,
+            length=32,
+            n=params['n'],
+            r=params['r'],
+            p=params['p'],
+        )
+    
+    return kdf.derive(password.encode())
+
+def check_params(params: Dict):
+    """Reject unknown algorithms and parameters outside sane bounds (e.g. from a crafted header).
+    
+    The bounds are the calibration clamps, so a header can never make a
+    derivation cost more than the slowest one calibrate() would pick; for
+    scrypt that caps memory at 128 * SCRYPT_MAX_N * SCRYPT_R bytes.
+    """
+    algorithm = params.get('algorithm')
+    
+    if algorithm == PBKDF2:
+        iterations = params.get('iterations')
+        if not isinstance(iterations, int) or not 1000 <= iterations <= PBKDF2_MAX_ITERATIONS:
+            raise ValueError(f"Invalid PBKDF2 iterations: {iterations}")
+    elif algorithm == SCRYPT:
+        n, r, p = params.get('n'), params.get('r'), params.get('p')
+        if (not all(isinstance(value, int) for value in (n, r, p))
+                or n < 2 or n & (n - 1) or n > SCRYPT_MAX_N
+                or not 1 <= r <= SCRYPT_R or not 1 <= p <= SCRYPT_P):
+            raise ValueError(f"Invalid scrypt parameters: n={n} r={r} p={p}")
+    else:
+        raise ValueError(f"Unsupported key derivation: {algorithm}")
+
+def calibrate(algorithm: str = PBKDF2, target_seconds: float = DEFAULT_TARGET_SECONDS) -> Dict:
+    """Measure this device and pick KDF parameters that take about target_seconds"""
+    salt = b'\x00' * 16
+    
+    if algorithm == PBKDF2:
+        # PBKDF2 cost is linear in the iteration count
+        probe = {'algorithm': PBKDF2, 'iterations': 20000}
+        elapsed = _time_derivation(salt, probe)
+        iterations = int(probe['iterations'] * target_seconds / max(elapsed, 1e-6))
+        iterations = min(max(iterations, PBKDF2_MIN_ITERATIONS), PBKDF2_MAX_ITERATIONS)
+        return {'algorithm': PBKDF2, 'iterations': iterations // 1000 * 1000}
+    
+    if algorithm == SCRYPT:
+        # scrypt cost is linear in n, which must be a power of two
+        probe = {'algorithm': SCRYPT, 'n': SCRYPT_MIN_N, 'r': SCRYPT_R, 'p': SCRYPT_P}
+        elapsed = _time_derivation(salt, probe)
+        n = SCRYPT_MIN_N
+        while n < SCRYPT_MAX_N and elapsed * (n * 2) / SCRYPT_MIN_N <= target_seconds:
+            n *= 2
+        return {'algorithm': SCRYPT, 'n': n, 'r': SCRYPT_R, 'p': SCRYPT_P}
+    
+    raise ValueError(f"Unsupported key derivation: {algorithm}")
+
+def _time_derivation(salt, params) -> float:
+    """Time one derivation, taking the faster of two runs to skip warm-up"""
+    best = None
+    for _ in range(2):
+        start = time.perf_counter()
+        derive_key('calibration', salt, params)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
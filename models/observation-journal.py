@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import queue
+import threading
+import logging
+from dataclasses import asdict
+from typing import List
+
+from .data_manager import SQLiteManager
+from .data_classes import PersonalityInsight
+
+logger = logging.getLogger(__name__)
+
+class ObservationJournal:
+    """Append-only on-disk queue of observations drained to SQLite in the background.
+    
+    append() writes one JSON line per insight and returns without waiting for
+    fsync or the database. A writer thread with its own connection collects
+    whatever has queued up, fsyncs the journal once for the whole group and
+    saves the group in a single transaction. Entries still in the journal at
+    startup (e.g. after a crash) are replayed; saving is idempotent because
+    insights are stored by id. The journal is truncated whenever everything
+    appended has been committed.
+    """
+    
+    def __init__(self, db_path: str = "child_insight.db", journal_path: str = None,
+                 max_batch: int = 200, group_window: float = 0.05):
+        """Initialize the journal; call start() to replay and begin draining"""
+        self.db_path = db_path
+        self.journal_path = journal_path or os.path.join(
+            os.path.dirname(os.path.abspath(db_path)), "observations.journal"
+        )
+        self.max_batch = max_batch
+        self.group_window = group_window
+        
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._appended = 0  # entries in the journal file
+        self._committed = 0  # of those, entries saved to the database
+        self._file = None
+        self._thread = None
+        self._stopping = False
+    
+    def start(self):
+        """Replay entries left from a previous run and start the writer thread"""
+        pending = self._read_journal()
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+        
+        if pending:
+            logger.info(f"ObservationJournal: replaying {len(pending)} unsaved observations")
+            # Rewrite without any torn last line so the counters match the file
+            self._file.truncate(0)
+            for insight in pending:
+                self._write_line(insight)
+                self._queue.put(insight)
+            self._file.flush()
+        
+        self._thread = threading.Thread(target=self._run, name="ObservationJournal", daemon=True)
+        self._thread.start()
+    
+    def append(self, insight: PersonalityInsight):
+        """Queue an insight for saving; returns as soon as it is in the journal"""
+        self.append_many([insight])
+    
+    def append_many(self, insights: List[PersonalityInsight]):
+        """Queue several insights for saving"""
+        with self._lock:
+            for insight in insights:
+                self._write_line(insight)
+            # Flush to the OS so an app crash cannot lose it; fsync is the writer's job
+            self._file.flush()
+        
+        for insight in insights:
+            self._queue.put(insight)
+    
+    def pending_count(self) -> int:
+        """Get the number of observations not yet saved to the database"""
+        with self._lock:
+            return self._appended - self._committed
+    
+    def sync(self, timeout: float = None) -> bool:
+        """Wait until every queued observation is saved; returns False on timeout"""
+        with self._drained:
+            return self._drained.wait_for(
+                lambda: self._committed >= self._appended, timeout=timeout
+            )
+    
+    def close(self, timeout: float = 5.0) -> bool:
+        """Save what is queued and stop the writer thread; returns False if it is still running"""
+        if not self._thread:
+            return True
+        
+        self._stopping = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+        stopped = not self._thread.is_alive()
+        self._thread = None
+        return stopped
+    
+    def _write_line(self, insight):
+        """Append one insight to the journal file (caller holds the lock or is starting up)"""
+        insight_dict = asdict(insight)
+        insight_dict['category'] = insight_dict['category'].value
+        self._file.write(json.dumps(insight_dict, separators=(',', ':')) + '\n')
+        self._appended += 1
+    
+    def _read_journal(self) -> List[PersonalityInsight]:
+        """Read the insights left in the journal, skipping a torn last line"""
+        if not os.path.exists(self.journal_path):
+            return []
+        
+        insights = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    insights.append(PersonalityInsight.from_dict(json.loads(line)))
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"ObservationJournal: skipping unreadable entry: {e}")
+        
+        return insights
+    
+    def _next_batch(self):
+        """Block for the next entry, then gather whatever else arrives in the group window"""
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        
+        batch = [item]
+        stop = False
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=self.group_window)
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        
+        return batch, stop
+    
+    def _run(self):
+        """Writer thread: group commit batches until closed"""
+        db_manager = SQLiteManager(self.db_path)
+        
+        try:
+            stop = False
+            while not stop:
+                batch, stop = self._next_batch()
+                if batch:
+                    self._commit(db_manager, batch)
+        finally:
+            db_manager.close()
+            
+            # Closed here, not in close(): that may time out while a commit
+            # is still retrying and about to fsync or truncate the file
+            if self._stopping:
+                with self._lock:
+                    self._file.close()
+    
+    def _commit(self, db_manager, batch):
+        """Make a batch durable in the journal, save it and truncate the journal if idle"""
+        # Appenders flush under the lock; fsync outside it so they never wait on the disk
+        os.fsync(self._file.fileno())
+        
+        # Retry until saved; entries stay in the journal meanwhile
+        delay = 0.5
+        while True:
+            try:
+                db_manager.save_insights(batch)
+                break
+            except Exception as e:
+                logger.warning(f"ObservationJournal: saving {len(batch)} observations failed: {e}")
+                if self._stopping:
+                    # Leave them for replay on next start
+                    return
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+        
+        with self._drained:
+            self._committed += len(batch)
+            
+            if self._committed == self._appended:
+                self._file.truncate(0)
+                self._appended = self._committed = 0
+            
+            self._drained.notify_all()
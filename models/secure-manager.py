@@ -1,177 +1,1266 @@
 import os
+import time
 import json
 import base64
+import hmac
 import hashlib
 import datetime
 import uuid
+import itertools
+import sqlite3
+import shutil
 from dataclasses import asdict
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from .data_manager import SQLiteManager
 from .data_classes import UserProfile, PersonalityInsight
+from .backup_format import BackupWriter, BackupReader, is_backup_container
+from .chunk_store import ChunkStore, is_chunk_manifest, iter_content_chunks
+from .key_cache import KeyCache
+from .json_stream import JSONObjectStream
+from . import key_derivation
+
+IMPORT_READ_SIZE = 256 * 1024
+
+# Rows written between progress reports (and cancellation checks) of a backup
+BACKUP_PROGRESS_ROWS = 500
+
+# Backup rotation keeps the newest scheduled backup of each of this many of
+# the most recent days, ISO weeks and months that have one (the
+# backup_keep_daily/weekly/monthly settings override these), and the
+# backup_max_bytes setting optionally caps the space backups take
+DEFAULT_KEEP_DAILY = 7
+DEFAULT_KEEP_WEEKLY = 4
+DEFAULT_KEEP_MONTHLY = 6
+
+# Snapshot backups are a copy of the database file made with the SQLite
+# online backup API, in a backup container marked with this content type
+SNAPSHOT_CONTENT = 'sqlite-snapshot'
+SNAPSHOT_PAGES_PER_STEP = 256
+# Writes through other connections restart a copy in progress; after this
+# many restarts the rest is copied in a single step
+SNAPSHOT_MAX_RESTARTS = 3
+
+# Scheduled backups share deduplicated chunks in a store directory in the
+# backup directory; the backup_chunk_store setting names the one new
+# backups use. Its key is wrapped with the backup password, so after the
+# password changes backups go to a new store, named with this prefix
+DEFAULT_CHUNK_STORE = 'chunks'
+
+# A backup writes its chunks before recording them in chunk_refs; garbage
+# collection deletes chunk files without a record once they are this old,
+# so only those of a backup that failed or crashed go
+ORPHAN_CHUNK_MIN_AGE = 3600
+
+class _BackupCancelled(Exception):
+    """Raised inside a backup export to abandon it"""
+
+class _SnapshotRestarted(Exception):
+    """Raised inside a database copy that keeps being restarted"""
 
 class SecureDataManager:
     """Handles secure export, import and backup of application data"""
     
+    # Arrays of an export document and the record kind each holds
+    IMPORT_ARRAYS = {
+        'profiles': 'profile',
+        'insights': 'insight',
+        'deleted_profiles': 'delete_profile',
+        'deleted_insights': 'delete_insight'
+    }
+    
     def __init__(self, db_manager: SQLiteManager, backup_dir: str = "backups"):
         """Initialize with database manager and backup directory"""
         self.db_manager = db_manager
         self.backup_dir = backup_dir
         
+        # Deduplicated chunks of scheduled backups start out in this store
+        self.chunk_store_dir = os.path.join(backup_dir, DEFAULT_CHUNK_STORE)
+        
+        # Password-derived keys are reused within a session to skip the KDF
+        self.key_cache = KeyCache()
+        
         # Create backup directory if it doesn't exist
         if not os.path.exists(backup_dir):
             os.makedirs(backup_dir)
     
     def _generate_key_from_password(self, password: str, salt: bytes = None) -> Tuple[Fernet, bytes]:
-        """Generate an encryption key from a password"""
+        """Generate a Fernet key from a password (for backups in the legacy format)"""
         if salt is None:
             salt = os.urandom(16)
         
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
+        key = base64.urlsafe_b64encode(
+            key_derivation.derive_key(password, salt, key_derivation.LEGACY_PARAMS)
         )
-        
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
         return Fernet(key), salt
     
-    def export_data(self, file_path: str, password: str = None, 
-                   anonymize: bool = False, selected_profiles: List[str] = None) -> str:
-        """Export all data, optionally encrypted with a password"""
-        # Fetch profiles from database
-        if selected_profiles:
-            profiles = [self.db_manager.get_profile(p_id) for p_id in selected_profiles]
-            profiles = [p for p in profiles if p]  # Filter out None values
+    def calibrate_kdf(self, algorithm: str = None,
+                      target_seconds: float = key_derivation.DEFAULT_TARGET_SECONDS) -> Dict:
+        """Measure this device, store KDF parameters for new backups and return them"""
+        if algorithm is None:
+            algorithm = self.db_manager.get_setting('kdf_algorithm', key_derivation.PBKDF2)
+        
+        params = key_derivation.calibrate(algorithm, target_seconds)
+        self.db_manager.set_setting('kdf_params', json.dumps(params))
+        
+        # Keys derived with the old parameters no longer match new backups
+        self.key_cache.clear()
+        return params
+    
+    def _kdf_params(self) -> Dict:
+        """Get the KDF parameters for new backups, calibrating on first use"""
+        stored = self.db_manager.get_setting('kdf_params')
+        if stored:
+            try:
+                params = json.loads(stored)
+                key_derivation.check_params(params)
+                return params
+            except ValueError:
+                pass
+        
+        return self.calibrate_kdf()
+    
+    def _session_key(self, password: str) -> Tuple[Dict, bytes]:
+        """Get the KDF header entry and key-encryption key for new backups.
+        
+        The key is derived once per session and password; each backup then
+        gets its own random data key wrapped with it.
+        """
+        params = self._kdf_params()
+        
+        cached = self.key_cache.get_session(password, params)
+        if cached:
+            salt, kek = cached
         else:
-            profiles = self.db_manager.get_profiles()
+            salt = os.urandom(16)
+            kek = key_derivation.derive_key(password, salt, params)
+            self.key_cache.put(password, salt, params, kek, session=True)
         
-        # Anonymize profile data if requested
-        if anonymize:
-            profiles = self._anonymize_profiles(profiles)
+        return dict(params, salt=base64.b64encode(salt).decode()), kek
+    
+    def _key_from_header(self, password: str, header: Dict) -> bytes:
+        """Get the data key of a backup container from the KDF parameters in its header"""
+        kek = self._derive_kek(password, header.get('kdf', {}))
         
-        # Fetch insights for selected profiles
-        all_insights = []
-        for profile in profiles:
-            insights = self.db_manager.get_insights(user_id=profile.id, limit=1000)
-            all_insights.extend(insights)
+        if 'key' not in header:
+            # Data encrypted directly with the derived key
+            return kek
+        
+        return self._unwrap_key(kek, header['key'])
+    
+    def _derive_kek(self, password: str, kdf: Dict) -> bytes:
+        """Derive (or get from the cache) the key-encryption key for a KDF header entry"""
+        params = dict(kdf)
+        salt = base64.b64decode(params.pop('salt', ''))
+        key_derivation.check_params(params)
+        
+        kek = self.key_cache.get(password, salt, params)
+        if kek is None:
+            kek = key_derivation.derive_key(password, salt, params)
+            self.key_cache.put(password, salt, params, kek)
+        
+        return kek
+    
+    def _key_check(self, password: str = None) -> Optional[str]:
+        """Record which password a backup is encrypted with, without storing the password.
         
-        # Prepare export data
-        export_data = {
+        The record holds the session's KDF parameters and a digest of the
+        derived key, so _matches_key_check can tell whether a later
+        password is the same one.
+        """
+        if not password:
+            return None
+        
+        kdf, kek = self._session_key(password)
+        return json.dumps({'kdf': kdf, 'check': hashlib.sha256(b'backup-key-check' + kek).hexdigest()})
+    
+    def _matches_key_check(self, password: str, key_check: str) -> bool:
+        """Check whether password is the one recorded by _key_check"""
+        try:
+            record = json.loads(key_check)
+            kek = self._derive_kek(password, record['kdf'])
+        except (TypeError, KeyError, ValueError):
+            return False
+        
+        return hmac.compare_digest(hashlib.sha256(b'backup-key-check' + kek).hexdigest(), record['check'])
+    
+    @staticmethod
+    def _wrap_key(kek: bytes, key: bytes) -> Dict:
+        """Encrypt a data key with a key-encryption key for the backup header"""
+        nonce = os.urandom(12)
+        return {
+            'nonce': base64.b64encode(nonce).decode(),
+            'data': base64.b64encode(AESGCM(kek).encrypt(nonce, key, b'data-key')).decode()
+        }
+    
+    @staticmethod
+    def _unwrap_key(kek: bytes, wrapped: Dict) -> bytes:
+        """Decrypt a data key from a backup header"""
+        try:
+            return AESGCM(kek).decrypt(
+                base64.b64decode(wrapped['nonce']),
+                base64.b64decode(wrapped['data']),
+                b'data-key'
+            )
+        except InvalidTag:
+            raise ValueError("Invalid password or corrupted file")
+    
+    def _crypto_workers(self) -> int:
+        """Get the number of threads used to encrypt or decrypt backup chunks"""
+        default = min(4, os.cpu_count() or 1)
+        try:
+            return max(1, int(self.db_manager.get_setting('backup_crypto_workers', default)))
+        except ValueError:
+            return default
+    
+    def clear_key_cache(self):
+        """Forget all cached keys (on logout or when the app is paused)"""
+        self.key_cache.clear()
+    
+    def export_data(self, file_path: str, password: str = None, 
+                   anonymize: bool = False, selected_profiles: List[str] = None,
+                   compression: str = 'none') -> str:
+        """Export all data, optionally compressed ('zlib' or 'lzma') and encrypted with a password"""
+        self._write_export(file_path, password, anonymize, selected_profiles, compression)
+        
+        # Log backup
+        file_size = os.path.getsize(file_path)
+        self.db_manager.log_backup(file_path, file_size, bool(password))
+        
+        if password:
+            return f"Encrypted data exported to {file_path}"
+        
+        return f"Data exported to {file_path}"
+    
+    def _write_export(self, file_path: str, password: str = None, anonymize: bool = False,
+                      selected_profiles: List[str] = None, compression: str = 'none',
+                      changed_since: int = None, backup: Dict = None,
+                      progress=None, should_cancel=None):
+        """Write an export document to a file (see _iter_export_json and _track_export for the arguments)"""
+        # Write to a temporary file first so a failed export never leaves a
+        # truncated file in place of a good one
+        tmp_path = file_path + '.tmp'
+        rows = {}
+        pieces = self._iter_export_json(anonymize, selected_profiles, changed_since, backup, rows)
+        pieces = self._track_export(pieces, rows, changed_since, progress, should_cancel)
+        
+        try:
+            with open(tmp_path, 'wb') as f:
+                if password or compression != 'none':
+                    header, data_key = self._container_key(password)
+                    writer = BackupWriter(f, data_key, header, workers=self._crypto_workers(),
+                                          compression=compression)
+                    
+                    try:
+                        for piece in pieces:
+                            writer.write(piece)
+                        writer.close({'rows': rows})
+                    except BaseException:
+                        writer.abort()
+                        raise
+                else:
+                    # Plaintext JSON is streamed straight from the database
+                    for piece in pieces:
+                        f.write(piece)
+            
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def _container_key(self, password: str = None) -> Tuple[Dict, Optional[bytes]]:
+        """Get the header fields and data key of a new backup container (no key without a password)"""
+        if not password:
+            return {}, None
+        
+        # Encrypted in chunks as the backup is produced, with a fresh data
+        # key wrapped by the session's password key
+        kdf, kek = self._session_key(password)
+        data_key = AESGCM.generate_key(bit_length=256)
+        return {'kdf': kdf, 'key': self._wrap_key(kek, data_key)}, data_key
+    
+    def _iter_export_json(self, anonymize: bool = False, selected_profiles: List[str] = None,
+                          changed_since: int = None, backup: Dict = None, rows: Dict = None):
+        """Yield the export document as UTF-8 pieces, one profile or insight per line.
+        
+        Rows are read through cursors in batches and their stored JSON is
+        written as is, so memory use does not depend on how much data there is.
+        With changed_since, only rows changed after that change sequence
+        number are written, followed by the ids of deleted rows. backup
+        describes the scheduled backup the document belongs to. The number
+        of entries written per array is counted into rows, if given.
+        """
+        if rows is None:
+            rows = {}
+        rows.update(profiles=0, insights=0)
+        
+        header = {
             'version': '1.0',
-            'timestamp': datetime.datetime.now().isoformat(),
-            'profiles': [asdict(p) for p in profiles],
-            'insights': [asdict(i) for i in all_insights],
+            'timestamp': datetime.datetime.now().isoformat()
         }
+        if backup:
+            header['backup'] = backup
+        header = json.dumps(header, separators=(',', ':'))
         
-        # Convert Enum values to strings for serialization
-        for profile_dict in export_data['profiles']:
-            profile_dict['age_group'] = profile_dict['age_group'].value
+        # Open the header object to append the arrays
+        yield (header[:-1] + ',"profiles":[').encode()
         
-        for insight_dict in export_data['insights']:
-            insight_dict['category'] = insight_dict['category'].value
+        separator = '\n'
+        for data_json in self.db_manager.iter_profile_data(selected_profiles, changed_since=changed_since):
+            if anonymize:
+                profile = self._anonymize_profiles([UserProfile.from_dict(json.loads(data_json))])[0]
+                profile_dict = asdict(profile)
+                profile_dict['age_group'] = profile_dict['age_group'].value
+                data_json = json.dumps(profile_dict, separators=(',', ':'))
+            
+            yield (separator + data_json).encode()
+            separator = ',\n'
+            rows['profiles'] += 1
         
-        # Convert to JSON
-        json_data = json.dumps(export_data, indent=2)
+        yield '\n],"insights":['.encode()
         
-        # Apply encryption if password is provided
-        if password:
-            cipher, salt = self._generate_key_from_password(password)
-            encrypted_data = cipher.encrypt(json_data.encode())
+        separator = '\n'
+        for data_json in self.db_manager.iter_insight_data(selected_profiles, changed_since=changed_since):
+            yield (separator + data_json).encode()
+            separator = ',\n'
+            rows['insights'] += 1
+        
+        if changed_since is not None:
+            for table in ('profiles', 'insights'):
+                yield f'\n],"deleted_{table}":['.encode()
+                rows[f'deleted_{table}'] = 0
+                
+                separator = '\n'
+                for row_id in self.db_manager.iter_deleted_ids(table, changed_since):
+                    yield (separator + json.dumps(row_id)).encode()
+                    separator = ',\n'
+                    rows[f'deleted_{table}'] += 1
+        
+        yield '\n]}\n'.encode()
+    
+    def _write_chunked_export(self, file_path: str, store: ChunkStore, anonymize: bool = False,
+                              compression: str = 'zlib', changed_since: int = None,
+                              backup: Dict = None, progress=None, should_cancel=None) -> List[Dict]:
+        """Write an export into the chunk store with its manifest at file_path; returns the chunks"""
+        rows = {}
+        pieces = self._iter_export_json(anonymize, None, changed_since, backup, rows)
+        pieces = self._track_export(pieces, rows, changed_since, progress, should_cancel)
+        chunks = []
+        
+        try:
+            for chunk in iter_content_chunks(pieces):
+                chunks.append(store.put(chunk, compression))
             
-            # Final file format: salt + encrypted data
-            with open(file_path, 'wb') as f:
-                f.write(salt)
-                f.write(encrypted_data)
+            store.write_manifest(file_path, chunks, {'rows': rows})
+        except BaseException:
+            # Nothing refers to the chunks this export added
+            for chunk in chunks:
+                if chunk['new']:
+                    store.delete(chunk['id'])
+            raise
+        
+        return chunks
+    
+    def _track_export(self, pieces, rows: Dict, changed_since: int = None,
+                      progress=None, should_cancel=None):
+        """Yield export pieces, reporting progress(done, total) in rows every few hundred rows.
+        
+        Raises _BackupCancelled as soon as should_cancel() returns true.
+        """
+        if not progress and not should_cancel:
+            yield from pieces
+            return
+        
+        total = self.db_manager.count_export_rows(changed_since)
+        reported = 0
+        
+        for piece in pieces:
+            yield piece
             
-            # Log backup
-            file_size = os.path.getsize(file_path)
-            self.db_manager.log_backup(file_path, file_size, True)
+            done = sum(rows.values())
+            if done - reported >= BACKUP_PROGRESS_ROWS:
+                reported = done
+                if should_cancel and should_cancel():
+                    raise _BackupCancelled()
+                if progress:
+                    progress(done, max(total, done))
+        
+        if progress:
+            progress(reported, max(total, reported))
+    
+    def _open_chunk_store(self, password: str = None, root: str = None,
+                          for_backup: bool = False) -> ChunkStore:
+        """Open the deduplicated backup store, creating its key on first use.
+        
+        The store key is kept next to the chunks, wrapped with the password
+        key when backups are encrypted. An unprotected store can't take an
+        encrypted backup: its key is readable by anyone, and protecting it
+        would lock out the unencrypted backups already in it.
+        """
+        root = root or self.chunk_store_dir
+        key_path = os.path.join(root, 'key.json')
+        
+        if os.path.exists(key_path):
+            with open(key_path, 'r') as f:
+                key_info = json.load(f)
             
-            return f"Encrypted data exported to {file_path}"
+            if 'kdf' in key_info:
+                if not password:
+                    raise ValueError("Password required for encrypted file")
+                key = self._key_from_header(password, key_info)
+            else:
+                if password and for_backup:
+                    raise ValueError("Backup store is not encrypted")
+                key = base64.b64decode(key_info['key'])
+        elif for_backup:
+            key = AESGCM.generate_key(bit_length=256)
+            os.makedirs(root, exist_ok=True)
+            self._write_store_key(key_path, key, password)
         else:
-            # Save as plaintext JSON
-            with open(file_path, 'w') as f:
-                f.write(json_data)
-            
-            # Log backup
-            file_size = os.path.getsize(file_path)
-            self.db_manager.log_backup(file_path, file_size, False)
+            raise ValueError("Backup store not found")
+        
+        return ChunkStore(root, key)
+    
+    def _backup_chunk_store(self, password: str = None) -> Tuple[str, ChunkStore]:
+        """Open the chunk store new backups go to; returns its name and the store.
+        
+        A store's key is wrapped with a single password, or none. When the
+        current store can't take this backup (the password changed, or
+        encryption was turned on or off), it is emptied and given a new
+        key if no backup uses it any more; otherwise new backups go to a
+        new store, and collect_garbage deletes the old one once its
+        backups are gone.
+        """
+        name = self.db_manager.get_setting('backup_chunk_store', DEFAULT_CHUNK_STORE)
+        root = os.path.join(self.backup_dir, name)
+        
+        try:
+            return name, self._open_chunk_store(password, root, for_backup=True)
+        except ValueError:
+            pass
+        
+        if self.db_manager.count_used_chunks(name):
+            name = f"{DEFAULT_CHUNK_STORE}_{uuid.uuid4().hex[:12]}"
+            self.db_manager.set_setting('backup_chunk_store', name)
+            root = os.path.join(self.backup_dir, name)
+        else:
+            # Nothing in it is restorable any more; chunk_refs rows left
+            # for it are cleared by collect_garbage
+            shutil.rmtree(root, ignore_errors=True)
+        
+        return name, self._open_chunk_store(password, root, for_backup=True)
+    
+    def _chunk_store_names(self) -> List[str]:
+        """Get the names of the chunk store directories in the backup directory"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        
+        return sorted(
+            name for name in os.listdir(self.backup_dir)
+            if (name == DEFAULT_CHUNK_STORE or name.startswith(DEFAULT_CHUNK_STORE + '_'))
+            and os.path.isdir(os.path.join(self.backup_dir, name))
+        )
+    
+    def _write_store_key(self, key_path: str, key: bytes, password: str = None):
+        """Save the chunk store key, wrapped with the password key if there is a password"""
+        if password:
+            kdf, kek = self._session_key(password)
+            key_info = {'kdf': kdf, 'key': self._wrap_key(kek, key)}
+        else:
+            key_info = {'key': base64.b64encode(key).decode()}
+        
+        tmp_path = key_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(key_info, f)
+        os.replace(tmp_path, key_path)
+    
+    def delete_backup(self, backup_id: str) -> int:
+        """Delete a backup and every backup building on it; returns the bytes freed"""
+        freed = 0
+        
+        for backup in self.db_manager.get_backup_descendants(backup_id):
+            self.db_manager.delete_backup_record(backup['id'])
             
-            return f"Data exported to {file_path}"
+            # Leave a file that a remaining backup still points to
+            if (os.path.exists(backup['file_path'])
+                    and not self.db_manager.count_backups_with_file(backup['file_path'])):
+                freed += os.path.getsize(backup['file_path'])
+                os.remove(backup['file_path'])
+        
+        return freed + self.collect_garbage()
     
-    def import_data(self, file_path: str, password: str = None, 
-                   merge: bool = False) -> str:
-        """Import data from a file, optionally decrypting with a password"""
+    def create_snapshot_backup(self, password: str = None, compression: str = 'zlib',
+                               progress: Callable[[int, int], None] = None,
+                               should_cancel: Callable[[], bool] = None) -> str:
+        """Back up the database file itself instead of exporting its rows.
+        
+        The database is copied page by page with the SQLite online backup
+        API, then compressed and encrypted into a backup container. This
+        skips serializing every row, so it restores much faster than an
+        export (making one is no faster, compression dominating either
+        way). It holds only profiles and insights and is restored with
+        restore_snapshot (or restore_backup). The backup is logged as a
+        'snapshot' and takes part in rotation. progress and should_cancel
+        work as for create_scheduled_backup.
+        """
+        # Microseconds keep backups made within the same second apart
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        file_path = os.path.join(self.backup_dir, f"backup_{timestamp}.snapshot")
+        
         try:
-            # Check if file is encrypted (encrypted files are binary)
-            is_encrypted = False
-            with open(file_path, 'rb') as f:
-                # Try to read as text - this will fail for encrypted files
-                try:
-                    f.read(10).decode('utf-8')
-                    is_encrypted = False
-                except UnicodeDecodeError:
-                    is_encrypted = True
+            self._write_snapshot(file_path, password, compression, progress, should_cancel)
+        except _BackupCancelled:
+            return "Backup cancelled"
+        
+        self.db_manager.log_backup(file_path, os.path.getsize(file_path), bool(password), kind='snapshot')
+        self.rotate_backups()
+        
+        if password:
+            return f"Encrypted snapshot backup created at {file_path}"
+        
+        return f"Snapshot backup created at {file_path}"
+    
+    def _write_snapshot(self, file_path: str, password: str = None, compression: str = 'zlib',
+                        progress=None, should_cancel=None):
+        """Copy the database and write the copy into a backup container at file_path"""
+        db_path = file_path + '.db.tmp'
+        tmp_path = file_path + '.tmp'
+        
+        try:
+            pages = self._copy_database(db_path, progress, should_cancel)
             
-            # Re-open file for proper reading
-            if is_encrypted:
-                if not password:
-                    return "Password required for encrypted file"
+            snapshot = sqlite3.connect(db_path)
+            try:
+                # Only the data tables are restored; the rest (settings holds
+                # the backup password in plain text) must not leave the device
+                snapshot.execute("PRAGMA journal_mode=DELETE")
+                tables = [row[0] for row in snapshot.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                )]
+                for table in tables:
+                    if table not in SQLiteManager.MERGE_COLUMNS:
+                        snapshot.execute(f"DELETE FROM {table}")
+                snapshot.commit()
+                # Rebuild the file so no freed page keeps the deleted rows
+                snapshot.execute("VACUUM")
                 
-                with open(file_path, 'rb') as f:
-                    # First 16 bytes are salt
-                    salt = f.read(16)
-                    encrypted_data = f.read()
+                # Row counts for the integrity trailer
+                rows = {table: snapshot.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                        for table in SQLiteManager.MERGE_COLUMNS}
+            finally:
+                snapshot.close()
+            
+            size = os.path.getsize(db_path)
+            header, data_key = self._container_key(password)
+            header['content'] = SNAPSHOT_CONTENT
+            
+            with open(tmp_path, 'wb') as f:
+                writer = BackupWriter(f, data_key, header, workers=self._crypto_workers(),
+                                      compression=compression)
                 
-                # Decrypt data
-                cipher, _ = self._generate_key_from_password(password, salt)
                 try:
-                    json_data = cipher.decrypt(encrypted_data).decode()
-                except Exception:
-                    return "Invalid password or corrupted file"
+                    with open(db_path, 'rb') as db_file:
+                        done = 0
+                        while True:
+                            data = db_file.read(IMPORT_READ_SIZE)
+                            if not data:
+                                break
+                            writer.write(data)
+                            done += len(data)
+                            
+                            if should_cancel and should_cancel():
+                                raise _BackupCancelled()
+                            if progress:
+                                # The copy was the first half of the work
+                                progress(pages + done * pages // size, pages * 2)
+                    
+                    writer.close({'rows': rows})
+                except BaseException:
+                    writer.abort()
+                    raise
+            
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            if os.path.exists(db_path):
+                os.remove(db_path)
+    
+    def _copy_database(self, dest_path: str, progress=None, should_cancel=None) -> int:
+        """Copy the database to dest_path with the SQLite online backup API; returns the page count.
+        
+        Pages are copied SNAPSHOT_PAGES_PER_STEP at a time, letting other
+        threads run between steps. progress(done, total) is called with
+        total twice the page count, the copy being half of a snapshot.
+        """
+        restarts = 0
+        last_remaining = None
+        page_count = 0
+        
+        def step(status, remaining, total):
+            nonlocal restarts, last_remaining, page_count
+            if last_remaining is not None and remaining > last_remaining:
+                restarts += 1
+            last_remaining = remaining
+            page_count = total
+            
+            if should_cancel and should_cancel():
+                raise _BackupCancelled()
+            if restarts > SNAPSHOT_MAX_RESTARTS:
+                raise _SnapshotRestarted()
+            if progress:
+                progress(total - remaining, total * 2)
+            
+            time.sleep(0)
+        
+        dest = sqlite3.connect(dest_path)
+        try:
+            try:
+                self.db_manager.conn.backup(dest, pages=SNAPSHOT_PAGES_PER_STEP, progress=step)
+            except _SnapshotRestarted:
+                self.db_manager.conn.backup(dest)
+            
+            if not page_count:
+                page_count = dest.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            dest.close()
+        
+        return page_count
+    
+    def restore_snapshot(self, file_path: str, password: str = None) -> str:
+        """Replace all profiles and insights with those of a snapshot backup.
+        
+        Backups, settings and other bookkeeping are kept as they are.
+        """
+        db_path = os.path.join(self.backup_dir, f"restore_{uuid.uuid4().hex}.db.tmp")
+        
+        try:
+            with open(file_path, 'rb') as f:
+                reader = BackupReader(f)
+                if reader.header.get('content') != SNAPSHOT_CONTENT:
+                    raise ValueError("Not a snapshot backup")
+                if reader.encrypted and not password:
+                    raise ValueError("Password required for encrypted file")
+                
+                key = self._key_from_header(password, reader.header) if reader.encrypted else None
+                
+                with open(db_path, 'wb') as out:
+                    for chunk in reader.chunks(key, self._crypto_workers()):
+                        out.write(chunk)
+            
+            counts = self.db_manager.restore_snapshot(db_path)
+            return (f"Successfully restored snapshot from {file_path} "
+                    f"({counts['profiles']} profiles, {counts['insights']} insights)")
+        
+        except ValueError as e:
+            return str(e)
+        except Exception as e:
+            return f"Error restoring snapshot: {str(e)}"
+        finally:
+            if os.path.exists(db_path):
+                os.remove(db_path)
+    
+    def _is_snapshot(self, file_path: str) -> bool:
+        """Check whether a file is a snapshot backup, from its header"""
+        if not is_backup_container(file_path):
+            return False
+        
+        with open(file_path, 'rb') as f:
+            return BackupReader(f).header.get('content') == SNAPSHOT_CONTENT
+    
+    def get_rotation_policy(self) -> Dict:
+        """Get the backup rotation policy: {'daily', 'weekly', 'monthly', 'max_bytes'} (0 for no limit)"""
+        policy = {}
+        for name, setting, default in (
+            ('daily', 'backup_keep_daily', DEFAULT_KEEP_DAILY),
+            ('weekly', 'backup_keep_weekly', DEFAULT_KEEP_WEEKLY),
+            ('monthly', 'backup_keep_monthly', DEFAULT_KEEP_MONTHLY),
+            ('max_bytes', 'backup_max_bytes', 0),
+        ):
+            try:
+                policy[name] = max(int(self.db_manager.get_setting(setting, str(default))), 0)
+            except ValueError:
+                policy[name] = default
+        
+        return policy
+    
+    def rotate_backups(self) -> Dict:
+        """Delete the scheduled backups the rotation policy no longer keeps.
+        
+        A backup is kept if it is the newest of one of the days, weeks or
+        months the policy keeps, together with the backups it builds on.
+        The newest backup is always kept, and incrementals whose full
+        backup is gone are deleted as they can never be restored. Then,
+        while backups take more than max_bytes, the oldest chain (a full
+        backup and its incrementals) is deleted, never the newest one.
+        Only the backup catalog is read. Returns
+        {'deleted': backups deleted, 'freed': bytes freed}.
+        """
+        policy = self.get_rotation_policy()
+        backups = self.db_manager.get_backup_history(kinds=SQLiteManager.SCHEDULED_BACKUP_KINDS)
+        if not backups:
+            return {'deleted': 0, 'freed': 0}
+        
+        by_id = {backup['id']: backup for backup in backups}
+        roots = {backup['id']: self._chain_root(backup, by_id) for backup in backups}
+        restorable = [backup for backup in backups if roots[backup['id']]]
+        
+        # Restore points to keep, newest first
+        points = {backups[0]['id']}
+        for count, period in (
+            (policy['daily'], lambda t: t.date()),
+            (policy['weekly'], lambda t: t.isocalendar()[:2]),
+            (policy['monthly'], lambda t: (t.year, t.month)),
+        ):
+            periods = set()
+            for backup in restorable:
+                key = period(datetime.datetime.fromisoformat(backup['timestamp']))
+                if key not in periods:
+                    if len(periods) == count:
+                        break
+                    periods.add(key)
+                    points.add(backup['id'])
+        
+        # A restore point needs every backup it builds on
+        keep = set()
+        for backup_id in points:
+            while backup_id in by_id and backup_id not in keep:
+                keep.add(backup_id)
+                backup_id = by_id[backup_id]['parent_id']
+        
+        deleted = 0
+        freed = 0
+        remaining = set(by_id)
+        
+        # Oldest first; deleting a backup also deletes what builds on it
+        for backup in reversed(backups):
+            if backup['id'] in remaining and backup['id'] not in keep:
+                descendants = self.db_manager.get_backup_descendants(backup['id'])
+                remaining -= {descendant['id'] for descendant in descendants}
+                deleted += len(descendants)
+                freed += self.delete_backup(backup['id'])
+        
+        if policy['max_bytes']:
+            chains = sorted(
+                {roots[backup_id] for backup_id in remaining if roots[backup_id]},
+                key=lambda root_id: by_id[root_id]['timestamp']
+            )
+            
+            while len(chains) > 1 and self._backup_storage_size() > policy['max_bytes']:
+                root_id = chains.pop(0)
+                descendants = self.db_manager.get_backup_descendants(root_id)
+                remaining -= {descendant['id'] for descendant in descendants}
+                deleted += len(descendants)
+                freed += self.delete_backup(root_id)
+        
+        return {'deleted': deleted, 'freed': freed}
+    
+    @staticmethod
+    def _chain_root(backup: Dict, by_id: Dict) -> Optional[str]:
+        """Get the id of the full backup (or snapshot) a backup builds on, or None if it is gone"""
+        seen = set()
+        while backup['kind'] == 'incremental':
+            if backup['parent_id'] not in by_id or backup['id'] in seen:
+                return None
+            seen.add(backup['id'])
+            backup = by_id[backup['parent_id']]
+        
+        return backup['id']
+    
+    def _backup_storage_size(self) -> int:
+        """Get the bytes taken by scheduled backup files and the chunk store"""
+        stats = self.db_manager.get_backup_stats()
+        return stats['size'] + stats['chunks_size']
+    
+    def reconcile_backups(self) -> Dict:
+        """Bring the backup catalog in line with the files on disk.
+        
+        Backups whose file is gone are dropped from the catalog (rotation
+        then deletes incrementals left without their full backup), and
+        backup files in the backup directory the catalog does not know are
+        added as 'external' backups. File sizes missing from older catalog
+        entries are filled in and the size totals recomputed. Returns
+        {'added', 'removed'}.
+        """
+        added = 0
+        removed = 0
+        known = set()
+        
+        for backup in self.db_manager.get_backup_history():
+            if os.path.exists(backup['file_path']):
+                known.add(os.path.abspath(backup['file_path']))
             else:
-                # Read plaintext JSON
-                with open(file_path, 'r') as f:
-                    json_data = f.read()
+                self.db_manager.delete_backup_record(backup['id'])
+                removed += 1
+        
+        if os.path.exists(self.backup_dir):
+            for filename in sorted(os.listdir(self.backup_dir)):
+                file_path = os.path.join(self.backup_dir, filename)
+                if (not filename.startswith('backup_') or not filename.endswith(('.json', '.snapshot'))
+                        or os.path.abspath(file_path) in known):
+                    continue
+                
+                stat = os.stat(file_path)
+                backup_id = self.db_manager.log_backup(
+                    file_path, stat.st_size, self._is_encrypted_file(file_path),
+                    kind='external',
+                    timestamp=datetime.datetime.fromtimestamp(stat.st_mtime).isoformat()
+                )
+                self._record_manifest_chunks(backup_id, file_path)
+                added += 1
+        
+        for backup in self.db_manager.get_backups_missing_file_size():
+            self.db_manager.set_backup_file_size(backup['id'], os.path.getsize(backup['file_path']))
+        
+        if removed:
+            self.collect_garbage()
+        self.db_manager.rebuild_backup_stats()
+        
+        return {'added': added, 'removed': removed}
+    
+    def _record_manifest_chunks(self, backup_id: str, file_path: str):
+        """Record the store chunks a manifest found on disk uses, so garbage collection keeps them"""
+        try:
+            if not is_chunk_manifest(file_path):
+                return
+            manifest = ChunkStore.read_manifest(file_path)
+        except (OSError, ValueError):
+            return
+        
+        root = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(file_path)), manifest['store']))
+        if os.path.dirname(root) != os.path.abspath(self.backup_dir):
+            return
+        
+        store = ChunkStore(root)
+        try:
+            chunks = [{'id': chunk_id, 'stored': store.stored_size(chunk_id)}
+                      for chunk_id, _, _ in manifest['chunks']]
+        except ValueError:
+            return
+        
+        if chunks:
+            self.db_manager.add_backup_chunks(backup_id, chunks, os.path.basename(root))
+    
+    def _is_encrypted_file(self, file_path: str) -> bool:
+        """Check whether a backup file needs a password, from its header only"""
+        try:
+            if is_backup_container(file_path):
+                with open(file_path, 'rb') as f:
+                    return BackupReader(f).encrypted
             
-            # Parse JSON data
-            import_data = json.loads(json_data)
+            if is_chunk_manifest(file_path):
+                manifest = ChunkStore.read_manifest(file_path)
+                key_path = os.path.join(os.path.dirname(os.path.abspath(file_path)),
+                                        manifest['store'], 'key.json')
+                with open(key_path, 'r') as f:
+                    return 'kdf' in json.load(f)
             
-            # Validate version
-            if 'version' not in import_data:
-                return "Invalid backup file format"
+            # Legacy encrypted files are binary
+            with open(file_path, 'rb') as f:
+                f.read(10).decode('utf-8')
+            return False
+        except (OSError, ValueError):
+            return True
+    
+    def collect_garbage(self) -> int:
+        """Delete store chunks no backup uses any more; returns the bytes freed.
+        
+        A store other than the current one is deleted as a whole once none
+        of its chunks is used.
+        """
+        names = self._chunk_store_names()
+        if not names:
+            return 0
+        
+        current = self.db_manager.get_setting('backup_chunk_store', DEFAULT_CHUNK_STORE)
+        
+        # Deleting needs no key, so this works for encrypted stores too
+        unreferenced = self.db_manager.get_unreferenced_chunks()
+        freed = 0
+        for chunk in unreferenced:
+            if chunk['store'] in names:
+                freed += ChunkStore(os.path.join(self.backup_dir, chunk['store'])).delete(chunk['chunk_id'])
+        if unreferenced:
+            self.db_manager.forget_chunks([chunk['chunk_id'] for chunk in unreferenced])
+        
+        for name in names:
+            root = os.path.join(self.backup_dir, name)
+            known = self.db_manager.get_known_chunks(name)
             
-            # If not merging, clear existing data
-            if not merge:
-                # Get all existing profiles
-                profiles = self.db_manager.get_profiles()
-                for profile in profiles:
-                    self.db_manager.delete_profile(profile.id)
+            if name != current and not known:
+                # Left behind by a password change, and its last backup is gone
+                for _, path in ChunkStore(root).iter_files():
+                    freed += os.path.getsize(path)
+                shutil.rmtree(root, ignore_errors=True)
+                continue
             
-            # Import profiles
-            for profile_dict in import_data.get('profiles', []):
-                profile = UserProfile.from_dict(profile_dict)
-                self.db_manager.save_profile(profile)
+            # Chunks (and temporary files) left by a backup that never recorded them
+            for chunk_id, path in ChunkStore(root).iter_files(ORPHAN_CHUNK_MIN_AGE):
+                if chunk_id not in known:
+                    try:
+                        size = os.path.getsize(path)
+                        os.remove(path)
+                    except FileNotFoundError:
+                        continue
+                    freed += size
+        
+        return freed
+    
+    def import_data(self, file_path: str, password: str = None, 
+                   merge: bool = False, progress: Callable[[int, int], None] = None,
+                   should_cancel: Callable[[], bool] = None, on_conflict: str = 'keep') -> str:
+        """Import data from a file, optionally decrypting with a password.
+        
+        The file is decrypted, parsed and staged as a stream, then only rows
+        that are new or changed are written, in a single transaction. Without
+        merge, data missing from the file is deleted. When merging, rows
+        changed locally since the file was exported are conflicts, kept
+        unless on_conflict is 'replace'. progress(done, total) is called as
+        the file is read; if should_cancel() returns true the import stops
+        and nothing is changed. Snapshot backups are restored (replacing
+        all data) rather than imported, and cannot be merged.
+        """
+        try:
+            if self._is_snapshot(file_path):
+                if merge:
+                    return "Snapshot backups can only be restored, not merged"
+                return self.restore_snapshot(file_path, password)
             
-            # Import insights
-            for insight_dict in import_data.get('insights', []):
-                insight = PersonalityInsight.from_dict(insight_dict)
-                self.db_manager.save_insight(insight)
+            report = self._run_import(
+                file_path, password, merge,
+                overwrite_conflicts=on_conflict == 'replace',
+                progress=progress,
+                should_cancel=should_cancel
+            )
+            if report is None:
+                return "Import cancelled"
             
-            return f"Successfully imported data from {file_path}"
+            summary = self._format_import_report(report, on_conflict == 'replace')
+            return f"Successfully imported data from {file_path} ({summary})"
         
+        except ValueError as e:
+            return str(e)
         except Exception as e:
             return f"Error importing data: {str(e)}"
     
-    def create_scheduled_backup(self) -> str:
-        """Create an automatic backup with timestamp filename"""
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    def preview_import(self, file_path: str, password: str = None, merge: bool = False) -> Dict:
+        """Report what importing a file would insert, update, delete or conflict with, without writing.
+        
+        Returns the merge report of SQLiteManager.merge_records, or
+        {'error': message} if the file cannot be read.
+        """
+        try:
+            return self._run_import(file_path, password, merge, dry_run=True)
+        except Exception as e:
+            return {'error': str(e)}
+    
+    def _run_import(self, file_path: str, password: str = None, merge: bool = False,
+                    overwrite_conflicts: bool = False, dry_run: bool = False,
+                    progress=None, should_cancel=None) -> Optional[Dict]:
+        """Stream a file into the merge engine; returns its report (None if cancelled)"""
+        pieces, total = self._open_import_source(file_path, password)
+        events = iter(JSONObjectStream(self._report_progress(pieces, total, progress)))
+        
+        # Read the document header up to the first profile or insight
+        header = {}
+        first_item = None
+        for event in events:
+            if event[0] == 'item':
+                first_item = event
+                break
+            header[event[1]] = event[2]
+        
+        # Validate version
+        if 'version' not in header:
+            raise ValueError("Invalid backup file format")
+        
+        # Incremental backups only make sense on top of the data they
+        # were taken from
+        backup = header.get('backup')
+        if isinstance(backup, dict) and backup.get('kind') == 'incremental':
+            merge = True
+        
+        items = itertools.chain([first_item] if first_item else [], events)
+        records = (
+            self._import_record(key, value)
+            for event, key, value in items
+            if event == 'item' and key in self.IMPORT_ARRAYS
+        )
+        
+        exported_at = header.get('timestamp')
+        return self.db_manager.merge_records(
+            records,
+            replace_all=not merge,
+            since=exported_at if merge and isinstance(exported_at, str) else None,
+            overwrite_conflicts=overwrite_conflicts,
+            dry_run=dry_run,
+            should_cancel=should_cancel
+        )
+    
+    @staticmethod
+    def _format_import_report(report: Dict, overwrite_conflicts: bool = False) -> str:
+        """Summarize a merge report in a sentence fragment"""
+        parts = []
+        for label, action in (('added', 'insert'), ('updated', 'update'),
+                              ('unchanged', 'unchanged'), ('deleted', 'delete')):
+            count = report['profiles'][action] + report['insights'][action]
+            if count:
+                parts.append(f"{count} {label}")
+        
+        conflicts = report['profiles']['conflict'] + report['insights']['conflict']
+        if conflicts:
+            parts.append(f"{conflicts} conflicts {'overwritten' if overwrite_conflicts else 'kept local'}")
+        
+        return ", ".join(parts) or "no changes"
+    
+    def _import_record(self, key: str, value) -> Tuple[str, object]:
+        """Validate one element of an export document's arrays and build its import record"""
+        kind = self.IMPORT_ARRAYS[key]
+        
+        if kind in ('delete_profile', 'delete_insight'):
+            if not isinstance(value, str) or not value:
+                raise ValueError(f"Invalid id in {key}: {value!r}")
+            return kind, value
+        
+        if not isinstance(value, dict):
+            raise ValueError(f"Invalid entry in {key}")
+        
+        try:
+            if kind == 'profile':
+                record = UserProfile.from_dict(value)
+                valid = (
+                    isinstance(record.id, str) and isinstance(record.name, str)
+                    and isinstance(record.age, int) and not isinstance(record.age, bool)
+                    and isinstance(record.created_at, str) and isinstance(record.last_updated, str)
+                )
+            else:
+                record = PersonalityInsight.from_dict(value)
+                valid = (
+                    isinstance(record.id, str) and isinstance(record.user_id, str)
+                    and isinstance(record.timestamp, str) and isinstance(record.context, dict)
+                    and isinstance(record.traits, dict)
+                    and all(isinstance(score, (int, float)) for score in record.traits.values())
+                    and isinstance(record.confidence_score, (int, float))
+                )
+        except (TypeError, ValueError, KeyError) as e:
+            raise ValueError(f"Invalid entry in {key}: {e}")
+        
+        if not valid:
+            raise ValueError(f"Invalid entry in {key}: {value.get('id')!r}")
+        
+        return kind, record
+    
+    def _open_import_source(self, file_path: str, password: str = None) -> Tuple[Iterator, int]:
+        """Open an export file for streaming.
+        
+        Returns (pieces, total): pieces yields (data, done) pairs of the
+        decrypted document and how far through total the file has been read.
+        Password problems are raised here, before anything is read further.
+        """
+        total = os.path.getsize(file_path)
+        
+        if is_backup_container(file_path):
+            f = open(file_path, 'rb')
+            try:
+                reader = BackupReader(f)
+                if reader.encrypted and not password:
+                    raise ValueError("Password required for encrypted file")
+                
+                key = self._key_from_header(password, reader.header) if reader.encrypted else None
+            except BaseException:
+                f.close()
+                raise
+            
+            def pieces():
+                with f:
+                    for chunk in reader.chunks(key, self._crypto_workers()):
+                        yield chunk, f.tell()
+            
+            return pieces(), total
+        
+        if is_chunk_manifest(file_path):
+            manifest = ChunkStore.read_manifest(file_path)
+            root = os.path.join(os.path.dirname(os.path.abspath(file_path)), manifest['store'])
+            store = self._open_chunk_store(password, root)
+            
+            # Authenticate the chunk list itself; the chunks are checked as read
+            store.verify_manifest(manifest, sample=0)
+            
+            def pieces():
+                done = 0
+                for chunk in store.read_chunks(manifest):
+                    done += len(chunk)
+                    yield chunk, done
+            
+            return pieces(), manifest['size']
+        
+        # Check if file is encrypted (encrypted files are binary)
+        with open(file_path, 'rb') as f:
+            try:
+                f.read(10).decode('utf-8')
+                is_encrypted = False
+            except UnicodeDecodeError:
+                is_encrypted = True
+        
+        if is_encrypted:
+            if not password:
+                raise ValueError("Password required for encrypted file")
+            
+            with open(file_path, 'rb') as f:
+                # First 16 bytes are salt
+                salt = f.read(16)
+                encrypted_data = f.read()
+            
+            # Legacy Fernet files can only be decrypted as a whole
+            cipher, _ = self._generate_key_from_password(password, salt)
+            try:
+                return iter([(cipher.decrypt(encrypted_data), total)]), total
+            except Exception:
+                raise ValueError("Invalid password or corrupted file")
+        
+        # Plaintext JSON is read in blocks
+        def pieces():
+            with open(file_path, 'rb') as f:
+                while True:
+                    data = f.read(IMPORT_READ_SIZE)
+                    if not data:
+                        return
+                    yield data, f.tell()
+        
+        return pieces(), total
+    
+    @staticmethod
+    def _report_progress(pieces, total: int, progress=None):
+        """Yield the data of (data, done) pairs, reporting progress after each"""
+        for data, done in pieces:
+            yield data
+            if progress:
+                progress(done, total)
+    
+    def verify_backup(self, file_path: str, password: str = None, sample: int = None) -> Dict:
+        """Check a backup's integrity without importing it or writing to the database.
+        
+        Backups with an integrity manifest are verified by hashing their
+        stored frames or chunks (all of them, or a random sample of sample)
+        without decrypting; with the password the manifest is authenticated
+        too. Older backups are checked by decrypting and parsing them in a
+        streaming pass. Returns {'ok', 'error', 'format', 'authenticated',
+        'checked', 'total', 'rows'}.
+        """
+        result = {'ok': False, 'error': None, 'format': None, 'authenticated': False,
+                  'checked': 0, 'total': 0, 'rows': None}
+        
+        try:
+            if is_chunk_manifest(file_path):
+                result['format'] = 'chunked'
+                manifest = ChunkStore.read_manifest(file_path)
+                root = os.path.join(os.path.dirname(os.path.abspath(file_path)), manifest['store'])
+                
+                try:
+                    store = self._open_chunk_store(password, root)
+                except ValueError:
+                    if password:
+                        raise
+                    # Without the password only the chunk hashes can be checked
+                    store = ChunkStore(root)
+                
+                report = store.verify_manifest(manifest, sample)
+                result.update(
+                    authenticated=report['authenticated'],
+                    checked=report['checked'],
+                    total=report['chunks'],
+                    rows=report['rows']
+                )
+            elif is_backup_container(file_path):
+                result['format'] = 'container'
+                
+                with open(file_path, 'rb') as f:
+                    reader = BackupReader(f)
+                    
+                    if reader.has_trailer:
+                        key = None
+                        if reader.encrypted and password:
+                            key = self._key_from_header(password, reader.header)
+                        
+                        report = reader.verify(key, sample)
+                        result.update(
+                            authenticated=report['authenticated'],
+                            checked=report['checked'],
+                            total=report['frames'],
+                            rows=report['rows']
+                        )
+                    else:
+                        result.update(self._verify_by_parsing(file_path, password))
+                        result['authenticated'] = reader.encrypted
+            else:
+                result.update(self._verify_by_parsing(file_path, password))
+                
+                # Legacy encrypted files are binary and authenticated by Fernet
+                with open(file_path, 'rb') as f:
+                    try:
+                        f.read(10).decode('utf-8')
+                        result['format'] = 'json'
+                    except UnicodeDecodeError:
+                        result.update(format='legacy', authenticated=True)
+            
+            result['ok'] = True
+        except Exception as e:
+            result['error'] = str(e)
+        
+        return result
+    
+    def _verify_by_parsing(self, file_path: str, password: str = None) -> Dict:
+        """Check a backup without an integrity manifest by decrypting and parsing all of it"""
+        pieces, total = self._open_import_source(file_path, password)
+        rows = {}
+        
+        for event, key, _ in JSONObjectStream(data for data, _ in pieces):
+            if event == 'item':
+                rows[key] = rows.get(key, 0) + 1
+        
+        return {'checked': total, 'total': total, 'rows': rows}
+    
+    def verify_backups(self, sample: int = None) -> List[Dict]:
+        """Verify every backup in the backup history (see verify_backup), newest first"""
+        password = None
+        if self.db_manager.get_setting('encrypt_backups', 'false') == 'true':
+            password = self.db_manager.get_setting('backup_password', '') or None
+        
+        results = []
+        for backup in self.db_manager.get_backup_history():
+            if os.path.exists(backup['file_path']):
+                result = self.verify_backup(backup['file_path'], password, sample)
+            else:
+                result = {'ok': False, 'error': "Backup file missing"}
+            
+            result['id'] = backup['id']
+            result['file_path'] = backup['file_path']
+            results.append(result)
+        
+        return results
+    
+    def create_scheduled_backup(self, progress: Callable[[int, int], None] = None,
+                                should_cancel: Callable[[], bool] = None) -> str:
+        """Create an automatic backup with timestamp filename.
+        
+        The backup is incremental (only what changed since the previous
+        scheduled backup) unless a full one is due: when there is no usable
+        chain yet, or the chain has reached the backup_full_interval setting.
+        With the backup_mode setting 'snapshot', a snapshot backup is made
+        instead (unless backups are anonymized, which needs the export).
+        progress(done, total) is called as rows are written; if
+        should_cancel() returns true the backup is abandoned and nothing is
+        kept.
+        """
+        # Microseconds keep backups made within the same second apart
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         filename = f"backup_{timestamp}.json"
         file_path = os.path.join(self.backup_dir, filename)
         
@@ -179,11 +1268,140 @@ class SecureDataManager:
         encrypt_backups = self.db_manager.get_setting('encrypt_backups', 'false') == 'true'
         backup_password = self.db_manager.get_setting('backup_password', '')
         anonymize = self.db_manager.get_setting('anonymize_backups', 'false') == 'true'
+        compression = self.db_manager.get_setting('backup_compression', 'zlib')
+        password = backup_password if encrypt_backups and backup_password else None
         
-        if encrypt_backups and backup_password:
-            return self.export_data(file_path, backup_password, anonymize)
-        else:
-            return self.export_data(file_path, None, anonymize)
+        if self.db_manager.get_setting('backup_mode', 'export') == 'snapshot' and not anonymize:
+            return self.create_snapshot_backup(password, compression, progress, should_cancel)
+        
+        parent = self._incremental_parent(password)
+        
+        # Read before exporting: anything changed while the export runs is
+        # picked up (again) by the next backup
+        change_seq = self.db_manager.get_change_seq()
+        
+        backup = {
+            'id': str(uuid.uuid4()),
+            'kind': 'incremental' if parent else 'full',
+            'parent': parent['id'] if parent else None,
+            'change_seq': change_seq
+        }
+        
+        store = None
+        if self.db_manager.get_setting('backup_dedup', 'true') == 'true':
+            store_name, store = self._backup_chunk_store(password)
+        
+        changed_since = parent['change_seq'] if parent else None
+        
+        try:
+            if store:
+                chunks = self._write_chunked_export(
+                    file_path, store, anonymize, compression, changed_since, backup,
+                    progress=progress,
+                    should_cancel=should_cancel
+                )
+                
+                # The backup costs its manifest plus the chunks no earlier backup had
+                file_size = os.path.getsize(file_path)
+                size = file_size + sum(chunk['stored'] for chunk in chunks if chunk['new'])
+            else:
+                self._write_export(
+                    file_path, password, anonymize,
+                    compression=compression,
+                    changed_since=changed_since,
+                    backup=backup,
+                    progress=progress,
+                    should_cancel=should_cancel
+                )
+                size = file_size = os.path.getsize(file_path)
+        except _BackupCancelled:
+            return "Backup cancelled"
+        
+        self.db_manager.log_backup(
+            file_path, size, bool(password),
+            kind=backup['kind'],
+            parent_id=backup['parent'],
+            change_seq=change_seq,
+            backup_id=backup['id'],
+            file_size=file_size,
+            key_check=self._key_check(password)
+        )
+        
+        if store:
+            self.db_manager.add_backup_chunks(backup['id'], chunks, store_name)
+        
+        if not parent:
+            # Later incrementals build on this backup, so older changes are not needed
+            self.db_manager.prune_change_log(change_seq)
+        
+        self.rotate_backups()
+        
+        kind = 'Incremental backup' if parent else 'Backup'
+        if password:
+            return f"Encrypted {kind.lower()} created at {file_path}"
+        
+        return f"{kind} created at {file_path}"
+    
+    def _incremental_parent(self, password: str = None) -> Optional[Dict]:
+        """Get the backup the next scheduled backup can build on, or None if a full backup is due.
+        
+        A chain is restored with a single password, so a full backup is
+        also due when backups are now encrypted differently (or with a
+        different password) than the chain's full backup.
+        """
+        latest = self.db_manager.get_latest_backup()
+        if not latest:
+            return None
+        
+        try:
+            full_interval = int(self.db_manager.get_setting('backup_full_interval', '7'))
+        except ValueError:
+            full_interval = 7
+        
+        chain = self.db_manager.get_backup_chain(latest['id'])
+        if len(chain) >= full_interval or chain[0]['kind'] != 'full':
+            return None
+        
+        # An incremental on top of a missing file could never be restored
+        if not all(os.path.exists(backup['file_path']) for backup in chain):
+            return None
+        
+        if chain[0]['encrypted'] != bool(password):
+            return None
+        
+        if password:
+            # Backups logged before key checks were recorded can't be matched
+            key_check = self.db_manager.get_backup_key_check(chain[0]['id'])
+            if not key_check or not self._matches_key_check(password, key_check):
+                return None
+        
+        return latest
+    
+    def restore_backup(self, backup_id: str, password: str = None) -> str:
+        """Restore a scheduled backup by replacing all data with its full backup and replaying its incrementals"""
+        chain = self.db_manager.get_backup_chain(backup_id)
+        if not chain:
+            return "Backup not found"
+        
+        if chain[0]['kind'] == 'snapshot':
+            if not os.path.exists(chain[0]['file_path']):
+                return f"Backup file missing: {chain[0]['file_path']}"
+            return self.restore_snapshot(chain[0]['file_path'], password)
+        
+        if chain[0]['kind'] != 'full':
+            return "Backup chain has no full backup"
+        
+        missing = [backup['file_path'] for backup in chain if not os.path.exists(backup['file_path'])]
+        if missing:
+            return f"Backup file missing: {missing[0]}"
+        
+        for i, backup in enumerate(chain):
+            # Replaying the chain overwrites whatever the earlier steps left
+            result = self.import_data(backup['file_path'], password, merge=i > 0, on_conflict='replace')
+            if not result.startswith("Successfully"):
+                return result
+        
+        return f"Successfully restored backup from {chain[-1]['timestamp']} ({len(chain)} files)"
     
     def _anonymize_profiles(self, profiles: List[UserProfile]) -> List[UserProfile]:
         """Create anonymized copies of profiles for export"""
@@ -205,14 +1423,19 @@ class SecureDataManager:
         return anonymized
     
     def delete_all_data(self) -> bool:
-        """Delete all data (factory reset)"""
+        """Delete all data (factory reset).
+        
+        Every other connection to the database (background workers) must
+        be closed first, or it would go on using the deleted data.
+        """
         try:
             # Close the connection
             self.db_manager.close()
             
-            # Delete the database file
-            if os.path.exists(self.db_manager.db_path):
-                os.remove(self.db_manager.db_path)
+            # Delete the database file, with its write-ahead log and journal
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(self.db_manager.db_path + suffix):
+                    os.remove(self.db_manager.db_path + suffix)
             
             # Create a new empty database
             self.db_manager = SQLiteManager(self.db_manager.db_path)
@@ -222,30 +1445,15 @@ class SecureDataManager:
             return False
             
     def get_backup_info(self) -> Dict:
-        """Get information about backups"""
-        # Count backups
-        backup_count = 0
-        total_size = 0
-        latest_backup = None
-        
-        if os.path.exists(self.backup_dir):
-            backup_files = [f for f in os.listdir(self.backup_dir) 
-                           if f.startswith('backup_') and f.endswith('.json')]
-            backup_count = len(backup_files)
-            
-            if backup_files:
-                # Get total size
-                for f in backup_files:
-                    file_path = os.path.join(self.backup_dir, f)
-                    total_size += os.path.getsize(file_path)
-                
-                # Get latest backup
-                backup_files.sort(reverse=True)  # Sort by name (which includes timestamp)
-                latest_backup = backup_files[0]
+        """Get information about backups, from the backup catalog"""
+        stats = self.db_manager.get_backup_stats(SQLiteManager.SCHEDULED_BACKUP_KINDS + ('external',))
+        latest = self.db_manager.get_latest_backup()
         
         return {
-            'count': backup_count,
-            'total_size': total_size,
-            'latest_backup': latest_backup,
-            'backup_dir': os.path.abspath(self.backup_dir)
+            'count': stats['count'],
+            # Deduplicated backups keep most of their data in the chunk store
+            'total_size': stats['size'] + stats['chunks_size'],
+            'latest_backup': os.path.basename(latest['file_path']) if latest else None,
+            'backup_dir': os.path.abspath(self.backup_dir),
+            'policy': self.get_rotation_policy()
         }
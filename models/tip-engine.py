@@ -0,0 +1,104 @@
+import os
+import json
+import math
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+from .enums import AgeGroup
+from .data_classes import PersonalityInsight, DevelopmentalTip
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), 'tip-catalog.json')
+
+class TipEngine:
+    """Generates developmental tips from a declarative tip catalog.
+    
+    The catalog lists, per age group and trait, score bands with a
+    description and tip texts. A band starts at "min" (inclusive) or
+    "above" (exclusive). At load time each trait's bands are compiled into
+    a sorted array of inclusive lower bounds, so a lookup is one bisect.
+    """
+    
+    def __init__(self, catalog_path: str = DEFAULT_CATALOG_PATH):
+        """Load and compile the tip catalog"""
+        with open(catalog_path, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        
+        self.version = catalog.get('version', 1)
+        self._colors = self._compile_bands(catalog['score_colors'], 'score_colors')
+        
+        # age group -> [(trait name, display name, bounds, bands)] in catalog order
+        self._rules: Dict[AgeGroup, List[tuple]] = {}
+        for group_value, traits in catalog['age_groups'].items():
+            self._rules[AgeGroup(group_value)] = [
+                (trait_name, trait_name.replace('_', ' ').title(),
+                 *self._compile_bands(bands, f"{group_value}/{trait_name}"))
+                for trait_name, bands in traits.items()
+            ]
+    
+    @staticmethod
+    def _compile_bands(bands, where) -> Tuple[List[float], List[dict]]:
+        """Sort bands by lower bound and return (bounds, bands)"""
+        compiled = []
+        for band in bands:
+            if 'min' in band:
+                bound = float(band['min'])
+            elif 'above' in band:
+                # Turn an exclusive bound into the next representable inclusive one
+                bound = math.nextafter(float(band['above']), math.inf)
+            else:
+                raise ValueError(f"Band without 'min' or 'above' in {where}")
+            compiled.append((bound, band))
+        
+        if not compiled:
+            raise ValueError(f"No bands defined for {where}")
+        
+        compiled.sort(key=lambda item: item[0])
+        return [bound for bound, _ in compiled], [band for _, band in compiled]
+    
+    @staticmethod
+    def _lookup(bounds, bands, score):
+        """Find the band containing a score; scores below the first band use it"""
+        return bands[max(bisect_right(bounds, score) - 1, 0)]
+    
+    def score_color(self, score: float) -> List[float]:
+        """Get the RGBA color for a trait score"""
+        return list(self._lookup(*self._colors, score)['color'])
+    
+    def trait_names(self, age_group: AgeGroup) -> List[str]:
+        """Get the traits that have tips for an age group, in display order"""
+        return [rule[0] for rule in self._rules.get(age_group, [])]
+    
+    def generate_tips(self, age_group: AgeGroup, insight: PersonalityInsight) -> List[DevelopmentalTip]:
+        """Generate tips for the traits of one insight"""
+        traits = insight.traits
+        tips = []
+        
+        for trait_name, display_name, bounds, bands in self._rules.get(age_group, []):
+            score = traits.get(trait_name)
+            if score is None:
+                continue
+            
+            band = self._lookup(bounds, bands, score)
+            color = self._lookup(*self._colors, score)['color']
+            tips.append(DevelopmentalTip(
+                trait_name=display_name,
+                score=score,
+                description=band['description'],
+                tips=list(band['tips']),
+                color=list(color)
+            ))
+        
+        return tips
+    
+    def generate_tips_batch(self, items: Iterable[Tuple[AgeGroup, PersonalityInsight]]) -> List[List[DevelopmentalTip]]:
+        """Generate tips for many (age group, insight) pairs at once"""
+        return [self.generate_tips(age_group, insight) for age_group, insight in items]
+
+_default_engine = None
+
+def get_tip_engine() -> TipEngine:
+    """Get the shared engine for the bundled catalog, loading it on first use"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = TipEngine()
+    return _default_engine
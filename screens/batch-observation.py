@@ -0,0 +1,156 @@
+from kivy.app import App
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.metrics import dp
+
+from screens.track_behavior import TrackBehaviorScreen
+
+BATCH_ROSTER_PAGE_SIZE = 100
+
+class BatchObservationScreen(TrackBehaviorScreen):
+    """Records the same traits for a whole group of children in one sitting.
+    
+    The roster is every child in the selected profile's age group, so one set
+    of sliders fits them all and is reused from child to child. It is loaded
+    a page at a time as the observer moves through it. Observations
+    are kept on the screen until the observer saves them, then queued on the
+    observation journal together, which writes them in the background.
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.roster = []  # profile rows in the session's age group, loaded so far
+        self.roster_total = 0
+        self._roster_complete = False
+        self.position = 0
+        self.recorded = {}  # profile id -> PersonalityInsight
+        self._age_group = None
+        
+        self.save_btn.text = 'SAVE ALL'
+        
+        # Navigation between children, just above the save button
+        nav_layout = BoxLayout(size_hint_y=None, height=dp(50), spacing=dp(10))
+        
+        self.prev_btn = Button(
+            text='← Previous',
+            background_color=(0.9, 0.9, 0.9, 1)
+        )
+        self.prev_btn.bind(on_press=self.previous_child)
+        
+        skip_btn = Button(
+            text='Skip',
+            background_color=(0.9, 0.9, 0.9, 1)
+        )
+        skip_btn.bind(on_press=self.skip_child)
+        
+        record_btn = Button(
+            text='Record & Next',
+            background_color=(1, 0.6, 0.2, 1)
+        )
+        record_btn.bind(on_press=self.record_child)
+        
+        nav_layout.add_widget(self.prev_btn)
+        nav_layout.add_widget(skip_btn)
+        nav_layout.add_widget(record_btn)
+        
+        layout = self.save_btn.parent
+        layout.add_widget(nav_layout, index=layout.children.index(self.save_btn) + 1)
+    
+    def set_profile(self, profile):
+        """Start a session with the children in the profile's age group, beginning with this one"""
+        self.profile = profile
+        self.recorded = {}
+        self.roster = []
+        self.roster_total = self.db_manager.count_profiles(age_group=profile.age_group)
+        self._roster_complete = False
+        
+        # Load pages up to the selected child, whom the session starts with
+        while not any(row['id'] == profile.id for row in self._load_roster_page()):
+            if self._roster_complete:
+                break
+        
+        roster_ids = [row['id'] for row in self.roster]
+        self.position = roster_ids.index(profile.id) if profile.id in roster_ids else 0
+        self.title_label.text = f"Class: Ages {profile.age_group.value}"
+        
+        # The sliders only depend on the age group
+        if self._age_group != profile.age_group:
+            self.update_content()
+            self._age_group = profile.age_group
+        
+        self._show_child()
+    
+    def _load_roster_page(self):
+        """Load the next page of the roster; returns its rows"""
+        if self._roster_complete:
+            return []
+        
+        rows = self.db_manager.get_profile_rows(
+            age_group=self.profile.age_group,
+            offset=len(self.roster),
+            limit=BATCH_ROSTER_PAGE_SIZE
+        )
+        self.roster.extend(rows)
+        self._roster_complete = len(rows) < BATCH_ROSTER_PAGE_SIZE
+        return rows
+    
+    def _show_child(self):
+        """Show the current child, with their recorded values if any"""
+        row = self.roster[self.position]
+        self.child_name.text = (
+            f"{self.position + 1} of {max(self.roster_total, len(self.roster))}: "
+            f"{row['name']} (Age {row['age']})"
+        )
+        
+        insight = self.recorded.get(row['id'])
+        for trait_id, slider in self.sliders.items():
+            slider.value = insight.traits.get(trait_id, 0.5) if insight else 0.5
+        
+        self.prev_btn.disabled = self.position == 0
+        self.save_btn.text = f"SAVE ALL ({len(self.recorded)})"
+    
+    def record_child(self, instance):
+        """Record the sliders for the current child and move on"""
+        row = self.roster[self.position]
+        self.recorded[row['id']] = self._make_insight(row['id'], row['age_group'])
+        self._advance()
+    
+    def skip_child(self, instance):
+        """Move on without recording the current child"""
+        self._advance()
+    
+    def previous_child(self, instance):
+        """Go back to the previous child"""
+        if self.position > 0:
+            self.position -= 1
+            self._show_child()
+    
+    def _advance(self):
+        """Go to the next child, staying on the last one at the end of the roster"""
+        if self.position == len(self.roster) - 1:
+            self._load_roster_page()
+        
+        if self.position < len(self.roster) - 1:
+            self.position += 1
+        self._show_child()
+    
+    def save_observations(self, instance):
+        """Queue all recorded observations for saving"""
+        if not self.db_manager or not self.recorded:
+            self._show_message_popup("Error", "No observations recorded yet.")
+            return
+        
+        # The journal group-commits them to the database in the background
+        try:
+            App.get_running_app().observation_journal.append_many(list(self.recorded.values()))
+        except Exception as e:
+            self._show_message_popup("Error", f"Failed to save observations: {str(e)}")
+            return
+        
+        count = len(self.recorded)
+        self.recorded = {}
+        self._show_message_popup(
+            "Success",
+            f"Observations saved for {count} children!",
+            self.go_back
+        )
@@ -0,0 +1,150 @@
+import os
+import struct
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+# Disk cache directory, used when the chart_disk_cache setting is on
+CHART_CACHE_DIR = 'chart_cache'
+
+# Header for on-disk entries: width, height, length of the data version string
+_DISK_HEADER = struct.Struct('>IIH')
+
+@dataclass
+class RenderedChart:
+    """A rasterized chart as raw RGBA pixels (top row first)"""
+    width: int
+    height: int
+    pixels: bytes
+    texture: object = None  # Kivy texture, created lazily on the UI thread
+
+class ChartCache:
+    """LRU cache of rendered charts, optionally persisted to disk"""
+    
+    def __init__(self, max_entries: int = 16, cache_dir: str = None):
+        """Initialize with the number of charts kept in memory and an optional disk directory"""
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        
+        # Create cache directory if it doesn't exist
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+    
+    @staticmethod
+    def make_key(profile_id: str, data_version: tuple, size: Tuple[int, int],
+                 progress_mode: bool) -> tuple:
+        """Build a cache key for a profile's chart"""
+        return (profile_id, tuple(data_version), (int(size[0]), int(size[1])), bool(progress_mode))
+    
+    def get(self, key: tuple) -> Optional[RenderedChart]:
+        """Get a cached chart, checking memory first and then disk"""
+        chart = self._entries.get(key)
+        if chart is not None:
+            self._entries.move_to_end(key)
+            return chart
+        
+        chart = self._read_from_disk(key)
+        if chart is not None:
+            self._remember(key, chart)
+        
+        return chart
+    
+    def put(self, key: tuple, chart: RenderedChart):
+        """Store a rendered chart"""
+        self._remember(key, chart)
+        self._write_to_disk(key, chart)
+    
+    def invalidate(self, profile_id: str):
+        """Drop all cached charts for a profile"""
+        for key in [k for k in self._entries if k[0] == profile_id]:
+            del self._entries[key]
+        
+        if self.cache_dir:
+            for filename in os.listdir(self.cache_dir):
+                if filename.startswith(f"{profile_id}_"):
+                    os.remove(os.path.join(self.cache_dir, filename))
+    
+    def prune(self, profile_ids: Iterable[str]):
+        """Drop the cached charts of every profile not in profile_ids (e.g. after deletions)"""
+        keep = set(profile_ids)
+        
+        for key in [k for k in self._entries if k[0] not in keep]:
+            del self._entries[key]
+        
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for filename in os.listdir(self.cache_dir):
+                # File names start with the profile id (see _disk_path)
+                if filename.rsplit('_', 2)[0] not in keep:
+                    os.remove(os.path.join(self.cache_dir, filename))
+    
+    def clear(self):
+        """Drop all cached charts from memory"""
+        self._entries.clear()
+    
+    def _remember(self, key, chart):
+        """Add a chart to the in-memory LRU, evicting the oldest entry if full"""
+        self._entries[key] = chart
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _disk_path(self, key):
+        """Get the file path for a key.
+        
+        There is one file per (profile, size, mode); the data version is stored
+        inside the file so a newer render simply overwrites the stale one.
+        """
+        profile_id, _, (width, height), progress_mode = key
+        mode = 'progress' if progress_mode else 'insights'
+        return os.path.join(self.cache_dir, f"{profile_id}_{mode}_{width}x{height}.rgba")
+    
+    @staticmethod
+    def _version_tag(key) -> bytes:
+        """Get a compact tag for the key's data version"""
+        return hashlib.sha1(repr(key[1]).encode()).hexdigest().encode()
+    
+    def _read_from_disk(self, key) -> Optional[RenderedChart]:
+        """Load a chart from disk if it exists and matches the data version"""
+        if not self.cache_dir:
+            return None
+        
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        
+        try:
+            with open(path, 'rb') as f:
+                width, height, tag_len = _DISK_HEADER.unpack(f.read(_DISK_HEADER.size))
+                if f.read(tag_len) != self._version_tag(key):
+                    return None
+                pixels = f.read()
+        except (OSError, struct.error):
+            return None
+        
+        if len(pixels) != width * height * 4:
+            return None
+        
+        return RenderedChart(width, height, pixels)
+    
+    def _write_to_disk(self, key, chart):
+        """Persist a chart to disk, replacing any stale version"""
+        if not self.cache_dir:
+            return
+        
+        path = self._disk_path(key)
+        tag = self._version_tag(key)
+        tmp_path = path + '.tmp'
+        
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_DISK_HEADER.pack(chart.width, chart.height, len(tag)))
+                f.write(tag)
+                f.write(chart.pixels)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk cache is best effort; the memory cache still works
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,144 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.dates import DateFormatter
+
+from screens.chart_cache import RenderedChart
+
+TRAIT_COLORS = ['#FF5722', '#2196F3', '#4CAF50', '#9C27B0', '#FFC107']
+
+def render_trend_chart(chart_data, chart_size, dpi=80):
+    """Render a trait trend chart to RGBA pixels with the Agg backend.
+    
+    Runs inside a worker process, so it only takes and returns plain data:
+    chart_data holds the title, ISO timestamps (oldest first) and a list of
+    values per trait. Returns (width, height, pixels).
+    """
+    fig = Figure(figsize=(chart_size[0] / dpi, chart_size[1] / dpi), dpi=dpi)
+    ax = fig.add_subplot(111)
+    
+    dates = [datetime.fromisoformat(timestamp) for timestamp in chart_data['timestamps']]
+    traits = chart_data['traits']
+    
+    # Plot each trait
+    for i, (trait_name, values) in enumerate(traits.items()):
+        ax.plot(dates, values, marker='o', label=trait_name.replace('_', ' ').title(),
+               linewidth=2, color=TRAIT_COLORS[i % len(TRAIT_COLORS)])
+    
+    # Customize the plot
+    ax.set_title(chart_data['title'])
+    ax.set_ylim(0, 1)
+    ax.set_ylabel('Trait Score')
+    ax.xaxis.set_major_formatter(DateFormatter('%b %Y'))
+    ax.legend(loc='lower right')
+    fig.autofmt_xdate()
+    
+    if len(dates) > 1:
+        # Highlight current values
+        latest_values = [values[-1] for values in traits.values()]
+        latest_traits = list(traits.keys())
+        
+        # Find highest trait
+        max_idx = latest_values.index(max(latest_values))
+        color = TRAIT_COLORS[max_idx % len(TRAIT_COLORS)]
+        ax.plot(dates[-1], latest_values[max_idx], 'o', markersize=10,
+                fillstyle='none', color=color, linewidth=2)
+        
+        # Add a text annotation
+        highlight_trait = latest_traits[max_idx].replace('_', ' ').title()
+        text = f"Highest trait: {highlight_trait} - {latest_values[max_idx]:.0%}"
+        
+        ax.annotate(text, xy=(dates[-1], latest_values[max_idx]),
+                   xytext=(dates[-2], min(latest_values[max_idx]+0.15, 0.95)),
+                   arrowprops=dict(facecolor='black', shrink=0.05, width=1.5),
+                   bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8))
+    
+    # Adjust layout
+    fig.tight_layout()
+    
+    # Rasterize
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    width, height = canvas.get_width_height()
+    
+    return width, height, bytes(canvas.buffer_rgba())
+
+class ChartRenderPool:
+    """Renders charts in worker processes and delivers them on the UI thread"""
+    
+    def __init__(self, max_workers: int = None):
+        """Initialize the pool; worker processes are started on first use"""
+        if max_workers is None:
+            # Leave a core for the UI thread
+            max_workers = max(1, min(2, (os.cpu_count() or 1) - 1))
+        
+        self.max_workers = max_workers
+        self._executor = None
+        self._disabled = False
+    
+    def submit(self, chart_data, chart_size, callback):
+        """Render a chart in the background and call callback(chart) on the UI thread.
+        
+        The callback receives None if rendering failed.
+        """
+        executor = self._get_executor()
+        
+        if executor is None:
+            # No process support on this platform - render inline
+            self._deliver_inline(chart_data, chart_size, callback)
+            return
+        
+        future = executor.submit(render_trend_chart, chart_data, chart_size)
+        future.add_done_callback(
+            lambda f: Clock.schedule_once(lambda dt: self._deliver(f, callback))
+        )
+    
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def _get_executor(self):
+        """Get the process pool, creating it if needed"""
+        if self._executor is None and not self._disabled:
+            try:
+                # Spawn so workers never inherit the UI process's GL state
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            except (OSError, NotImplementedError, ValueError) as e:
+                Logger.warning(f"ChartRenderPool: process pool unavailable ({e}), rendering inline")
+                self._disabled = True
+        
+        return self._executor
+    
+    def _deliver(self, future, callback):
+        """Hand a finished render to the callback"""
+        if future.cancelled():
+            return
+        
+        error = future.exception()
+        if error is not None:
+            Logger.warning(f"ChartRenderPool: chart rendering failed: {error}")
+            callback(None)
+            return
+        
+        callback(RenderedChart(*future.result()))
+    
+    def _deliver_inline(self, chart_data, chart_size, callback):
+        """Render on the calling thread"""
+        try:
+            chart = RenderedChart(*render_trend_chart(chart_data, chart_size))
+        except Exception as e:
+            Logger.warning(f"ChartRenderPool: chart rendering failed: {e}")
+            chart = None
+        
+        callback(chart)
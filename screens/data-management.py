@@ -1,16 +1,19 @@
+from kivy.app import App
+from kivy.clock import Clock
 from kivy.uix.screenmanager import Screen, SlideTransition
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
-from kivy.uix.filechooser import FileChooserListView
 from kivy.uix.popup import Popup
 from kivy.uix.switch import Switch
 from kivy.metrics import dp
 import os
 import datetime
 
+from models.backup_scheduler import next_backup_due
+
 class DataManagementScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -18,6 +21,9 @@ class DataManagementScreen(Screen):
         self.secure_manager = None
         self.privacy_manager = None
         
+        # Whether a backup started from this screen should report its result
+        self._backup_requested = False
+        
         # Main layout
         layout = BoxLayout(orientation='vertical', padding=dp(15), spacing=dp(10))
         
@@ -136,17 +142,17 @@ class DataManagementScreen(Screen):
         freq_layout.add_widget(self.freq_btns)
         
         # Create backup now button
-        create_backup_btn = Button(
+        self.create_backup_btn = Button(
             text='Create Backup Now',
             size_hint_y=None,
             height=dp(40),
             background_color=(0.3, 0.7, 0.3, 1)
         )
-        create_backup_btn.bind(on_press=self.create_backup_now)
+        self.create_backup_btn.bind(on_press=self.create_backup_now)
         
         backup_layout.add_widget(auto_backup_layout)
         backup_layout.add_widget(freq_layout)
-        backup_layout.add_widget(create_backup_btn)
+        backup_layout.add_widget(self.create_backup_btn)
         
         # Backup history section
         history_section = self._create_section_header("Backup History")
@@ -182,6 +188,21 @@ class DataManagementScreen(Screen):
         """Called before the screen is displayed"""
         self.load_settings()
         self.update_backup_history()
+        
+        scheduler = self._backup_scheduler()
+        if scheduler:
+            scheduler.add_listener(self._on_backup_event)
+            self._set_backup_busy(scheduler.is_busy())
+    
+    def on_leave(self):
+        """Called when the screen is left"""
+        scheduler = self._backup_scheduler()
+        if scheduler:
+            scheduler.remove_listener(self._on_backup_event)
+    
+    def _backup_scheduler(self):
+        """Get the app's background backup scheduler, if running"""
+        return getattr(App.get_running_app(), 'backup_scheduler', None)
     
     def _create_section_header(self, title):
         """Create a section header"""
@@ -277,6 +298,41 @@ class DataManagementScreen(Screen):
             
             self.history_layout.add_widget(latest)
         
+        # Add the rotation policy limiting how many backups are kept
+        policy = backup_info['policy']
+        policy_text = (f"Keeping: {policy['daily']} daily, {policy['weekly']} weekly, "
+                       f"{policy['monthly']} monthly")
+        if policy['max_bytes']:
+            policy_text += f" (up to {self._format_size(policy['max_bytes'])})"
+        
+        policy_label = Label(
+            text=policy_text,
+            halign='left',
+            size_hint_y=None,
+            height=dp(30)
+        )
+        policy_label.bind(size=lambda s, w: setattr(s, 'text_size', (w[0], None)))
+        
+        self.history_layout.add_widget(policy_label)
+        
+        # Add when the next automatic backup will run
+        next_due = next_backup_due(self.db_manager) if self.db_manager else None
+        if next_due:
+            if next_due <= datetime.datetime.now():
+                next_text = "Next automatic backup: due now"
+            else:
+                next_text = f"Next automatic backup: {next_due.strftime('%Y-%m-%d %H:%M')}"
+            
+            next_label = Label(
+                text=next_text,
+                halign='left',
+                size_hint_y=None,
+                height=dp(30)
+            )
+            next_label.bind(size=lambda s, w: setattr(s, 'text_size', (w[0], None)))
+            
+            self.history_layout.add_widget(next_label)
+        
         # Add backup directory
         directory = Label(
             text=f"Backup directory: {backup_info['backup_dir']}",
@@ -491,6 +547,9 @@ class DataManagementScreen(Screen):
     
     def show_import(self, instance):
         """Show import dialog"""
+        # Imported here as the file chooser is only needed for imports
+        from kivy.uix.filechooser import FileChooserListView
+        
         content = BoxLayout(orientation='vertical', padding=dp(10), spacing=dp(10))
         
         # File chooser
@@ -572,6 +631,9 @@ class DataManagementScreen(Screen):
                 self.merge_switch.active
             )
             
+            # Replacing data deletes profiles that were not in the file
+            App.get_running_app().prune_chart_cache()
+            
             popup.dismiss()
             self._show_message_popup("Import Complete", result, self._refresh_app)
         except Exception as e:
@@ -590,6 +652,7 @@ class DataManagementScreen(Screen):
             
         # Save setting
         self.privacy_manager.set_privacy_setting('auto_backup', 'true' if value else 'false')
+        self._reschedule_backups()
     
     def set_backup_frequency(self, frequency):
         """Set backup frequency"""
@@ -598,6 +661,7 @@ class DataManagementScreen(Screen):
             
         # Save setting
         self.privacy_manager.set_privacy_setting('backup_frequency', frequency)
+        self._reschedule_backups()
         
         # Update UI
         for child in self.freq_btns.children:
@@ -606,11 +670,26 @@ class DataManagementScreen(Screen):
             else:
                 child.background_color = (0.9, 0.9, 0.9, 1)  # Default color
     
+    def _reschedule_backups(self):
+        """Let the backup scheduler pick up changed settings"""
+        scheduler = self._backup_scheduler()
+        if scheduler:
+            scheduler.reschedule()
+        self.update_backup_history()
+    
     def create_backup_now(self, instance):
         """Create a backup immediately"""
         if not self.secure_manager:
             self._show_message_popup("Error", "Secure manager not initialized.")
             return
+        
+        # Back up in the background; the result arrives through _on_backup_event
+        scheduler = self._backup_scheduler()
+        if scheduler:
+            self._backup_requested = True
+            self._set_backup_busy(True)
+            scheduler.run_now()
+            return
             
         try:
             result = self.secure_manager.create_scheduled_backup()
@@ -619,6 +698,32 @@ class DataManagementScreen(Screen):
         except Exception as e:
             self._show_message_popup("Backup Error", f"Failed to create backup: {str(e)}")
     
+    def _on_backup_event(self, event, detail):
+        """Handle a backup scheduler event (called on the scheduler's thread)"""
+        Clock.schedule_once(lambda dt: self._show_backup_event(event, detail))
+    
+    def _show_backup_event(self, event, detail):
+        """Reflect a backup's progress and result in the UI"""
+        if event == 'started':
+            self._set_backup_busy(True)
+        elif event == 'progress':
+            self.create_backup_btn.text = f"Backing Up... {int(detail * 100)}%"
+        else:
+            self._set_backup_busy(False)
+            self.update_backup_history()
+            
+            if self._backup_requested:
+                self._backup_requested = False
+                if event == 'finished':
+                    self._show_message_popup("Backup Created", detail)
+                else:
+                    self._show_message_popup("Backup Error", f"Failed to create backup: {detail}")
+    
+    def _set_backup_busy(self, busy):
+        """Show whether a backup is running on the create backup button"""
+        self.create_backup_btn.disabled = busy
+        self.create_backup_btn.text = "Backing Up..." if busy else "Create Backup Now"
+    
     def go_back(self, instance):
         """Return to settings screen"""
         self.manager.transition = SlideTransition(direction='right')
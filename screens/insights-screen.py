@@ -4,16 +4,167 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.image import Image
+from kivy.graphics import Color, Rectangle
+from kivy.graphics.texture import Texture
 from kivy.metrics import dp
-from kivy.garden.matplotlib.backend_kivyagg import FigureCanvasKivyAgg
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.dates import DateFormatter
-import numpy as np
-from datetime import datetime, timedelta
 
 from models.enums import AgeGroup, TraitCategory
 from models.data_classes import UserProfile, PersonalityInsight
+from screens.chart_cache import ChartCache, CHART_CACHE_DIR
+from screens.trend_chart import TrendChart
+
+def score_color(score):
+    """Get the display color for a trait score"""
+    if score > 0.7:
+        return [0.0, 0.7, 0.3, 1.0]  # Green
+    elif score > 0.4:
+        return [0.0, 0.5, 0.8, 1.0]  # Blue
+    else:
+        return [0.8, 0.3, 0.3, 1.0]  # Red
+
+class TraitRow(BoxLayout):
+    """Reusable row showing a trait's name, score bar and description"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(
+            orientation='vertical',
+            size_hint_y=None,
+            height=dp(90) + 1,
+            padding=dp(5),
+            **kwargs
+        )
+        
+        # Trait name and score
+        header = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(25))
+        self.name_label = Label(
+            font_size='14sp',
+            bold=True,
+            halign='left',
+            size_hint_x=0.7,
+            color=(0.2, 0.2, 0.2, 1)
+        )
+        self.score_label = Label(
+            font_size='14sp',
+            bold=True,
+            halign='right',
+            size_hint_x=0.3
+        )
+        
+        header.add_widget(self.name_label)
+        header.add_widget(self.score_label)
+        
+        # Progress bar
+        bar_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(20), padding=(0, 5))
+        
+        self.progress = BoxLayout()
+        with self.progress.canvas.before:
+            self.progress_color = Color(0.9, 0.9, 0.9, 1)
+            self.progress_rect = Rectangle()
+        self.progress.bind(pos=self._update_bar, size=self._update_bar)
+        
+        self.empty = BoxLayout()
+        with self.empty.canvas.before:
+            Color(0.9, 0.9, 0.9, 1)
+            self.empty_rect = Rectangle()
+        self.empty.bind(pos=self._update_bar, size=self._update_bar)
+        
+        bar_layout.add_widget(self.progress)
+        bar_layout.add_widget(self.empty)
+        
+        # Description
+        self.desc_label = Label(
+            font_size='12sp',
+            halign='left',
+            valign='top',
+            size_hint_y=None,
+            height=dp(40)
+        )
+        
+        # Separator
+        separator = BoxLayout(size_hint_y=None, height=1)
+        with separator.canvas.before:
+            Color(0.9, 0.9, 0.9, 1)
+            self.separator_rect = Rectangle()
+        separator.bind(pos=self._update_bar, size=self._update_bar)
+        self.separator = separator
+        
+        self.add_widget(header)
+        self.add_widget(bar_layout)
+        self.add_widget(self.desc_label)
+        self.add_widget(separator)
+    
+    def update(self, name, score, description, text_width):
+        """Show a trait's values, changing only properties that differ"""
+        color = score_color(score)
+        
+        self.name_label.text = name
+        self.score_label.text = f"{score:.0%}"
+        self.score_label.color = color
+        self.progress_color.rgba = color
+        self.progress.size_hint_x = score
+        self.empty.size_hint_x = 1 - score
+        self.desc_label.text = description
+        self.desc_label.text_size = (text_width, None)
+    
+    def _update_bar(self, instance, value):
+        """Keep the background rectangles in sync with their widgets"""
+        if instance is self.progress:
+            rect = self.progress_rect
+        elif instance is self.empty:
+            rect = self.empty_rect
+        else:
+            rect = self.separator_rect
+        rect.pos = instance.pos
+        rect.size = instance.size
+
+class MBTIBox(BoxLayout):
+    """Reusable panel showing the MBTI-inspired type for teens"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(
+            orientation='vertical',
+            size_hint_y=None,
+            height=dp(90),
+            padding=dp(10),
+            spacing=dp(5),
+            **kwargs
+        )
+        
+        # Add background color
+        with self.canvas.before:
+            Color(0.9, 0.9, 1, 1)
+            self.rect = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._update_rect, size=self._update_rect)
+        
+        self.add_widget(Label(
+            text='MBTI-Inspired Type',
+            font_size='14sp',
+            bold=True,
+            size_hint_y=None,
+            height=dp(20)
+        ))
+        
+        self.value_label = Label(
+            font_size='24sp',
+            bold=True,
+            color=(0.2, 0.4, 0.6, 1)
+        )
+        self.add_widget(self.value_label)
+        
+        self.add_widget(Label(
+            text='(Exploratory and subject to change)',
+            font_size='12sp',
+            italic=True,
+            color=(0.5, 0.5, 0.5, 1),
+            size_hint_y=None,
+            height=dp(20)
+        ))
+    
+    def _update_rect(self, instance, value):
+        """Update rectangle position and size"""
+        self.rect.pos = instance.pos
+        self.rect.size = instance.size
 
 class InsightsScreen(Screen):
     def __init__(self, **kwargs):
@@ -23,6 +174,14 @@ class InsightsScreen(Screen):
         self.privacy_manager = None
         self.profile = None
         self.show_progress_mode = False
+        self.chart_cache = ChartCache()
+        self.render_pool = None
+        self.trend_chart = None
+        self._pending_chart_key = None
+        self._renders_in_flight = set()
+        self._trait_rows = []
+        self._mbti_box = None
+        self._no_traits_label = None
         
         # Main layout
         layout = BoxLayout(orientation='vertical', padding=dp(15), spacing=dp(10))
@@ -114,6 +273,10 @@ class InsightsScreen(Screen):
         self.db_manager = db_manager
         self.secure_manager = secure_manager
         self.privacy_manager = privacy_manager
+        
+        # Optionally keep rendered charts across app restarts
+        if self.db_manager.get_setting('chart_disk_cache', 'false') == 'true':
+            self.chart_cache = ChartCache(cache_dir=CHART_CACHE_DIR)
     
     def set_profile(self, profile, show_progress=False):
         """Set the profile for display and update content"""
@@ -124,7 +287,7 @@ class InsightsScreen(Screen):
             self.title_label.text = f"Progress: {profile.display_name}"
         else:
             self.title_label.text = f"Insights: {profile.display_name}"
-            
+        
         self.update_content()
     
     def update_content(self):
@@ -132,9 +295,8 @@ class InsightsScreen(Screen):
         if not self.profile:
             return
         
-        # Clear existing content
+        # Clear the graph; trait rows are updated in place
         self.graph_container.clear_widgets()
-        self.traits_container.clear_widgets()
         
         # Generate interactive graph based on age group
         self.generate_graph()
@@ -143,8 +305,19 @@ class InsightsScreen(Screen):
         self.generate_trait_analysis()
     
     def generate_graph(self):
-        """Generate and display a graph of trait development over time"""
-        # Get insights for this profile
+        """Display a graph of trait development over time"""
+        if self._use_native_chart():
+            self._show_native_chart()
+        else:
+            self._show_rendered_chart()
+    
+    def _use_native_chart(self):
+        """Check whether charts are drawn natively or rendered with matplotlib"""
+        return self.db_manager.get_setting('chart_style', 'native') == 'native'
+    
+    def _show_native_chart(self):
+        """Display the graph with the native chart widget, updated in place"""
+        self._pending_chart_key = None
         insights = self.db_manager.get_insights(
             user_id=self.profile.id, 
             limit=10
@@ -158,74 +331,160 @@ class InsightsScreen(Screen):
             ))
             return
         
-        # Sort insights by timestamp
-        insights.sort(key=lambda x: x.timestamp)
+        if self.trend_chart is None:
+            self.trend_chart = TrendChart()
+        
+        self.trend_chart.set_data(self._chart_data(self.profile, insights))
+        self.graph_container.add_widget(self.trend_chart)
+    
+    def _show_rendered_chart(self):
+        """Display a matplotlib-rendered graph, rendering it only when needed"""
+        chart_size = self._chart_size()
+        data_version = self.db_manager.get_insight_version(self.profile.id)
+        
+        if data_version[0] == 0:
+            # No insights available
+            self._pending_chart_key = None
+            self.graph_container.add_widget(Label(
+                text="No insight data available yet.\nTrack behaviors to generate insights.",
+                halign='center'
+            ))
+            return
         
-        # Create a matplotlib figure
-        fig = Figure(figsize=(6, 4), dpi=80)
-        ax = fig.add_subplot(111)
+        # Reuse the last render unless a new insight was saved since
+        key = ChartCache.make_key(self.profile.id, data_version, chart_size, self.show_progress_mode)
+        self._pending_chart_key = key
+        chart = self.chart_cache.get(key)
         
-        # Extract dates and trait values
-        dates = [datetime.fromisoformat(insight.timestamp) for insight in insights]
+        if chart is not None:
+            self._show_chart(chart)
+            return
+        
+        # Show a placeholder while the chart renders in the background
+        self.graph_container.add_widget(Label(
+            text="Loading chart...",
+            color=(0.5, 0.5, 0.5, 1)
+        ))
+        
+        if key not in self._renders_in_flight:
+            insights = self.db_manager.get_insights(
+                user_id=self.profile.id, 
+                limit=10
+            )
+            self._request_render([key], self._chart_data(self.profile, insights), chart_size)
+    
+    def prerender_charts(self):
+        """Render charts for every profile in the background so first views are instant"""
+        if not self.db_manager or self._use_native_chart():
+            # Native charts draw in a few milliseconds and need no pre-rendering
+            return
+        
+        chart_size = self._chart_size()
+        
+        for profile in self.db_manager.get_profiles():
+            data_version = self.db_manager.get_insight_version(profile.id)
+            if data_version[0] == 0:
+                continue
+            
+            # The same image serves both the insights and the progress view
+            keys = [
+                ChartCache.make_key(profile.id, data_version, chart_size, progress_mode)
+                for progress_mode in (False, True)
+            ]
+            keys = [k for k in keys if k not in self._renders_in_flight and not self.chart_cache.get(k)]
+            if not keys:
+                continue
+            
+            insights = self.db_manager.get_insights(user_id=profile.id, limit=10)
+            self._request_render(keys, self._chart_data(profile, insights), chart_size)
+    
+    def shutdown(self):
+        """Release background rendering resources"""
+        if self.render_pool:
+            self.render_pool.shutdown()
+    
+    def _chart_size(self):
+        """Get the pixel size the graph is rendered at"""
+        from kivy.core.window import Window
+        
+        # Window width minus screen and content padding
+        return (int(Window.width - dp(50)), int(self.graph_container.height))
+    
+    def _chart_data(self, profile, insights):
+        """Collect the plain data needed to render a profile's chart"""
+        # Sort insights by timestamp
+        insights.sort(key=lambda x: x.timestamp)
         
         # Different traits based on age group
         trait_names = list(insights[0].traits.keys())
         
-        # Create a dataset for each trait
-        traits = {}
-        for trait_name in trait_names:
-            traits[trait_name] = [insight.traits.get(trait_name, 0) for insight in insights]
-        
         # Set title based on age group/category
-        if self.profile.age_group == AgeGroup.TODDLER:
+        if profile.age_group == AgeGroup.TODDLER:
             title = "Temperament Trends"
-        elif self.profile.age_group == AgeGroup.CHILD:
+        elif profile.age_group == AgeGroup.CHILD:
             title = "MBTI-Inspired Preferences"
         else:  # TEEN
             title = "Big Five Traits"
         
-        # Plot each trait
-        colors = ['#FF5722', '#2196F3', '#4CAF50', '#9C27B0', '#FFC107']
-        for i, (trait_name, values) in enumerate(traits.items()):
-            ax.plot(dates, values, marker='o', label=trait_name.replace('_', ' ').title(), 
-                   linewidth=2, color=colors[i % len(colors)])
-        
-        # Customize the plot
-        ax.set_title(title)
-        ax.set_ylim(0, 1)
-        ax.set_ylabel('Trait Score')
-        ax.xaxis.set_major_formatter(DateFormatter('%b %Y'))
-        ax.legend(loc='lower right')
-        fig.autofmt_xdate()
-        
-        if len(dates) > 1:
-            # Add interactivity - highlight current values
-            latest_values = [values[-1] for values in traits.values()]
-            latest_traits = list(traits.keys())
-            
-            # Find highest trait
-            max_idx = latest_values.index(max(latest_values))
-            ax.plot(dates[-1], latest_values[max_idx], 'o', markersize=10, 
-                    fillstyle='none', color=colors[max_idx], linewidth=2)
-            
-            # Add a text annotation
-            highlight_trait = latest_traits[max_idx].replace('_', ' ').title()
-            text = f"Highest trait: {highlight_trait} - {latest_values[max_idx]:.0%}"
-            
-            ax.annotate(text, xy=(dates[-1], latest_values[max_idx]), 
-                       xytext=(dates[-2], min(latest_values[max_idx]+0.15, 0.95)),
-                       arrowprops=dict(facecolor='black', shrink=0.05, width=1.5),
-                       bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="gray", alpha=0.8))
+        return {
+            'title': title,
+            'timestamps': [insight.timestamp for insight in insights],
+            'traits': {
+                trait_name: [insight.traits.get(trait_name, 0) for insight in insights]
+                for trait_name in trait_names
+            }
+        }
+    
+    def _request_render(self, keys, chart_data, chart_size):
+        """Render a chart in the worker pool and cache it under the given keys"""
+        if self.render_pool is None:
+            # Imported here so matplotlib is only loaded when it is used
+            from screens.chart_renderer import ChartRenderPool
+            self.render_pool = ChartRenderPool()
+        
+        self._renders_in_flight.update(keys)
+        self.render_pool.submit(
+            chart_data,
+            chart_size,
+            lambda chart: self._on_chart_rendered(keys, chart)
+        )
+    
+    def _on_chart_rendered(self, keys, chart):
+        """Store a finished render and show it if it is still the one on screen"""
+        self._renders_in_flight.difference_update(keys)
         
-        # Adjust layout
-        fig.tight_layout()
+        if chart is not None:
+            for key in keys:
+                self.chart_cache.put(key, chart)
         
-        # Convert to Kivy widget
-        canvas = FigureCanvasKivyAgg(fig)
-        self.graph_container.add_widget(canvas)
+        if self._pending_chart_key not in keys:
+            return
+        
+        self.graph_container.clear_widgets()
+        if chart is None:
+            self.graph_container.add_widget(Label(
+                text="Unable to display chart.",
+                halign='center'
+            ))
+        else:
+            self._show_chart(chart)
+    
+    def _show_chart(self, chart):
+        """Display a rendered chart, creating its texture on first use"""
+        if chart.texture is None:
+            texture = Texture.create(size=(chart.width, chart.height), colorfmt='rgba')
+            texture.blit_buffer(chart.pixels, colorfmt='rgba', bufferfmt='ubyte')
+            # Agg rows start at the top, Kivy textures at the bottom
+            texture.flip_vertical()
+            chart.texture = texture
+        
+        self.graph_container.add_widget(Image(
+            texture=chart.texture,
+            allow_stretch=True
+        ))
     
     def generate_trait_analysis(self):
-        """Generate and display trait analysis based on the most recent insight"""
+        """Display trait analysis based on the most recent insight, reusing row widgets"""
         # Get the most recent insight
         insights = self.db_manager.get_insights(
             user_id=self.profile.id, 
@@ -234,10 +493,12 @@ class InsightsScreen(Screen):
         
         if not insights:
             # No insights available
-            self.traits_container.add_widget(Label(
-                text="No insight data available yet.\nTrack behaviors to generate insights.",
-                halign='center'
-            ))
+            if self._no_traits_label is None:
+                self._no_traits_label = Label(
+                    text="No insight data available yet.\nTrack behaviors to generate insights.",
+                    halign='center'
+                )
+            self._sync_children(self.traits_container, [self._no_traits_label])
             return
         
         latest_insight = insights[0]
@@ -265,31 +526,12 @@ class InsightsScreen(Screen):
                 "emotional_stability": "Ability to manage emotions and handle stress."
             }
         
+        widgets = []
+        
         # Add MBTI correlation for teens
         if self.profile.age_group == AgeGroup.TEEN:
-            # Add MBTI type based on Big Five scores
-            mbti_box = BoxLayout(
-                orientation='vertical',
-                size_hint_y=None,
-                height=dp(90),
-                padding=dp(10),
-                spacing=dp(5)
-            )
-            
-            # Add background color
-            with mbti_box.canvas.before:
-                from kivy.graphics import Color, Rectangle
-                Color(0.9, 0.9, 1, 1)
-                self.rect = Rectangle(pos=mbti_box.pos, size=mbti_box.size)
-                mbti_box.bind(pos=self._update_rect, size=self._update_rect)
-            
-            mbti_label = Label(
-                text='MBTI-Inspired Type',
-                font_size='14sp',
-                bold=True,
-                size_hint_y=None,
-                height=dp(20)
-            )
+            if self._mbti_box is None:
+                self._mbti_box = MBTIBox()
             
             # Calculate MBTI based on Big Five
             traits = latest_insight.traits
@@ -298,125 +540,31 @@ class InsightsScreen(Screen):
             t_f = "F" if traits.get("agreeableness", 0) > 0.5 else "T"
             j_p = "J" if traits.get("conscientiousness", 0) > 0.5 else "P"
             
-            mbti_type = f"{e_i}{s_n}{t_f}{j_p}"
-            
-            mbti_value = Label(
-                text=mbti_type,
-                font_size='24sp',
-                bold=True,
-                color=(0.2, 0.4, 0.6, 1)
-            )
-            
-            mbti_disclaimer = Label(
-                text='(Exploratory and subject to change)',
-                font_size='12sp',
-                italic=True,
-                color=(0.5, 0.5, 0.5, 1),
-                size_hint_y=None,
-                height=dp(20)
-            )
-            
-            mbti_box.add_widget(mbti_label)
-            mbti_box.add_widget(mbti_value)
-            mbti_box.add_widget(mbti_disclaimer)
-            
-            self.traits_container.add_widget(mbti_box)
-        
-        # Add each trait analysis widget
-        for trait_name, score in latest_insight.traits.items():
-            trait_layout = BoxLayout(
-                orientation='vertical',
-                size_hint_y=None,
-                height=dp(90),
-                padding=dp(5)
-            )
-            
-            # Get description
+            self._mbti_box.value_label.text = f"{e_i}{s_n}{t_f}{j_p}"
+            widgets.append(self._mbti_box)
+        
+        # Grow the row pool only when there are more traits than ever shown
+        trait_items = list(latest_insight.traits.items())
+        while len(self._trait_rows) < len(trait_items):
+            self._trait_rows.append(TraitRow())
+        
+        # Update each trait row in place
+        text_width = self.width - dp(30)
+        for row, (trait_name, score) in zip(self._trait_rows, trait_items):
             description = descriptions.get(trait_name, f"Score for {trait_name}.")
-            
-            # Color based on score
-            if score > 0.7:
-                color = [0.0, 0.7, 0.3, 1.0]  # Green
-            elif score > 0.4:
-                color = [0.0, 0.5, 0.8, 1.0]  # Blue
-            else:
-                color = [0.8, 0.3, 0.3, 1.0]  # Red
-            
-            # Trait name and score
-            header = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(25))
-            name_label = Label(
-                text=trait_name.replace('_', ' ').title(),
-                font_size='14sp',
-                bold=True,
-                halign='left',
-                size_hint_x=0.7,
-                color=(0.2, 0.2, 0.2, 1)
-            )
-            score_label = Label(
-                text=f"{score:.0%}",
-                font_size='14sp',
-                bold=True,
-                halign='right',
-                size_hint_x=0.3,
-                color=color
-            )
-            
-            header.add_widget(name_label)
-            header.add_widget(score_label)
-            
-            # Progress bar
-            bar_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(20), padding=(0, 5))
-            
-            # Create custom progress bar
-            progress = BoxLayout(size_hint_x=score)
-            with progress.canvas.before:
-                from kivy.graphics import Color, Rectangle
-                Color(*color)
-                Rectangle(pos=progress.pos, size=progress.size)
-            progress.bind(pos=self._update_rect, size=self._update_rect)
-            
-            empty = BoxLayout(size_hint_x=1-score)
-            with empty.canvas.before:
-                from kivy.graphics import Color, Rectangle
-                Color(0.9, 0.9, 0.9, 1)
-                Rectangle(pos=empty.pos, size=empty.size)
-            empty.bind(pos=self._update_rect, size=self._update_rect)
-            
-            bar_layout.add_widget(progress)
-            bar_layout.add_widget(empty)
-            
-            # Description
-            desc_label = Label(
-                text=description,
-                font_size='12sp',
-                text_size=(self.width - dp(30), None),
-                halign='left',
-                valign='top',
-                size_hint_y=None,
-                height=dp(40)
-            )
-            
-            # Add all components to the trait layout
-            trait_layout.add_widget(header)
-            trait_layout.add_widget(bar_layout)
-            trait_layout.add_widget(desc_label)
-            
-            # Add a separator
-            separator = BoxLayout(size_hint_y=None, height=1)
-            with separator.canvas.before:
-                from kivy.graphics import Color, Rectangle
-                Color(0.9, 0.9, 0.9, 1)
-                Rectangle(pos=separator.pos, size=separator.size)
-            separator.bind(pos=self._update_rect, size=self._update_rect)
-            
-            # Add to the main container
-            self.traits_container.add_widget(trait_layout)
-            self.traits_container.add_widget(separator)
+            row.update(trait_name.replace('_', ' ').title(), score, description, text_width)
+            widgets.append(row)
+        
+        self._sync_children(self.traits_container, widgets)
     
-    def _update_rect(self, instance, value):
-        """Update rectangle position and size"""
-        self.rect.pos = instance.pos
-        self.rect.size = instance.size
+    def _sync_children(self, container, widgets):
+        """Make widgets the container's children, re-adding only if the set changed"""
+        if container.children[::-1] == widgets:
+            return
+        
+        container.clear_widgets()
+        for widget in widgets:
+            container.add_widget(widget)
     
     def go_back(self, instance):
         """Return to profile screen"""
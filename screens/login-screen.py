@@ -3,6 +3,7 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
+from kivy.clock import Clock
 from kivy.metrics import dp
 
 class LoginScreen(Screen):
@@ -93,13 +94,14 @@ class LoginScreen(Screen):
         self.db_manager = db_manager
         self.secure_manager = secure_manager
         self.privacy_manager = privacy_manager
-
+    
     def login(self, instance):
         """Handle login button press"""
         # In a real app, we would verify credentials here
         # For demo purposes, just navigate to the profile screen
         self.manager.current = 'profile'
-
+        self._schedule_chart_prerender()
+    
     def demo_login(self, instance):
         """Handle demo mode button press"""
         # Create demo data if needed
@@ -107,6 +109,16 @@ class LoginScreen(Screen):
         
         # Navigate to profile screen
         self.manager.current = 'profile'
+        self._schedule_chart_prerender()
+    
+    def _schedule_chart_prerender(self):
+        """Start rendering insight charts in the background once the transition is done"""
+        if self.db_manager.get_setting('chart_style', 'native') == 'native':
+            # Native charts are drawn on demand; avoid building the insights screen early
+            return
+        
+        insights_screen = self.manager.get_screen('insights')
+        Clock.schedule_once(lambda dt: insights_screen.prerender_charts(), 0.5)
     
     def _create_demo_data(self):
         """Create demo profiles and insights for testing"""
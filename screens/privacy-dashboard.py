@@ -1,3 +1,4 @@
+from kivy.app import App
 from kivy.uix.screenmanager import Screen, SlideTransition
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
@@ -353,7 +354,7 @@ class PrivacyDashboardScreen(Screen):
     
     def _confirm_delete_all_data(self):
         """Confirm deleting all data"""
-        success = self.secure_manager.delete_all_data()
+        success = App.get_running_app().reset_all_data()
         
         if success:
             self._show_message_popup("Factory Reset Complete", 
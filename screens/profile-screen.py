@@ -5,12 +5,57 @@ from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recyclegridlayout import RecycleGridLayout
+from kivy.clock import Clock
 from kivy.metrics import dp
 from kivy.graphics import Color, Rectangle
 
 from models.enums import AgeGroup
 from models.data_classes import UserProfile
 
+PROFILE_PAGE_SIZE = 60
+
+class ProfileButton(RecycleDataViewBehavior, Button):
+    """Recycled button for one row of the profile list"""
+    
+    def refresh_view_attrs(self, rv, index, data):
+        """Bind the recycled button to a profile row"""
+        self.list_view = rv
+        self.profile_id = data['profile_id']
+        return super().refresh_view_attrs(rv, index, data)
+    
+    def on_press(self):
+        """Report the selection to the profile list"""
+        self.list_view.on_profile_selected(self.profile_id)
+
+class ProfileList(RecycleView):
+    """Virtualized profile grid; only visible rows exist as widgets"""
+    
+    def __init__(self, on_profile_selected, on_scroll_end, **kwargs):
+        super().__init__(**kwargs)
+        self.on_profile_selected = on_profile_selected
+        self.on_scroll_end = on_scroll_end
+        self.viewclass = ProfileButton
+        
+        layout = RecycleGridLayout(
+            cols=3,
+            spacing=dp(10),
+            default_size=(None, dp(55)),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        
+        self.bind(scroll_y=self._check_scroll_end)
+    
+    def _check_scroll_end(self, instance, value):
+        """Ask for the next page when scrolled close to the bottom"""
+        if value <= 0.1:
+            self.on_scroll_end()
+
 class ProfileScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -18,6 +63,9 @@ class ProfileScreen(Screen):
         self.secure_manager = None
         self.privacy_manager = None
         self.current_profile = None
+        self._search_text = ''
+        self._profiles_total = 0
+        self._search_trigger = Clock.create_trigger(lambda dt: self.load_profiles(), 0.2)
         
         # Main layout
         self.layout = BoxLayout(orientation='vertical', padding=dp(15), spacing=dp(10))
@@ -34,6 +82,11 @@ class ProfileScreen(Screen):
         # Now build the UI
         self._build_ui()
     
+    def on_pre_enter(self):
+        """Refresh the list in case profiles changed elsewhere (e.g. after an import)"""
+        if self.db_manager:
+            self.load_profiles()
+    
     def _build_ui(self):
         """Build the UI elements"""
         # Clear existing widgets
@@ -66,19 +119,36 @@ class ProfileScreen(Screen):
         header.add_widget(settings_btn)
         header.add_widget(logout_btn)
         
-        # Add profile button
+        # Add profile and class observation buttons
+        top_actions = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(40), spacing=dp(10))
         add_profile_btn = Button(
             text='+ Add Child',
-            size_hint_y=None,
-            height=dp(40),
             background_color=(0.3, 0.7, 0.3, 1)
         )
         add_profile_btn.bind(on_press=self.show_add_profile)
         
-        # Profile grid
-        self.profile_grid = GridLayout(
-            cols=3, 
-            spacing=dp(10), 
+        batch_btn = Button(
+            text='Observe Class',
+            background_color=(1, 0.6, 0.2, 1)
+        )
+        batch_btn.bind(on_press=self.show_batch_observation)
+        
+        top_actions.add_widget(add_profile_btn)
+        top_actions.add_widget(batch_btn)
+        
+        # Search as you type
+        self.search_input = TextInput(
+            hint_text='Search children',
+            multiline=False,
+            size_hint_y=None,
+            height=dp(40)
+        )
+        self.search_input.bind(text=self.on_search_text)
+        
+        # Profile list
+        self.profile_list = ProfileList(
+            self.select_profile,
+            self.load_more_profiles,
             size_hint_y=None,
             height=dp(120)
         )
@@ -140,8 +210,9 @@ class ProfileScreen(Screen):
         
         # Add all components to the main layout
         self.layout.add_widget(header)
-        self.layout.add_widget(add_profile_btn)
-        self.layout.add_widget(self.profile_grid)
+        self.layout.add_widget(top_actions)
+        self.layout.add_widget(self.search_input)
+        self.layout.add_widget(self.profile_list)
         self.layout.add_widget(self.profile_display)
         self.layout.add_widget(action_layout)
         
@@ -154,36 +225,51 @@ class ProfileScreen(Screen):
         self.load_profiles()
     
     def load_profiles(self):
-        """Load profiles from database and display them"""
-        # Clear existing profile buttons
-        self.profile_grid.clear_widgets()
-        
-        # Get profiles from database
-        profiles = self.db_manager.get_profiles()
-        
-        if not profiles:
-            # No profiles - add a message
-            no_profiles = Label(
-                text="No profiles found.\nAdd a child to get started.",
-                halign='center'
-            )
-            self.profile_grid.add_widget(no_profiles)
+        """Load the first page of profiles matching the search"""
+        search = self._search_text or None
+        self._profiles_total = self.db_manager.count_profiles(search)
+        
+        rows = self.db_manager.get_profile_rows(search, 0, PROFILE_PAGE_SIZE)
+        self.profile_list.data = [self._profile_view_data(row) for row in rows]
+        self.profile_list.scroll_y = 1
+        
+        if self._profiles_total == 0:
+            # No profiles - show a message
+            if search:
+                self.profile_display.text = "No children match your search."
+            else:
+                self.current_profile = None
+                self.profile_display.text = "No profiles found. Add a child to get started."
             return
         
-        # Add a button for each profile
-        for profile in profiles:
-            btn = Button(
-                text=f"{profile.name}\nAge {profile.age}",
-                halign='center',
-                background_color=self._get_age_color(profile.age_group)
-            )
-            btn.profile = profile  # Store profile in button for later reference
-            btn.bind(on_press=self.select_profile)
-            self.profile_grid.add_widget(btn)
-            
         # Select the first profile by default
-        self.current_profile = profiles[0]
-        self.profile_display.text = f"Selected: {self.current_profile.display_name}"
+        if not self.current_profile or not self.db_manager.get_profile(self.current_profile.id):
+            self.select_profile(rows[0]['id'])
+        else:
+            self.profile_display.text = f"Selected: {self.current_profile.display_name}"
+    
+    def load_more_profiles(self):
+        """Append the next page of profiles when the list is scrolled to the end"""
+        loaded = len(self.profile_list.data)
+        if loaded >= self._profiles_total:
+            return
+        
+        rows = self.db_manager.get_profile_rows(self._search_text or None, loaded, PROFILE_PAGE_SIZE)
+        self.profile_list.data.extend(self._profile_view_data(row) for row in rows)
+    
+    def on_search_text(self, instance, value):
+        """Reload the list shortly after the user stops typing"""
+        self._search_text = value.strip()
+        self._search_trigger()
+    
+    def _profile_view_data(self, row):
+        """Get the recycle view data for a profile row"""
+        return {
+            'text': f"{row['name']}\nAge {row['age']}",
+            'halign': 'center',
+            'background_color': self._get_age_color(row['age_group']),
+            'profile_id': row['id']
+        }
     
     def _get_age_color(self, age_group):
         """Get a color based on age group"""
@@ -194,9 +280,9 @@ class ProfileScreen(Screen):
         else:
             return (0.6, 0.4, 0.8, 1)  # Purple
     
-    def select_profile(self, button):
+    def select_profile(self, profile_id):
         """Handle profile selection"""
-        self.current_profile = button.profile
+        self.current_profile = self.db_manager.get_profile(profile_id)
         self.profile_display.text = f"Selected: {self.current_profile.display_name}"
     
     def show_insights(self, instance):
@@ -238,6 +324,18 @@ class ProfileScreen(Screen):
         self.manager.transition = SlideTransition(direction='left')
         self.manager.current = 'track_behavior'
     
+    def show_batch_observation(self, instance):
+        """Observe every child in the selected profile's age group in one session"""
+        if not self.current_profile:
+            self._show_error_popup("Please select a child profile first")
+            return
+        
+        batch_screen = self.manager.get_screen('batch_observation')
+        batch_screen.set_profile(self.current_profile)
+        
+        self.manager.transition = SlideTransition(direction='left')
+        self.manager.current = 'batch_observation'
+    
     def show_progress(self, instance):
         """Show progress screen"""
         if not self.current_profile:
@@ -258,6 +356,9 @@ class ProfileScreen(Screen):
     
     def logout(self, instance):
         """Handle logout button press"""
+        if self.secure_manager:
+            self.secure_manager.clear_key_cache()
+        
         self.manager.transition = SlideTransition(direction='right')
         self.manager.current = 'login'
     
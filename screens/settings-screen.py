@@ -53,7 +53,7 @@ class SettingsScreen(Screen):
         self._add_setting_item(privacy_items, "Data Management", self.show_data_management)
         self._add_setting_item(privacy_items, "Export All Data", self.export_all_data)
         
-        appearance_items = GridLayout(cols=1, spacing=dp(2), size_hint_y=None, height=dp(100))
+        appearance_items = GridLayout(cols=1, spacing=dp(2), size_hint_y=None, height=dp(150))
         
         # Theme setting with switch
         theme_layout = BoxLayout(size_hint_y=None, height=dp(50))
@@ -70,6 +70,21 @@ class SettingsScreen(Screen):
         theme_layout.add_widget(theme_switch)
         appearance_items.add_widget(theme_layout)
         
+        # Chart style setting with switch
+        chart_layout = BoxLayout(size_hint_y=None, height=dp(50))
+        chart_label = Label(
+            text="Detailed Charts (slower)",
+            halign='left',
+            valign='center',
+            size_hint_x=0.8
+        )
+        self.chart_switch = Switch(active=False, size_hint_x=0.2)
+        self.chart_switch.bind(active=self.toggle_chart_style)
+        
+        chart_layout.add_widget(chart_label)
+        chart_layout.add_widget(self.chart_switch)
+        appearance_items.add_widget(chart_layout)
+        
         # Font size setting
         self._add_setting_item(appearance_items, "Font Size", self.change_font_size)
         
@@ -111,6 +126,11 @@ class SettingsScreen(Screen):
         self.secure_manager = secure_manager
         self.privacy_manager = privacy_manager
     
+    def on_pre_enter(self):
+        """Called before the screen is displayed"""
+        if self.db_manager:
+            self.chart_switch.active = self.db_manager.get_setting('chart_style', 'native') == 'matplotlib'
+    
     def _create_section_header(self, title):
         """Create a section header"""
         section = BoxLayout(
@@ -208,14 +228,14 @@ class SettingsScreen(Screen):
         if not self.secure_manager:
             self._show_message_popup("Error", "Data manager not initialized.")
             return
-            
+        
         try:
             import os
             
             # Create exports directory if it doesn't exist
             if not os.path.exists('exports'):
                 os.makedirs('exports')
-                
+            
             # Generate export path with timestamp
             from datetime import datetime
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -234,6 +254,13 @@ class SettingsScreen(Screen):
         theme = "Dark" if value else "Light"
         self._show_message_popup("Theme Changed", f"Theme set to {theme}.\nThis is a demo feature.")
     
+    def toggle_chart_style(self, instance, value):
+        """Switch between native and matplotlib-rendered charts"""
+        if not self.db_manager:
+            return
+        
+        self.db_manager.set_setting('chart_style', 'matplotlib' if value else 'native')
+    
     def change_font_size(self, instance):
         """Change font size"""
         self._show_message_popup("Font Size", "Font size adjustment is a demo feature.")
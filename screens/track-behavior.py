@@ -1,3 +1,4 @@
+from kivy.app import App
 from kivy.uix.screenmanager import Screen, SlideTransition
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
@@ -83,13 +84,13 @@ class TrackBehaviorScreen(Screen):
         scroll_view.add_widget(self.traits_layout)
         
         # Save button
-        save_btn = Button(
+        self.save_btn = Button(
             text='SAVE OBSERVATIONS',
             size_hint_y=None,
             height=dp(50),
             background_color=(0.2, 0.7, 0.2, 1)
         )
-        save_btn.bind(on_press=self.save_observations)
+        self.save_btn.bind(on_press=self.save_observations)
         
         # Disclaimer
         disclaimer = Label(
@@ -106,7 +107,7 @@ class TrackBehaviorScreen(Screen):
         layout.add_widget(date_layout)
         layout.add_widget(self.child_name)
         layout.add_widget(scroll_view)
-        layout.add_widget(save_btn)
+        layout.add_widget(self.save_btn)
         layout.add_widget(disclaimer)
         
         self.add_widget(layout)
@@ -354,38 +355,42 @@ class TrackBehaviorScreen(Screen):
             self._show_message_popup("Error", "Unable to save observations.")
             return
         
+        insight = self._make_insight(self.profile.id, self.profile.age_group)
+        
+        # Queue for saving; the journal writes it to the database in the background
+        try:
+            App.get_running_app().observation_journal.append(insight)
+            self._show_message_popup(
+                "Success",
+                "Observations saved successfully!",
+                self.go_back
+            )
+        except Exception as e:
+            self._show_message_popup("Error", f"Failed to save observations: {str(e)}")
+    
+    def _make_insight(self, profile_id, age_group):
+        """Create an insight for a profile from the current slider values"""
         # Collect trait values
         traits = {}
         for trait_id, slider in self.sliders.items():
             traits[trait_id] = slider.value
         
         # Determine trait category based on age group
-        if self.profile.age_group == AgeGroup.TODDLER:
+        if age_group == AgeGroup.TODDLER:
             category = TraitCategory.TEMPERAMENT
-        elif self.profile.age_group == AgeGroup.CHILD:
+        elif age_group == AgeGroup.CHILD:
             category = TraitCategory.MBTI_INSPIRED
         else:  # TEEN
             category = TraitCategory.BIG_FIVE
         
         # Create insight
-        insight = PersonalityInsight(
-            user_id=self.profile.id,
+        return PersonalityInsight(
+            user_id=profile_id,
             category=category,
             traits=traits,
             context={"source": "manual_observation"},
             confidence_score=0.9  # High confidence for manual input
         )
-        
-        # Save to database
-        try:
-            self.db_manager.save_insight(insight)
-            self._show_message_popup(
-                "Success",
-                "Observations saved successfully!",
-                self.go_back
-            )
-        except Exception as e:
-            self._show_message_popup("Error", f"Failed to save observations: {str(e)}")
     
     def go_back(self, instance=None):
         """Return to profile screen"""
@@ -0,0 +1,203 @@
+from datetime import datetime
+
+from kivy.uix.widget import Widget
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Line, Mesh, Point, Rectangle, InstructionGroup
+from kivy.metrics import dp, sp
+from kivy.utils import get_color_from_hex
+
+TRAIT_COLORS = ['#FF5722', '#2196F3', '#4CAF50', '#9C27B0', '#FFC107']
+GRID_STEPS = 5  # horizontal grid lines at 0%, 25%, ... 100%
+
+class TrendChart(Widget):
+    """Trait trend line chart drawn directly with Kivy graphics instructions.
+    
+    Takes the same chart data as the matplotlib renderer (title, ISO
+    timestamps oldest first, and a list of values per trait). Instructions
+    are created once and their vertex data is updated in place when the data
+    or the widget size changes.
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._data = None
+        self._series = []  # [(Color, Line, Point)] per trait
+        self._legend = []  # [(Color, Rectangle)] swatches per trait
+        self._texts = {}  # text slot -> (Rectangle, text, font_size, color)
+        
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self._background = Rectangle()
+            Color(0.88, 0.88, 0.88, 1)
+            self._grid = Mesh(mode='lines')
+            Color(0.3, 0.3, 0.3, 1)
+            self._axes = Line(width=1.2)
+        
+        self._series_group = InstructionGroup()
+        self._legend_group = InstructionGroup()
+        self._text_group = InstructionGroup()
+        # Text textures carry their own color, so draw them untinted
+        self._text_group.add(Color(1, 1, 1, 1))
+        self.canvas.add(self._series_group)
+        self.canvas.add(self._legend_group)
+        
+        with self.canvas:
+            self._highlight_color = Color(0, 0, 0, 0)
+            self._highlight = Line(width=1.5)
+        
+        self.canvas.add(self._text_group)
+        
+        self.bind(pos=self._redraw, size=self._redraw)
+    
+    def set_data(self, chart_data):
+        """Show new chart data, reusing the existing drawing instructions"""
+        self._data = chart_data
+        self._sync_series(len(chart_data['traits']))
+        self._redraw()
+    
+    def _sync_series(self, count):
+        """Grow or shrink the per-trait instructions to match the trait count"""
+        while len(self._series) < count:
+            color = Color(0, 0, 0, 1)
+            line = Line(width=dp(1.5))
+            point = Point(pointsize=dp(3))
+            self._series_group.add(color)
+            self._series_group.add(line)
+            self._series_group.add(point)
+            self._series.append((color, line, point))
+            
+            swatch_color = Color(0, 0, 0, 1)
+            swatch = Rectangle()
+            self._legend_group.add(swatch_color)
+            self._legend_group.add(swatch)
+            self._legend.append((swatch_color, swatch))
+        
+        while len(self._series) > count:
+            for instruction in self._series.pop():
+                self._series_group.remove(instruction)
+            for instruction in self._legend.pop():
+                self._legend_group.remove(instruction)
+            self._remove_text(f"legend_{len(self._series)}")
+    
+    def _redraw(self, *args):
+        """Recompute all vertex positions for the current data and size"""
+        self._background.pos = self.pos
+        self._background.size = self.size
+        
+        if not self._data:
+            return
+        
+        # Plot area inside the margins for title, axis labels and dates
+        left = self.x + dp(40)
+        right = self.right - dp(10)
+        bottom = self.y + dp(30)
+        top = self.top - dp(28)
+        plot_width = max(right - left, 1)
+        plot_height = max(top - bottom, 1)
+        
+        self._axes.points = [left, top, left, bottom, right, bottom]
+        
+        # Horizontal grid lines with percentage labels
+        vertices = []
+        for step in range(GRID_STEPS):
+            y = bottom + plot_height * step / (GRID_STEPS - 1)
+            vertices.extend([left, y, 0, 0, right, y, 0, 0])
+            self._place_text(f"y_{step}", f"{step * 100 // (GRID_STEPS - 1)}%",
+                             sp(10), (0.4, 0.4, 0.4, 1), right_x=left - dp(4), center_y=y)
+        self._grid.vertices = vertices
+        self._grid.indices = list(range(GRID_STEPS * 2))
+        
+        self._place_text("title", self._data['title'], sp(14), (0.1, 0.1, 0.1, 1),
+                         center_x=self.center_x, center_y=self.top - dp(14))
+        
+        # Map dates onto the x axis
+        dates = [datetime.fromisoformat(timestamp) for timestamp in self._data['timestamps']]
+        start = dates[0].timestamp()
+        span = dates[-1].timestamp() - start
+        if span > 0:
+            xs = [left + plot_width * (d.timestamp() - start) / span for d in dates]
+        else:
+            xs = [left + plot_width / 2] * len(dates)
+        
+        # First and last dates as x labels
+        self._place_text("x_first", dates[0].strftime('%b %Y'), sp(10), (0.4, 0.4, 0.4, 1),
+                         center_x=xs[0] if span > 0 else left + dp(20), center_y=self.y + dp(15))
+        if len(dates) > 1:
+            self._place_text("x_last", dates[-1].strftime('%b %Y'), sp(10), (0.4, 0.4, 0.4, 1),
+                             right_x=right, center_y=self.y + dp(15))
+        else:
+            self._remove_text("x_last")
+        
+        # Trait lines, point markers and legend
+        legend_y = bottom + dp(6)
+        latest = []
+        for i, (trait_name, values) in enumerate(self._data['traits'].items()):
+            rgba = get_color_from_hex(TRAIT_COLORS[i % len(TRAIT_COLORS)])
+            color, line, point = self._series[i]
+            color.rgba = rgba
+            
+            points = []
+            for x, value in zip(xs, values):
+                points.extend([x, bottom + plot_height * value])
+            line.points = points
+            point.points = points
+            latest.append(values[-1])
+            
+            swatch_color, swatch = self._legend[i]
+            swatch_color.rgba = rgba
+            label = self._place_text(f"legend_{i}", trait_name.replace('_', ' ').title(), sp(10),
+                                     (0.2, 0.2, 0.2, 1), right_x=right - dp(4), center_y=legend_y)
+            swatch.pos = (label.pos[0] - dp(14), legend_y - dp(4))
+            swatch.size = (dp(10), dp(8))
+            legend_y += dp(14)
+        
+        # Highlight the highest current trait
+        if len(dates) > 1:
+            max_idx = latest.index(max(latest))
+            x, y = xs[-1], bottom + plot_height * latest[max_idx]
+            self._highlight_color.rgba = get_color_from_hex(TRAIT_COLORS[max_idx % len(TRAIT_COLORS)])
+            self._highlight.circle = (x, y, dp(7))
+            
+            trait_names = list(self._data['traits'].keys())
+            highlight_trait = trait_names[max_idx].replace('_', ' ').title()
+            self._place_text("highlight", f"Highest trait: {highlight_trait} - {latest[max_idx]:.0%}",
+                             sp(11), (0.1, 0.1, 0.1, 1),
+                             right_x=x - dp(10), center_y=min(y + dp(18), top - dp(8)))
+        else:
+            self._highlight_color.a = 0
+            self._remove_text("highlight")
+    
+    def _place_text(self, slot, text, font_size, color, center_x=None, right_x=None, center_y=0):
+        """Position a text rectangle, re-rendering its texture only if the text changed"""
+        entry = self._texts.get(slot)
+        
+        if entry is None or entry[1:] != (text, font_size, color):
+            label = CoreLabel(text=text, font_size=font_size, color=color)
+            label.refresh()
+            
+            if entry is None:
+                rect = Rectangle()
+                self._text_group.add(rect)
+            else:
+                rect = entry[0]
+            
+            rect.texture = label.texture
+            rect.size = label.texture.size
+            self._texts[slot] = (rect, text, font_size, color)
+        else:
+            rect = entry[0]
+        
+        width, height = rect.size
+        if right_x is not None:
+            x = right_x - width
+        else:
+            x = center_x - width / 2
+        rect.pos = (x, center_y - height / 2)
+        
+        return rect
+    
+    def _remove_text(self, slot):
+        """Remove a text rectangle that is no longer needed"""
+        entry = self._texts.pop(slot, None)
+        if entry:
+            self._text_group.remove(entry[0])